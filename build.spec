@@ -1,24 +1,32 @@
 # -*- mode: python -*-
-from PyInstaller.utils.hooks import collect_data_files
 import os
 
 block_cipher = None
 
+# Modo pasta (onedir): o executável abre direto da pasta dist/SistemaAcademico,
+# sem descompactar tudo num diretório temporário a cada execução como no
+# onefile. Distribua a pasta inteira (ou um atalho para o .exe dentro dela).
 a = Analysis(
-    ['front/Main.py'],
-    pathex=[],
+    ['vclass/Main.py'],
+    pathex=['vclass'],
     binaries=[],
     datas=[
-        ('front/logo.png', 'front'),  # Inclui a logo
-        ('front/logo.ico', '.'),      # Inclui o ícone (COM VÍRGULA)
-        ('activities', 'activities'), # Pasta de atividades (COM VÍRGULA)
-        ('submissions', 'submissions') # Pasta de submissões
+        ('vclass/vclass/logo_200.png', 'vclass'),  # Logo já redimensionada (lida pelo Tk)
+        ('vclass/vclass/logo.png', 'vclass'),      # Original, usada só se a de cima faltar
+        ('vclass/logo.ico', '.'),                  # Ícone
+    ],
+    # Importados só dentro de funções ou em try/except; listados para não
+    # depender da análise do PyInstaller. Pacotes ausentes na máquina de
+    # build só geram aviso (ver requirements.txt)
+    hiddenimports=[
+        'analytics', 'export', 'plagiarism', 'previews',
+        'zstandard', 'openpyxl', 'pypdf', 'PIL', 'PIL.ImageTk', 'fitz', 'numpy',
     ],
-    hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Módulos que o sistema não usa e que só aumentam o pacote
+    excludes=['unittest', 'pydoc', 'doctest', 'test', 'lib2to3', 'pip', 'setuptools'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -29,23 +37,30 @@ pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='SistemaAcademico',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    # Sem UPX: descomprimir as DLLs a cada abertura custa mais do que o espaço economizado
+    upx=False,
     console=False,
-    icon=os.path.join('front', 'logo.ico'),  # Caminho relativo para o ícone
+    icon=os.path.join('vclass', 'logo.ico'),
     disable_windowed_traceback=False,
     argv_emulation=False,
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
-    onefile=True
-)
\ No newline at end of file
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='SistemaAcademico',
+)
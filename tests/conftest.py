@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos do sistema são importados pelo nome, como o Main.py faz
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vclass"))
+
+
+@pytest.fixture
+def system(tmp_path, monkeypatch):
+    """AcademicService num diretório temporário, com scrypt barato."""
+    import service
+
+    monkeypatch.chdir(tmp_path)
+    # A calibração mira 150 ms por hash; nos testes o custo mínimo basta
+    monkeypatch.setattr(service, "calibrate_scrypt", lambda: 2 ** 10)
+    system = service.AcademicService(str(tmp_path / "academic.db"))
+    yield system
+    system.close()
+
+
+@pytest.fixture
+def student(system):
+    """Aluno aprovado com uma atividade para entregar; retorna (username, activity_id)."""
+    system.register_student({"matricula": "2024001", "nome": "Ana Souza", "cpf": "12345678900"})
+    system.approve_students(["aluno_2024001"], "admin")
+    system.create_activity("Lista 1", "", "2030-12-31", "admin")
+    activity_id = system.get_activities()[0]["id"]
+    return "aluno_2024001", activity_id
@@ -0,0 +1,88 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+
+def add_student(system, matricula, approve=True):
+    system.register_student({"matricula": matricula, "nome": "Aluno " + matricula, "cpf": "0"})
+    if approve:
+        system.approve_students(["aluno_" + matricula], "admin")
+    return "aluno_" + matricula
+
+
+def grade(system, activity_id, username, value, date="2024-06-01 10:00:00"):
+    with system.db.connection() as conn:
+        conn.execute("""
+            INSERT INTO submissions (activity_id, student_username, submission_date, file_path, grade)
+            VALUES (?, ?, ?, 'arquivo.pdf', ?)
+        """, (activity_id, username, date, value))
+        conn.commit()
+
+
+@pytest.fixture
+def course(system):
+    for title, deadline in (("Lista 1", "2024-03-01"), ("Lista 2", "2024-04-01"), ("Lista 3", "2024-05-01")):
+        system.create_activity(title, "", deadline, "admin")
+    return [row["id"] for row in system.get_activities()]
+
+
+def trends_by_student(system):
+    return {trend["username"]: trend for trend in system.get_student_trends()}
+
+
+def test_activity_stats(system, course):
+    first = course[0]
+    for number, value in enumerate((4.0, 6.0, 8.0, 10.0)):
+        grade(system, first, add_student(system, f"10{number}"), value,
+              date="2024-03-05 09:00:00" if number == 0 else "2024-02-28 09:00:00")
+
+    stats = {item["activity_id"]: item for item in system.get_activity_stats()}[first]
+    assert stats["submissions"] == 4 and stats["graded"] == 4
+    assert stats["mean"] == 7.0 and stats["median"] == 7.0
+    assert stats["min"] == 4.0 and stats["max"] == 10.0
+    assert stats["stdev"] == pytest.approx(2.24, abs=0.01)
+    assert stats["late"] == 1 and stats["late_rate"] == 0.25
+    assert sum(stats["histogram"]) == 4 and stats["histogram"][-1] == 1
+
+    empty = {item["activity_id"]: item for item in system.get_activity_stats()}[course[1]]
+    assert empty["graded"] == 0 and empty["mean"] is None
+
+
+def test_activity_stats_follow_new_grades(system, course):
+    username = add_student(system, "100")
+    grade(system, course[0], username, 5.0)
+    assert system.get_activity_stats()[0]["mean"] == 5.0
+
+    other = add_student(system, "101")
+    grade(system, course[0], other, 9.0)
+    assert system.get_activity_stats()[0]["mean"] == 7.0
+
+
+def test_student_trends(system, course):
+    improving = add_student(system, "100")
+    for activity_id, value in zip(course, (5.0, 7.0, 9.0)):
+        grade(system, activity_id, improving, value)
+
+    trend = trends_by_student(system)[improving]
+    assert trend["graded"] == 3 and trend["mean"] == 7.0
+    assert trend["last"] == 9.0 and trend["slope"] == 2.0
+
+
+def test_trends_follow_approvals_rejections_and_edits(system, course):
+    approved = add_student(system, "100")
+    pending = add_student(system, "101", approve=False)
+    for username in (approved, pending):
+        grade(system, course[0], username, 8.0)
+    assert set(trends_by_student(system)) == {approved}
+
+    # Nenhuma atividade mudou; só os alunos
+    system.approve_students([pending], "admin")
+    assert set(trends_by_student(system)) == {approved, pending}
+
+    with system.db.connection() as conn:
+        conn.execute("UPDATE students SET nome = 'Nome Corrigido' WHERE username = ?", (pending,))
+        conn.commit()
+    assert trends_by_student(system)[pending]["nome"] == "Nome Corrigido"
+
+    system.reject_users([approved])
+    assert set(trends_by_student(system)) == {pending}
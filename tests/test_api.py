@@ -0,0 +1,122 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from api import APIServer
+
+
+@pytest.fixture
+def api(system):
+    server = APIServer(system, port=0, workers=2)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def run():
+        task = asyncio.ensure_future(server.serve())
+        while server.server is None or not server.server.sockets:
+            await asyncio.sleep(0.01)
+        ready.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),))
+    thread.start()
+    assert ready.wait(5)
+    yield server.server.sockets[0].getsockname()[1]
+    loop.call_soon_threadsafe(server.server.close)
+    thread.join(5)
+    loop.close()
+    server.close()
+
+
+def call(port, method, path, body=None, token=None, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    headers = dict(headers or {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if isinstance(body, dict):
+        body = json.dumps(body).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    connection.close()
+    return response.status, payload
+
+
+def login(port, username, password):
+    status, payload = call(port, "POST", "/login", {"username": username, "password": password})
+    assert status == 200, payload
+    return payload["token"]
+
+
+@pytest.fixture
+def professor(system):
+    system.register_user("prof", "segredo", "professor")
+    system.approve_students(["prof"], "admin")
+    return "prof"
+
+
+def test_login_and_authorization(api, student, professor):
+    assert call(api, "POST", "/login", {"username": "prof", "password": "errada"})[0] == 401
+    assert call(api, "GET", "/activities")[0] == 401
+    assert call(api, "GET", "/nada", token="x")[0] == 404
+    assert call(api, "DELETE", "/activities")[0] == 405
+
+    token = login(api, "aluno_2024001", "12345678900")
+    status, payload = call(api, "GET", "/progress", token=token)
+    assert status == 403
+
+
+def test_student_submits_and_professor_grades(api, student, professor):
+    username, activity_id = student
+    token = login(api, username, "12345678900")
+
+    assert call(api, "POST", "/submissions", b"x", token, {"X-File-Name": "t.txt"})[0] == 400
+    status, payload = call(api, "POST", f"/submissions?activity_id={activity_id}", b"resposta",
+                           token, {"X-File-Name": "trabalho.txt"})
+    assert status == 201 and payload["success"]
+    assert call(api, "POST", "/submissions?activity_id=999", b"x", token, {"X-File-Name": "t.txt"})[0] == 404
+
+    (submission,) = call(api, "GET", f"/progress/{username}", token=token)[1]["submissions"]
+    assert submission["file_name"] == "trabalho.txt"
+
+    prof = login(api, "prof", "segredo")
+    assert call(api, "POST", "/grades", {"grades": [{"submission_id": submission["id"], "grade": "11"}]},
+                prof)[0] == 400
+    status, payload = call(api, "POST", "/grades",
+                           {"grades": [{"submission_id": submission["id"], "grade": "9,5", "feedback": "ok"}]}, prof)
+    assert status == 200 and payload["success"]
+
+    status, payload = call(api, "GET", "/progress?order_by=progresso&limit=10", token=prof)
+    assert status == 200 and payload["total"] == 1
+    assert payload["students"][0]["progresso"] == 100.0
+    assert call(api, "GET", "/progress?order_by=senha", token=prof)[0] == 400
+    assert call(api, "GET", "/progress/aluno_outro", token=token)[0] == 403
+
+
+def test_professor_creates_activities_and_searches(api, student, professor):
+    prof = login(api, "prof", "segredo")
+    assert call(api, "POST", "/activities", {"title": "Lista 2", "deadline": "31/12/2030"}, prof)[0] == 400
+    assert call(api, "POST", "/activities", {"title": "Lista 2", "deadline": "2030-12-31"}, prof)[0] == 201
+    assert len(call(api, "GET", "/activities", token=prof)[1]["activities"]) == 2
+
+    status, payload = call(api, "GET", "/students/search?q=ana", token=prof)
+    assert status == 200 and [row["nome"] for row in payload["students"]] == ["Ana Souza"]
+
+
+def test_rejected_user_loses_the_token(api, system, professor):
+    token = login(api, "prof", "segredo")
+    system.reject_users(["prof"])
+    # A rejeição feita pelo serviço chega ao servidor pelo change_log
+    for _ in range(50):
+        if call(api, "GET", "/activities", token=token)[0] == 401:
+            break
+        time.sleep(0.1)
+    assert call(api, "GET", "/activities", token=token)[0] == 401
@@ -0,0 +1,51 @@
+import os
+
+
+def register(system, *matriculas):
+    for matricula in matriculas:
+        system.register_student({"matricula": matricula, "nome": "Aluno " + matricula, "cpf": "0"})
+    return ["aluno_" + matricula for matricula in matriculas]
+
+
+def pending(system):
+    return sorted(row["username"] for row in system.get_pending_users())
+
+
+def test_batch_approval(system):
+    usernames = register(system, "2024001", "2024002", "2024003")
+
+    success, message = system.approve_students(usernames[:2], "admin")
+
+    assert success
+    assert message.startswith("2 cadastro(s)")
+    assert pending(system) == ["aluno_2024003"]
+
+
+def test_already_approved_users_are_not_counted(system):
+    usernames = register(system, "2024001", "2024002")
+    system.approve_students(usernames[:1], "admin")
+
+    success, message = system.approve_students(usernames, "admin")
+    assert success and message.startswith("1 cadastro(s)")
+
+
+def test_empty_selection(system):
+    assert system.approve_students([], "admin") == (False, "Nenhum usuário selecionado!")
+    assert system.reject_users(iter([])) == (False, "Nenhum usuário selecionado!")
+
+
+def test_batch_rejection_removes_students_and_their_files(system, student, tmp_path):
+    username, activity_id = student
+    others = register(system, "2024002", "2024003")
+    source = tmp_path / "trabalho.txt"
+    source.write_bytes(b"entrega")
+    system.submit_activity(activity_id, username, str(source))
+
+    success, message = system.reject_users([username] + others)
+
+    assert success and message.startswith("3 cadastro(s)")
+    conn = system.db.connection()
+    assert conn.execute("SELECT COUNT(*) FROM students").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
+    assert not [name for _, _, names in os.walk(system.blobs.root) for name in names]
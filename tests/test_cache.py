@@ -0,0 +1,103 @@
+import threading
+
+import events
+from events import EventBus, QueryCache
+
+
+def test_hits_misses_and_tag_invalidation():
+    cache = QueryCache()
+    loads = []
+
+    def load(value):
+        loads.append(value)
+        return value
+
+    assert cache.get_or_load("a", ("users",), lambda: load(1)) == 1
+    assert cache.get_or_load("a", ("users",), lambda: load(2)) == 1
+    assert cache.get_or_load("b", ("activities",), lambda: load(3)) == 3
+    cache.invalidate("users")
+    assert cache.get_or_load("a", ("users",), lambda: load(4)) == 4
+    assert cache.get_or_load("b", ("activities",), lambda: load(5)) == 3
+
+    assert loads == [1, 3, 4]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (2, 3, 1)
+
+
+def test_entries_expire_and_least_recent_is_evicted(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(events.time, "monotonic", lambda: clock[0])
+    cache = QueryCache(max_entries=2, ttl=10)
+    cache.get_or_load("a", (), lambda: "a")
+    cache.get_or_load("b", (), lambda: "b")
+    cache.get_or_load("a", (), lambda: "novo")   # "a" passa a ser a mais recente
+    cache.get_or_load("c", (), lambda: "c")      # "b" sai
+    assert cache.get_or_load("b", (), lambda: "b2") == "b2"
+    assert cache.stats()["evictions"] == 2
+
+    clock[0] = 11
+    assert cache.get_or_load("c", (), lambda: "c2") == "c2"
+
+
+def test_value_loaded_during_a_write_is_not_stored():
+    cache = QueryCache()
+
+    def load():
+        # Escrita concorrente enquanto a consulta roda
+        cache.invalidate("users")
+        return "velho"
+
+    assert cache.get_or_load("a", ("users",), load) == "velho"
+    assert cache.get_or_load("a", ("users",), lambda: "novo") == "novo"
+
+
+def test_concurrent_identical_queries_load_once():
+    cache = QueryCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "valor"
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get_or_load("k", (), slow)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(cache.get_or_load("k", (), slow)))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert results == ["valor", "valor"] and calls == [1]
+
+
+def test_event_bus_unsubscribe():
+    bus = EventBus()
+    received = []
+    unsubscribe = bus.subscribe("x", lambda **payload: received.append(payload))
+    bus.publish("x", value=1)
+    unsubscribe()
+    bus.publish("x", value=2)
+    assert received == [{"value": 1}]
+
+
+def test_service_queries_are_refreshed_by_writes(system, student, tmp_path):
+    username, activity_id = student
+    assert system.get_activities_for_student(username)[0]["submitted"] == 0
+    assert system.get_activities_for_student(username)[0]["submitted"] == 0
+    assert system.get_cache_stats()["hits"] >= 1
+
+    path = tmp_path / "t.txt"
+    path.write_text("resposta")
+    system.submit_activity(activity_id, username, str(path))
+    assert system.get_activities_for_student(username)[0]["submitted"] == 1
+
+    system.create_activity("Lista 2", "", "2031-01-31", "admin")
+    assert len(system.get_activities_for_student(username)) == 2
+    assert len(system.get_activities()) == 2
+
+    system.register_student({"matricula": "2024009", "nome": "Novo", "cpf": "0"})
+    assert [row["username"] for row in system.get_pending_students()] == ["aluno_2024009"]
@@ -0,0 +1,85 @@
+import pytest
+
+import service
+from changes import ChangeWatcher
+from events import EventBus
+
+
+class ManualScheduler:
+    """Faz o papel do Tk: guarda o próximo ``after`` para o teste disparar."""
+
+    def __init__(self):
+        self.pending = None
+
+    def after(self, delay, callback):
+        self.pending = callback
+        return object()
+
+    def after_cancel(self, job):
+        self.pending = None
+
+
+@pytest.fixture
+def other(system):
+    # Segunda "máquina" sobre o mesmo arquivo de banco
+    other = service.AcademicService(system.db_file)
+    yield other
+    other.close()
+
+
+@pytest.fixture
+def watcher(system):
+    scheduler = ManualScheduler()
+    published = []
+    bus = EventBus()
+    bus.subscribe("db_changed", lambda changes: published.append(changes))
+    watcher = ChangeWatcher(system.db, scheduler, bus)
+    watcher.start()
+    yield watcher, scheduler, published
+    watcher.stop()
+
+
+def test_changes_from_another_connection_are_published(watcher, other):
+    watcher, scheduler, published = watcher
+    scheduler.pending()
+    assert published == []
+
+    other.register_student({"matricula": "2024009", "nome": "Novo", "cpf": "0"})
+    other.create_activity("Lista 9", "", "2031-01-31", "admin")
+    scheduler.pending()
+
+    (changes,) = published
+    assert {(change.table, change.op, change.key) for change in changes} >= {
+        ("users", "I", "aluno_2024009"), ("students", "I", "aluno_2024009"),
+    }
+    assert any(change.table == "activities" for change in changes)
+    # Sondagens sem commit novo não publicam nada
+    scheduler.pending()
+    assert len(published) == 1
+
+
+def test_pruned_log_asks_for_a_full_reload(watcher, other):
+    watcher, scheduler, published = watcher
+    other.register_user("prof", "x", "professor")
+    with other.db.connection() as conn:
+        conn.execute("DELETE FROM change_log")
+        conn.execute("INSERT INTO change_log (id, table_name, op, row_key) VALUES (999999, 'users', 'U', 'prof')")
+        conn.commit()
+    scheduler.pending()
+    assert published == [None]
+
+
+def test_other_machine_writes_refresh_the_cache(system, other, student):
+    username, _ = student
+    system.watcher = ChangeWatcher(system.db, ManualScheduler(), system.events)
+    system.watcher.start()
+    assert len(system.get_activities_for_student(username)) == 1
+
+    other.create_activity("Lista 2", "", "2031-01-31", "admin")
+    system.watcher.root.pending()
+    assert len(system.get_activities_for_student(username)) == 2
+
+    other.reject_users([username])
+    system.watcher.root.pending()
+    assert system.get_pending_students() == [] and system.get_class_progress() == []
+    system.watcher.stop()
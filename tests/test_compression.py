@@ -0,0 +1,55 @@
+import os
+
+import storage
+from storage import BlobStore, choose_codec, sample_entropy
+
+
+def test_entropy_picks_the_codec():
+    assert sample_entropy(b"") == 0.0
+    assert sample_entropy(bytes(range(256)) * 4) == 8.0
+    assert choose_codec(os.urandom(65536)).name == "raw"
+    assert choose_codec(b"texto comum " * 1000).name in ("zstd", "zlib")
+
+
+def test_zlib_is_used_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "zstandard", None)
+    store = BlobStore(str(tmp_path / "blobs"))
+    source = tmp_path / "texto.txt"
+    source.write_bytes(b"linha repetida\n" * 5000)
+
+    blob_hash, size, codec, stored_size = store.put(str(source))
+    assert codec == "zlib" and store.path_for(blob_hash, codec).endswith(".zz")
+    assert b"".join(store.iter_content(blob_hash)) == source.read_bytes()
+
+
+def test_incompressible_files_are_stored_raw(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    source = tmp_path / "foto.jpg"
+    source.write_bytes(os.urandom(200000))
+
+    blob_hash, size, codec, stored_size = store.put(str(source))
+    assert codec == "raw" and stored_size == size
+    assert store.codec_of(blob_hash) == "raw"
+
+
+def test_compression_can_be_disabled(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"), compression=False)
+    source = tmp_path / "texto.txt"
+    source.write_bytes(b"a" * 100000)
+    assert store.put(str(source))[2] == "raw"
+
+
+def test_storage_stats_report_savings(system, student, tmp_path):
+    username, activity_id = student
+    source = tmp_path / "relatorio.txt"
+    source.write_bytes(b"conteudo que comprime muito bem " * 4000)
+    system.submit_activity(activity_id, username, str(source))
+
+    (stats,) = system.get_storage_stats()
+    assert stats["original_bytes"] == source.stat().st_size
+    assert stats["comprimidas"] == 1 and stats["saved_bytes"] > 0
+
+    # O arquivo aberto pelo professor é o original, descomprimido
+    (submission,) = system.get_activity_submissions(activity_id)
+    with open(system.get_submission_file(submission), "rb") as f:
+        assert f.read() == source.read_bytes()
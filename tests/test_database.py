@@ -0,0 +1,55 @@
+import threading
+
+from database import ConnectionPool
+
+
+def test_one_connection_per_thread(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "a.db"))
+    main = pool.connection()
+    assert pool.connection() is main
+
+    others = []
+    thread = threading.Thread(target=lambda: others.append(pool.connection()))
+    thread.start()
+    thread.join()
+    assert others[0] is not main
+    pool.close_all()
+
+
+def test_pragmas_are_applied(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "a.db"), cache_size_kb=2048)
+    conn = pool.connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2048
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    pool.close_all()
+
+
+def test_context_manager_commits_without_closing(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "a.db"))
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    assert pool.connection().execute("SELECT x FROM t").fetchone()[0] == 1
+
+    other = ConnectionPool(str(tmp_path / "a.db"))
+    assert other.connection().execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    other.close_all()
+    pool.close_all()
+
+
+def test_release_thread_and_close_all(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "a.db"))
+    first = pool.connection()
+    pool.release_thread()
+    assert pool.connection() is not first
+
+    dedicated = pool.dedicated()
+    pool.close_all()
+    assert pool._connections == []
+    # Depois de fechar tudo, a thread ganha uma conexão nova
+    conn = pool.connection()
+    assert conn is not dedicated
+    conn.execute("SELECT 1")
+    pool.close_all()
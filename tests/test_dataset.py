@@ -0,0 +1,66 @@
+import random
+import sqlite3
+
+import pytest
+
+from benchmark import dataset
+
+SMALL = {"students": 20, "pending": 3, "professors": 2, "activities": 5, "files": 4}
+
+
+@pytest.fixture
+def generated(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "calibrate_scrypt", lambda: 2 ** 10)
+    summary = dataset.generate_dataset(str(tmp_path), progress=None, **SMALL)
+    return tmp_path, summary
+
+
+def test_counts_match_the_requested_scale(generated):
+    out_dir, summary = generated
+    conn = sqlite3.connect(str(out_dir / "academic.db"))
+
+    assert summary["students"] == 20 and summary["activities"] == 5
+    assert conn.execute("SELECT COUNT(*) FROM users WHERE user_type = 'aluno' AND is_approved = 0").fetchone()[0] == 3
+    assert conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0] == summary["submissions"]
+    assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 4
+
+
+def test_same_seed_same_data(tmp_path, generated):
+    out_dir, _ = generated
+    other = tmp_path / "outro"
+    other.mkdir()
+    dataset.generate_dataset(str(other), progress=None, **SMALL)
+
+    query = "SELECT username, nome, cpf FROM students ORDER BY username"
+    first = sqlite3.connect(str(out_dir / "academic.db")).execute(query).fetchall()
+    assert sqlite3.connect(str(other / "academic.db")).execute(query).fetchall() == first
+
+
+def test_existing_database_needs_overwrite(generated):
+    out_dir, _ = generated
+    with pytest.raises(FileExistsError):
+        dataset.generate_dataset(str(out_dir), progress=None, **SMALL)
+    assert dataset.generate_dataset(str(out_dir), progress=None, overwrite=True, **SMALL)["students"] == 20
+
+
+def test_fake_cpf_check_digits():
+    rng = random.Random(3)
+    for _ in range(50):
+        cpf = [int(d) for d in dataset.fake_cpf(rng)]
+        for size in (9, 10):
+            total = sum(d * weight for d, weight in zip(cpf, range(size + 1, 1, -1)))
+            assert cpf[size] == total * 10 % 11 % 10
+
+
+def test_generated_accounts_log_in(generated, monkeypatch):
+    import service
+
+    out_dir, _ = generated
+    monkeypatch.chdir(out_dir)
+    monkeypatch.setattr(service, "calibrate_scrypt", lambda: 2 ** 10)
+    system = service.AcademicService(str(out_dir / "academic.db"))
+    try:
+        assert system.authenticate("prof_0", dataset.BENCH_PASSWORD)["user_type"] == "professor"
+        assert system.authenticate("prof_0", "errada") is None
+    finally:
+        system.close()
@@ -0,0 +1,75 @@
+import csv
+import zipfile
+
+import pytest
+
+import export
+
+
+def graded_submission(system, student, tmp_path, grade=8.5):
+    username, activity_id = student
+    path = tmp_path / "trabalho.txt"
+    path.write_text("resposta", encoding="utf-8")
+    system.submit_activity(activity_id, username, str(path))
+    submission_id = system.get_activity_submissions(activity_id)[0]["id"]
+    system.grade_submission(submission_id, grade, "Muito bem; revisar item 2")
+    return activity_id
+
+
+def test_activity_grades_csv(system, student, tmp_path):
+    activity_id = graded_submission(system, student, tmp_path)
+    path = str(tmp_path / "notas.csv")
+
+    assert system.export_activity_grades(path, activity_id) == 1
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.reader(f, delimiter=";"))
+    assert rows[-2] == ["Matrícula", "Nome", "Entregue em", "Nota", "Feedback"]
+    assert rows[-1][:2] == ["2024001", "Ana Souza"]
+    assert rows[-1][3:] == ["8.5", "Muito bem; revisar item 2"]
+
+
+def test_activity_grades_xlsx_and_pdf(system, student, tmp_path):
+    activity_id = graded_submission(system, student, tmp_path)
+
+    xlsx = str(tmp_path / "notas.xlsx")
+    assert system.export_activity_grades(xlsx, activity_id) == 1
+    with zipfile.ZipFile(xlsx) as archive:
+        assert "xl/worksheets/sheet1.xml" in archive.namelist()
+        assert "Ana Souza" in archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+
+    pdf = str(tmp_path / "notas.pdf")
+    assert system.export_activity_grades(pdf, activity_id) == 1
+    with open(pdf, "rb") as f:
+        data = f.read()
+    assert data.startswith(b"%PDF") and data.rstrip().endswith(b"%%EOF")
+
+
+def test_unknown_activity_or_student(system, tmp_path):
+    with pytest.raises(ValueError, match="Atividade não encontrada"):
+        system.export_activity_grades(str(tmp_path / "notas.csv"), 999)
+    with pytest.raises(ValueError, match="Aluno não encontrado"):
+        system.export_student_transcript(str(tmp_path / "historico.csv"), "aluno_0")
+    assert not list(tmp_path.glob("*.csv"))
+
+
+def test_class_progress_and_transcript(system, student, tmp_path):
+    graded_submission(system, student, tmp_path)
+    username, _ = student
+
+    assert system.export_class_progress(str(tmp_path / "turma.csv")) == 1
+    assert system.export_student_transcript(str(tmp_path / "historico.csv"), username) == 1
+    with open(tmp_path / "turma.csv", newline="", encoding="utf-8-sig") as f:
+        assert list(csv.reader(f, delimiter=";"))[-1][:3] == ["Ana Souza", "2024001", "100.0"]
+
+
+def test_unsupported_format_and_cancellation(tmp_path):
+    report = export.class_progress_report()
+    with pytest.raises(ValueError, match="Formato não suportado"):
+        export.export_rows(str(tmp_path / "turma.txt"), report, [])
+
+    rows = ({"nome": f"Aluno {i}", "matricula": str(i), "progresso": 50.0, "entregas": 1,
+             "total_atividades": 2} for i in range(export.PROGRESS_EVERY * 3))
+    path = tmp_path / "turma.csv"
+    assert export.export_rows(str(path), report, rows, cancelled=lambda: True) is None
+    assert not path.exists()
@@ -0,0 +1,81 @@
+import pytest
+
+
+def insert_submissions(system, activity_id, usernames):
+    # Entregas sem arquivo: só as notas interessam aqui
+    with system.db.connection() as conn:
+        conn.executemany("""
+            INSERT INTO submissions (activity_id, student_username, submission_date, file_path)
+            VALUES (?, ?, '2024-06-01 10:00:00', 'arquivo.pdf')
+        """, [(activity_id, username) for username in usernames])
+        conn.commit()
+        return [row[0] for row in conn.execute("SELECT id FROM submissions ORDER BY id")]
+
+
+def test_bulk_grading_beyond_the_parameter_limit(system, student):
+    _, activity_id = student
+    ids = insert_submissions(system, activity_id, [f"aluno_{number}" for number in range(1500)])
+    events = []
+    system.events.subscribe("grades_saved", lambda **payload: events.append(payload))
+
+    success, message = system.grade_submissions([(submission_id, 7.5, "ok") for submission_id in ids])
+
+    assert success and message.startswith("1500 ")
+    conn = system.db.connection()
+    assert conn.execute("SELECT COUNT(*) FROM submissions WHERE grade = 7.5").fetchone()[0] == 1500
+    (payload,) = events
+    assert len(payload["submissions"]) == 1500
+    assert ("aluno_0", activity_id) in payload["submissions"]
+
+
+def test_unknown_submissions_are_skipped(system, student):
+    username, activity_id = student
+    (submission_id,) = insert_submissions(system, activity_id, [username])
+
+    success, message = system.grade_submissions([(submission_id, 9.0, ""), (submission_id + 100, 5.0, "")])
+
+    assert success and message.startswith("1 ")
+    assert system.get_activity_submissions(activity_id)[0]["grade"] == 9.0
+
+
+def test_grading_refreshes_the_student_view(system, student):
+    username, activity_id = student
+    (submission_id,) = insert_submissions(system, activity_id, [username])
+    (before,) = system.get_activities_for_student(username)
+    assert before["grade"] is None
+
+    system.grade_submission(submission_id, 8.0, "Bom trabalho")
+
+    (after,) = system.get_activities_for_student(username)
+    assert after["grade"] == 8.0 and after["feedback"] == "Bom trabalho"
+
+
+def test_grade_parsing():
+    from grades import format_grade, parse_grade
+
+    assert parse_grade(" 7,5 ") == 7.5
+    assert parse_grade("") is None
+    assert format_grade(None) == "" and format_grade(10.0) == "10"
+    for text in ("11", "-1", "dez"):
+        with pytest.raises(ValueError):
+            parse_grade(text)
+
+
+def test_grades_csv_round_trip(tmp_path):
+    from grades import read_grades_csv, write_grades_csv
+
+    submissions = [
+        {"id": 1, "matricula": "2024001", "nome": "Ana", "grade": 8.0, "feedback": "bom"},
+        {"id": 2, "matricula": "2024002", "nome": "Bruno", "grade": None, "feedback": None},
+    ]
+    path = str(tmp_path / "notas.csv")
+    write_grades_csv(path, submissions)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2024002;Bruno;doze;\n2024999;Outro;5;\n")
+
+    grades, errors = read_grades_csv(path, submissions)
+
+    assert grades == {1: (8.0, "bom")}
+    assert [(matricula, message) for _, matricula, message in errors] == [
+        ("2024002", "Nota inválida"), ("2024999", "Sem entrega nesta atividade"),
+    ]
@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+from importer import StudentImporter, valid_cpf
+from security import INITIAL_SCRYPT_N, PasswordHasher
+
+
+def make_cpf(base):
+    digits = [int(d) for d in f"{base:09d}"]
+    for size in (9, 10):
+        total = sum(d * weight for d, weight in zip(digits, range(size + 1, 1, -1)))
+        digits.append(total * 10 % 11 % 10)
+    return "".join(map(str, digits))
+
+
+def write_csv(path, rows, header="matricula;nome;cpf;email"):
+    path.write_text("\n".join([header] + [";".join(row) for row in rows]) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_valid_cpf():
+    assert valid_cpf("529.982.247-25")
+    assert valid_cpf(make_cpf(123456789))
+    assert not valid_cpf("529.982.247-26")
+    assert not valid_cpf("111.111.111-11")
+    assert not valid_cpf("123")
+
+
+def test_rows_are_validated_and_reported_by_line(system, student, tmp_path):
+    path = write_csv(tmp_path / "alunos.csv", [
+        ("3001", "Bruno Lima", make_cpf(1), "bruno@x.com"),
+        ("3002", "", make_cpf(2), ""),                       # nome faltando
+        ("3003", "Carla Dias", "12345678900", ""),           # CPF inválido
+        ("3001", "Bruno de Novo", make_cpf(3), ""),          # repetida no arquivo
+        ("2024001", "Ana Souza", make_cpf(4), ""),           # já cadastrada
+        ("3004", "Davi Rocha", make_cpf(5), ""),
+    ])
+
+    report = system.import_students(path, auto_approve=True, approved_by="admin")
+
+    assert report.imported == 2
+    assert [(line, matricula) for line, matricula, _ in report.errors] == [
+        (3, "3002"), (4, "3003"), (5, "3001"), (6, "2024001"),
+    ]
+    assert "nome" in report.errors[0][2]
+    names = {row["nome"] for row in system.get_all_students()}
+    assert {"Bruno Lima", "Davi Rocha"} <= names
+
+
+def test_headers_from_the_registration_form_are_accepted(system, tmp_path):
+    path = write_csv(tmp_path / "alunos.csv", [("3001", "Bruno Lima", make_cpf(1), "b@x.com")],
+                     header="Matrícula,Nome Completo,CPF:,E-mail".replace(",", ";"))
+    report = system.import_students(path)
+    assert report.imported == 1 and report.errors == []
+    assert system.get_pending_students()[0]["email"] == "b@x.com"
+
+
+def test_initial_passwords_use_the_reduced_cost_until_login(system, tmp_path):
+    system.hasher = PasswordHasher(n=2 ** 14)
+    cpf = make_cpf(1)
+    report = system.import_students(write_csv(tmp_path / "a.csv", [("3001", "Bruno", cpf, "")]),
+                                    auto_approve=True, approved_by="admin")
+    assert report.imported == 1
+
+    conn = system.db.connection()
+    stored = conn.execute("SELECT password FROM users WHERE username = 'aluno_3001'").fetchone()[0]
+    assert stored.startswith(f"scrypt${INITIAL_SCRYPT_N}$")
+    assert system.hasher.needs_rehash(stored)
+
+    assert system.authenticate("aluno_3001", cpf) is not None
+    stored = conn.execute("SELECT password FROM users WHERE username = 'aluno_3001'").fetchone()[0]
+    assert stored.startswith(f"scrypt${2 ** 14}$")
+
+
+def test_import_throughput_does_not_depend_on_the_login_cost(system, tmp_path):
+    # Custo de login alto: a importação não pode pagá-lo por aluno
+    hasher = PasswordHasher(n=2 ** 17)
+    start = time.perf_counter()
+    hasher.hash("referencia")
+    login_cost = time.perf_counter() - start
+
+    rows = [(str(4000 + i), f"Aluno {i}", make_cpf(1000 + i), "") for i in range(100)]
+    path = write_csv(tmp_path / "turma.csv", rows)
+    start = time.perf_counter()
+    report = StudentImporter(system.db, hasher).run(path)
+    elapsed = time.perf_counter() - start
+
+    assert report.imported == 100 and report.errors == []
+    # O custo inicial é 32 vezes menor que o do login
+    assert elapsed < len(rows) * login_cost / 8
+
+
+def test_xlsx_without_openpyxl_reports_the_missing_package(system, tmp_path, monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def block_openpyxl(name, *args, **kwargs):
+        if name == "openpyxl":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", block_openpyxl)
+    path = tmp_path / "alunos.xlsx"
+    path.write_bytes(b"")
+    with pytest.raises(RuntimeError, match="openpyxl"):
+        system.import_students(str(path))
+
+
+def test_xlsx_import(system, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["matricula", "nome", "cpf"])
+    sheet.append([3001, "Bruno Lima", make_cpf(1)])
+    path = str(tmp_path / "alunos.xlsx")
+    workbook.save(path)
+
+    report = system.import_students(path)
+    assert report.imported == 1 and report.errors == []
@@ -0,0 +1,64 @@
+import json
+
+from database import ConnectionPool
+from instrumentation import QueryStats, fingerprint
+
+
+def test_fingerprint_normalizes_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM t WHERE a = 'x''y' AND b = 42") == "SELECT * FROM t WHERE a = ? AND b = ?"
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?,?)") == "SELECT * FROM t WHERE id IN (?...)"
+    assert fingerprint("SELECT  1\n  FROM t") == "SELECT ? FROM t"
+
+
+def test_statements_are_counted_with_rows_and_callers(tmp_path):
+    stats = QueryStats(slow_ms=10 ** 6)
+    pool = ConnectionPool(str(tmp_path / "a.db"), query_stats=stats)
+    conn = pool.connection()
+    conn.execute("CREATE TABLE t (x)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(5)])
+    for _ in range(3):
+        conn.execute("SELECT x FROM t WHERE x > 1").fetchall()
+
+    by_sql = {item["fingerprint"]: item for item in stats.snapshot()}
+    select = by_sql["SELECT x FROM t WHERE x > ?"]
+    assert select["count"] == 3 and select["rows"] == 9
+    (caller,) = select["callers"]
+    assert caller.startswith("test_instrumentation.py:")
+    assert by_sql["INSERT INTO t VALUES (?)"]["rows"] == 5
+    pool.close_all()
+
+
+def test_slow_queries_are_logged_with_plan(tmp_path):
+    log = tmp_path / "slow.log"
+    stats = QueryStats(slow_ms=0, log_path=str(log))
+    pool = ConnectionPool(str(tmp_path / "a.db"), query_stats=stats)
+    conn = pool.connection()
+    conn.execute("CREATE TABLE t (x)")
+    conn.execute("SELECT * FROM t WHERE x = ?", (1,)).fetchall()
+    conn.execute("SELECT * FROM t WHERE x = ?", (2,)).fetchall()
+
+    entries = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    selects = [entry for entry in entries if entry["sql"].startswith("SELECT")]
+    assert len(selects) == 2
+    # O plano é capturado uma vez por impressão digital dentro do intervalo
+    assert selects[0]["plan"] and "SCAN t" in selects[0]["plan"][0]
+    assert selects[1]["plan"] is None
+    pool.close_all()
+
+
+def test_disabled_stats_and_dump(tmp_path):
+    stats = QueryStats()
+    pool = ConnectionPool(str(tmp_path / "a.db"), query_stats=stats)
+    stats.enabled = False
+    pool.connection().execute("SELECT 1")
+    assert stats.snapshot() == []
+
+    stats.enabled = True
+    pool.connection().execute("SELECT 1")
+    path = tmp_path / "diag.json"
+    stats.dump(str(path), extra={"cache": {"hits": 1}})
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["cache"] == {"hits": 1} and data["statements"][0]["count"] == 1
+    stats.reset()
+    assert stats.snapshot() == []
+    pool.close_all()
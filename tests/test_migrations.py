@@ -0,0 +1,161 @@
+import sqlite3
+
+import pytest
+
+from migrations import LATEST_VERSION, get_version, migrate
+
+# Esquema que o Main.py original criava, sem user_version
+ESQUEMA_ORIGINAL = """
+CREATE TABLE users (
+    username TEXT PRIMARY KEY, password TEXT NOT NULL, user_type TEXT NOT NULL,
+    is_approved INTEGER DEFAULT 0, approved_by TEXT, registered_at TEXT
+);
+CREATE TABLE students (
+    username TEXT PRIMARY KEY, matricula TEXT NOT NULL, nome TEXT NOT NULL,
+    data_nascimento TEXT, cpf TEXT, curso TEXT, email TEXT, telefone TEXT,
+    endereco TEXT, progresso REAL DEFAULT 0
+);
+CREATE TABLE activities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT,
+    deadline TEXT NOT NULL, created_at TEXT NOT NULL, created_by TEXT NOT NULL
+);
+CREATE TABLE submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, activity_id INTEGER NOT NULL,
+    student_username TEXT NOT NULL, submission_date TEXT NOT NULL,
+    file_path TEXT NOT NULL, grade REAL, feedback TEXT
+);
+"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "academic.db"))
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def add_student(conn, username):
+    conn.execute("INSERT INTO users VALUES (?, 'x', 'aluno', 1, 'admin', '2024-01-01')", (username,))
+    conn.execute("INSERT INTO students (username, matricula, nome) VALUES (?, ?, ?)",
+                 (username, "M" + username, username.title()))
+
+
+def add_activity(conn, title):
+    return conn.execute(
+        "INSERT INTO activities (title, deadline, created_at, created_by) "
+        "VALUES (?, '2024-12-31', '2024-01-01', 'prof')", (title,)
+    ).lastrowid
+
+
+def upsert_submission(conn, activity_id, username, date="2024-06-01 10:00:00"):
+    # Mesmo upsert do submit_activity: reenviar substitui a entrega
+    conn.execute("""
+        INSERT INTO submissions (activity_id, student_username, submission_date, file_path)
+        VALUES (?, ?, ?, 'arquivo.pdf')
+        ON CONFLICT(activity_id, student_username) DO UPDATE SET
+            submission_date = excluded.submission_date
+    """, (activity_id, username, date))
+
+
+def counter(conn):
+    return conn.execute("SELECT value FROM counters WHERE name = 'activities'").fetchone()[0]
+
+
+def progress(conn):
+    return {row["username"]: (row["entregas"], row["progresso"])
+            for row in conn.execute("SELECT username, entregas, progresso FROM student_progress_view")}
+
+
+def test_fresh_database_reaches_latest_version(conn):
+    assert get_version(conn) == 0
+    assert migrate(conn) == LATEST_VERSION
+    assert get_version(conn) == LATEST_VERSION
+    assert counter(conn) == 0
+
+    # Uma segunda abertura não reaplica nada
+    assert migrate(conn) == LATEST_VERSION
+
+
+def test_counters_follow_activities_and_submissions(conn):
+    migrate(conn)
+    with conn:
+        add_student(conn, "ana")
+        add_student(conn, "bia")
+        first = add_activity(conn, "Lista 1")
+        second = add_activity(conn, "Lista 2")
+    assert counter(conn) == 2
+    assert progress(conn) == {"ana": (0, 0), "bia": (0, 0)}
+
+    with conn:
+        upsert_submission(conn, first, "ana")
+        upsert_submission(conn, second, "ana")
+        upsert_submission(conn, first, "bia")
+        # Reenvio: atualiza a linha existente e não conta de novo
+        upsert_submission(conn, first, "ana", "2024-06-02 09:00:00")
+    assert progress(conn) == {"ana": (2, 100.0), "bia": (1, 50.0)}
+
+    with conn:
+        add_activity(conn, "Lista 3")
+    assert counter(conn) == 3
+    assert progress(conn)["bia"] == (1, pytest.approx(100 / 3))
+
+
+def test_deleting_an_activity_keeps_its_submissions(conn):
+    migrate(conn)
+    with conn:
+        add_student(conn, "ana")
+        first = add_activity(conn, "Lista 1")
+        second = add_activity(conn, "Lista 2")
+        upsert_submission(conn, first, "ana")
+        conn.execute("DELETE FROM activities WHERE id = ?", (second,))
+    assert counter(conn) == 1
+    assert conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0] == 1
+
+
+def test_original_schema_is_upgraded(conn):
+    conn.executescript(ESQUEMA_ORIGINAL)
+    with conn:
+        for username in ("ana", "bia", "caio"):
+            add_student(conn, username)
+        first = add_activity(conn, "Lista 1")
+        second = add_activity(conn, "Lista 2")
+        insert = ("INSERT INTO submissions (activity_id, student_username, submission_date, file_path) "
+                  "VALUES (?, ?, ?, 'arquivo.pdf')")
+        conn.execute(insert, (first, "ana", "2024-06-01"))
+        # Entrega duplicada de versões antigas: só a mais recente fica
+        conn.execute(insert, (first, "ana", "2024-06-02"))
+        conn.execute(insert, (second, "ana", "2024-06-03"))
+        conn.execute(insert, (first, "bia", "2024-06-01"))
+
+    assert migrate(conn) == LATEST_VERSION
+    dates = [row[0] for row in conn.execute(
+        "SELECT submission_date FROM submissions WHERE student_username = 'ana' ORDER BY activity_id")]
+    assert dates == ["2024-06-02", "2024-06-03"]
+    assert counter(conn) == 2
+    assert progress(conn) == {"ana": (2, 100.0), "bia": (1, 50.0), "caio": (0, 0)}
+
+    # Os gatilhos instalados pela migração mantêm os contadores dali em diante
+    with conn:
+        third = add_activity(conn, "Lista 3")
+        upsert_submission(conn, third, "caio")
+        upsert_submission(conn, third, "caio", "2024-06-05 08:00:00")
+    assert counter(conn) == 3
+    assert progress(conn)["caio"] == (1, pytest.approx(100 / 3))
+    assert conn.execute("SELECT submitted FROM student_progress WHERE username = 'caio'").fetchone()[0] == 1
+
+
+def test_failed_step_rolls_back_and_keeps_version(conn, monkeypatch):
+    import migrations
+
+    def broken(conn):
+        conn.execute("CREATE TABLE temporaria (x)")
+        raise sqlite3.OperationalError("falha simulada")
+
+    steps = list(migrations.MIGRATIONS[:2]) + [(3, "Passo com defeito", broken)]
+    monkeypatch.setattr(migrations, "MIGRATIONS", steps)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 3)
+    with pytest.raises(sqlite3.OperationalError):
+        migrations.migrate(conn)
+    assert get_version(conn) == 2
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'temporaria'").fetchone()
@@ -0,0 +1,73 @@
+from widgets import PagedSource
+
+
+class Table:
+    """Tabela fictícia que registra cada busca feita pela fonte."""
+
+    def __init__(self, size):
+        self.keys = list(range(1, size + 1))
+        self.fetches = []
+
+    def fetch(self, after, offset, limit):
+        self.fetches.append((after, offset))
+        if after is not None:
+            offset = self.keys.index(after) + 1
+        return self.keys[offset:offset + limit]
+
+
+class ImmediateLoader:
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, channel, fn, *args, on_done=None, on_error=None):
+        self.pending.append(lambda: on_done(fn(*args)))
+
+    def run(self):
+        pending, self.pending = self.pending, []
+        for job in pending:
+            job()
+
+
+def test_rows_across_blocks_use_the_seek_key():
+    table = Table(250)
+    source = PagedSource(lambda: len(table.keys), table.fetch, seek_key=lambda row: row, block_size=100)
+
+    assert source.rows(0, 100) == list(range(1, 101))
+    assert source.rows(95, 10) == list(range(96, 106))
+    # O segundo bloco parte da última chave do primeiro, não do offset
+    assert table.fetches == [(None, 0), (100, 0)]
+    assert source.rows(240, 50) == list(range(241, 251))
+
+
+def test_only_the_most_recent_blocks_stay_in_memory():
+    table = Table(1000)
+    source = PagedSource(lambda: len(table.keys), table.fetch, block_size=100, max_blocks=2)
+    for offset in (0, 100, 200):
+        source.rows(offset, 100)
+
+    source.rows(0, 10)
+    assert len(table.fetches) == 4
+
+
+def test_loader_returns_placeholders_until_the_block_arrives():
+    table = Table(150)
+    loader = ImmediateLoader()
+    source = PagedSource(lambda: len(table.keys), table.fetch, block_size=100, loader=loader)
+    loaded = []
+    source.on_loaded = lambda: loaded.append(True)
+
+    assert source.rows(90, 20) == [None] * 20
+    loader.run()
+    assert len(loaded) == 2
+    assert source.rows(90, 20) == list(range(91, 111))
+
+
+def test_answers_from_before_invalidate_are_dropped():
+    table = Table(50)
+    loader = ImmediateLoader()
+    source = PagedSource(lambda: len(table.keys), table.fetch, block_size=100, loader=loader)
+    source.rows(0, 10)
+
+    source.invalidate()
+    loader.run()
+    assert source.rows(0, 10) == [None] * 10
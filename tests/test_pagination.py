@@ -0,0 +1,70 @@
+import pytest
+
+
+@pytest.fixture
+def classroom(system):
+    """40 alunos aprovados (com nomes repetidos) e entregas variadas em 4 atividades."""
+    conn = system.db.connection()
+    with conn:
+        for number in range(40):
+            username = f"aluno_{number:03d}"
+            conn.execute("INSERT INTO users VALUES (?, 'x', 'aluno', 1, 'admin', '2024-01-01')", (username,))
+            conn.execute("INSERT INTO students (username, matricula, nome) VALUES (?, ?, ?)",
+                         (username, f"{(number * 7) % 40:03d}", f"Aluno {number % 13}"))
+        for number in range(4):
+            conn.execute("INSERT INTO activities (title, deadline, created_at, created_by) "
+                         "VALUES (?, '2030-01-01', '2024-01-01', 'admin')", (f"Lista {number}",))
+        activities = [row[0] for row in conn.execute("SELECT id FROM activities")]
+        for number in range(40):
+            for activity_id in activities[:number % 5]:
+                conn.execute("INSERT INTO submissions (activity_id, student_username, submission_date, file_path) "
+                             "VALUES (?, ?, '2024-06-01', 'x')", (activity_id, f"aluno_{number:03d}"))
+        # Pendente: não aparece no progresso da turma
+        conn.execute("INSERT INTO users VALUES ('aluno_pendente', 'x', 'aluno', 0, NULL, '2024-01-01')")
+        conn.execute("INSERT INTO students (username, matricula, nome) VALUES ('aluno_pendente', '999', 'Aaa')")
+    system.events.publish("users_changed")
+    return system
+
+
+def pages(system, order_by, descending, limit=7):
+    rows, after = [], None
+    while True:
+        page = system.get_class_progress_page(order_by, descending, after=after, limit=limit)
+        rows.extend(page)
+        if len(page) < limit:
+            return rows
+        after = (page[-1]["sort_key"], page[-1]["username"])
+
+
+@pytest.mark.parametrize("order_by", ["nome", "matricula", "progresso"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_cover_the_full_listing(classroom, order_by, descending):
+    full = classroom.get_class_progress(order_by, descending)
+    paged = pages(classroom, order_by, descending)
+
+    assert [row["username"] for row in paged] == [row["username"] for row in full]
+    assert len(full) == 40
+    keys = [(row["sort_key"], row["username"]) for row in full]
+    assert keys == sorted(keys, reverse=descending)
+
+
+def test_offset_page_matches_keyset_page(classroom):
+    first = classroom.get_class_progress_page("nome", limit=10)
+    after = (first[-1]["sort_key"], first[-1]["username"])
+    by_key = classroom.get_class_progress_page("nome", after=after, limit=10)
+    by_offset = classroom.get_class_progress_page("nome", limit=10, offset=10)
+    assert [tuple(row) for row in by_key] == [tuple(row) for row in by_offset]
+
+
+def test_progress_columns(classroom):
+    row = next(row for row in classroom.get_class_progress() if row["username"] == "aluno_003")
+    assert (row["entregas"], row["total_atividades"], row["progresso"]) == (3, 4, 75.0)
+    assert classroom.count_approved_students() == 40
+
+
+@pytest.mark.parametrize("order_by, key", [("nome", "Aluno 5"), ("matricula", "005"), ("progresso", 2)])
+def test_page_query_walks_an_index_without_sorting(classroom, order_by, key):
+    query, params = classroom._class_progress_query(order_by, False, (key, "aluno_005"))
+    plan = " ".join(row[3] for row in classroom.db.connection().execute(
+        "EXPLAIN QUERY PLAN " + query + " LIMIT 50", params))
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan
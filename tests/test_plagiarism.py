@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from plagiarism import (candidate_pairs, extract_text, minhash, shingles, similarity,
+                        pack_signature, unpack_signature)
+
+VOCABULARY = [f"palavra{i}" for i in range(400)]
+
+
+def essay(seed, size=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(size))
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def test_minhash_estimates_jaccard():
+    original = essay(1)
+    copied = original.rsplit(" ", 60)[0] + " " + essay(2, 60)
+    a, b = shingles(original), shingles(copied)
+    estimate = similarity(minhash(a), minhash(b))
+    assert abs(estimate - jaccard(a, b)) < 0.15
+
+
+def test_shingles_ignore_case_and_accents():
+    assert shingles("Análise de Dados é ótima hoje") == shingles("analise de dados E OTIMA hoje")
+
+
+def test_signature_round_trip():
+    signature = minhash(shingles(essay(3)))
+    assert unpack_signature(pack_signature(signature)) == signature
+
+
+def test_lsh_finds_near_copies_and_skips_unrelated_texts():
+    base = essay(10)
+    signatures = {
+        "original": minhash(shingles(base)),
+        "copia": minhash(shingles(base.replace("palavra1 ", "palavra2 ", 3))),
+        "outro": minhash(shingles(essay(11))),
+    }
+    pairs = candidate_pairs(signatures)
+    assert ("copia", "original") in pairs
+    assert not {pair for pair in pairs if "outro" in pair}
+
+
+def test_extract_text_from_plain_text_and_broken_docx():
+    assert extract_text("olá mundo".encode("utf-8"), "a.txt") == "olá mundo"
+    assert extract_text(b"PK\x03\x04 corrompido", "a.docx") == ""
+
+
+def test_screening_reports_copied_submissions(system, student, tmp_path):
+    username, activity_id = student
+    for matricula in ("2024002", "2024003"):
+        system.register_student({"matricula": matricula, "nome": "Aluno " + matricula, "cpf": "0"})
+    system.approve_students(["aluno_2024002", "aluno_2024003"], "admin")
+
+    base = essay(20)
+    texts = {username: base, "aluno_2024002": base + " fim", "aluno_2024003": essay(21)}
+    for student_username, text in texts.items():
+        path = tmp_path / f"{student_username}.txt"
+        path.write_text(text, encoding="utf-8")
+        system.submit_activity(activity_id, student_username, str(path))
+
+    pairs = system.screen_similarity(activity_id, threshold=0.5)
+
+    assert len(pairs) == 1
+    first, second, score = pairs[0]
+    assert {first["student_username"], second["student_username"]} == {username, "aluno_2024002"}
+    assert score == pytest.approx(1.0, abs=0.1)
@@ -0,0 +1,64 @@
+import io
+import os
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image  # noqa: E402
+
+from previews import ThumbnailCache, render_first_page  # noqa: E402
+from storage import BlobStore  # noqa: E402
+
+
+def png_bytes(size=(800, 600), color="red"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_images_are_scaled_to_the_thumbnail_box():
+    image = render_first_page(png_bytes(), "foto.png", size=(200, 200))
+    assert image.size == (200, 150)
+    assert image.getpixel((100, 75)) == (255, 0, 0)
+
+
+def test_text_and_binary_files_render_as_a_page():
+    assert render_first_page(b"Resumo do trabalho\nlinha 2", "a.txt", size=(120, 160)).size == (120, 160)
+    assert render_first_page(os.urandom(4096), "a.bin", size=(120, 160)).size == (120, 160)
+
+
+def test_cache_renders_once_and_evicts_least_recent(tmp_path):
+    blobs = BlobStore(str(tmp_path / "blobs"), compression=False)
+    hashes = []
+    for color in ("red", "green", "blue"):
+        source = tmp_path / f"{color}.png"
+        source.write_bytes(png_bytes(color=color))
+        hashes.append(blobs.put(str(source))[0])
+
+    cache = ThumbnailCache(root=str(tmp_path / "thumbs"), size=(100, 100))
+    first = cache.get(hashes[0], "red.png", blobs)
+    mtime = os.path.getmtime(first)
+    os.utime(first, (mtime - 100, mtime - 100))
+    assert cache.get(hashes[0], "red.png", blobs) == first
+    assert os.path.getmtime(first) > mtime - 100   # acesso renova o mtime
+
+    # Limite para pouco mais de duas miniaturas: a menos usada sai
+    cache.max_bytes = os.path.getsize(first) * 2.5
+    os.utime(first, (mtime - 100, mtime - 100))
+    cache.prefetch([(hashes[1], "green.png"), (hashes[2], "blue.png")], blobs)
+    assert not os.path.exists(first)
+    assert all(os.path.exists(cache.path_for(blob_hash)) for blob_hash in hashes[1:])
+
+
+def test_service_preview(system, student, tmp_path):
+    username, activity_id = student
+    source = tmp_path / "foto.png"
+    source.write_bytes(png_bytes())
+    system.submit_activity(activity_id, username, str(source))
+    system._thumbnails = ThumbnailCache(root=str(tmp_path / "thumbs"))
+
+    (submission,) = system.get_activity_submissions(activity_id)
+    path = system.get_submission_preview(submission)
+    with Image.open(path) as image:
+        assert image.format == "PNG" and max(image.size) <= 560
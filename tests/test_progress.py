@@ -0,0 +1,45 @@
+def submit(system, activity_id, username, tmp_path, content=b"resposta"):
+    path = tmp_path / f"{username}-{activity_id}.txt"
+    path.write_bytes(content)
+    assert system.submit_activity(activity_id, username, str(path))[0]
+
+
+def test_progress_follows_submissions_and_activities(system, student, tmp_path):
+    username, first = student
+    assert system.get_student_progress(username)["progresso"] == 0
+
+    submit(system, first, username, tmp_path)
+    assert system.get_student_progress(username)["progresso"] == 100.0
+
+    # Reenvio não conta duas vezes
+    submit(system, first, username, tmp_path, b"segunda versao")
+    assert system.get_student_progress(username)["progresso"] == 100.0
+
+    system.create_activity("Lista 2", "", "2031-01-31", "admin")
+    assert system.get_student_progress(username)["progresso"] == 50.0
+
+    second = [row["id"] for row in system.get_activities() if row["id"] != first][0]
+    submit(system, second, username, tmp_path)
+    assert system.get_student_progress(username)["progresso"] == 100.0
+
+
+def test_progress_matches_a_full_recount(system, student, tmp_path):
+    username, first = student
+    for matricula in ("2024002", "2024003"):
+        system.register_student({"matricula": matricula, "nome": "Aluno " + matricula, "cpf": "0"})
+    system.approve_students(["aluno_2024002", "aluno_2024003"], "admin")
+    system.create_activity("Lista 2", "", "2031-01-31", "admin")
+    activities = [row["id"] for row in system.get_activities()]
+    submit(system, activities[0], username, tmp_path)
+    submit(system, activities[1], username, tmp_path)
+    submit(system, activities[1], "aluno_2024002", tmp_path)
+    system.reject_users(["aluno_2024003"])
+
+    conn = system.db.connection()
+    recount = dict(conn.execute("""
+        SELECT st.username, COUNT(s.id) * 100.0 / (SELECT COUNT(*) FROM activities)
+        FROM students st LEFT JOIN submissions s ON s.student_username = st.username
+        GROUP BY st.username
+    """).fetchall())
+    assert recount == {row["username"]: row["progresso"] for row in system.get_class_progress()}
+    assert recount == {username: 100.0, "aluno_2024002": 50.0}
@@ -0,0 +1,70 @@
+from widgets import TreeReconciler
+
+
+class FakeTree:
+    """O suficiente da Treeview para contar as operações feitas."""
+
+    def __init__(self):
+        self.items = {}
+        self.order = []
+        self.operations = []
+
+    def insert(self, parent, index, iid, values):
+        self.items[iid] = values
+        self.order.insert(index, iid)
+        self.operations.append(("insert", iid))
+
+    def item(self, iid, values):
+        self.items[iid] = values
+        self.operations.append(("item", iid))
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.items[iid]
+            self.order.remove(iid)
+        self.operations.append(("delete",) + iids)
+
+    def move(self, iid, parent, index):
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+        self.operations.append(("move", iid))
+
+    def get_children(self):
+        return tuple(self.order)
+
+
+def reconciler():
+    tree = FakeTree()
+    return tree, TreeReconciler(tree, key=lambda row: row["id"], format_row=lambda row: (row["title"],))
+
+
+def test_unchanged_rows_are_not_touched():
+    tree, sync = reconciler()
+    rows = [{"id": 1, "title": "Lista 1"}, {"id": 2, "title": "Lista 2"}]
+    assert sync.apply(rows) == 2
+
+    tree.operations.clear()
+    assert sync.apply([dict(row) for row in rows]) == 0
+    assert tree.operations == []
+
+
+def test_only_the_differences_are_applied():
+    tree, sync = reconciler()
+    sync.apply([{"id": 1, "title": "Lista 1"}, {"id": 2, "title": "Lista 2"}, {"id": 3, "title": "Prova"}])
+    tree.operations.clear()
+
+    changes = sync.apply([{"id": 1, "title": "Lista 1"}, {"id": 3, "title": "Prova final"}, {"id": 4, "title": "Lista 3"}])
+
+    assert changes == 3
+    assert sorted(tree.operations) == [("delete", "2"), ("insert", "4"), ("item", "3")]
+    assert tree.items == {"1": ("Lista 1",), "3": ("Prova final",), "4": ("Lista 3",)}
+    assert sync.row("3")["title"] == "Prova final"
+
+
+def test_new_order_is_followed():
+    tree, sync = reconciler()
+    rows = [{"id": n, "title": f"Lista {n}"} for n in (1, 2, 3)]
+    sync.apply(rows)
+
+    assert sync.apply(rows[::-1]) == 0
+    assert tree.get_children() == ("3", "2", "1")
@@ -0,0 +1,68 @@
+import pytest
+
+import search
+
+
+@pytest.fixture
+def people(system):
+    for matricula, nome, curso in (("3001", "João Silva", "Computação"), ("3002", "Joana Dias", "Direito"),
+                                   ("3003", "Pedro Alves", "Computação")):
+        system.register_student({"matricula": matricula, "nome": nome, "cpf": "0", "curso": curso})
+    system.approve_students(["aluno_3001", "aluno_3002"], "admin")
+    system.create_activity("Relatório de Redes", "Topologias e roteamento", "2030-05-01", "admin")
+    system.create_activity("Lista de Cálculo", "Derivadas", "2030-06-01", "admin")
+    return system
+
+
+def names(rows):
+    return sorted(row["nome"] for row in rows)
+
+
+def test_terms_and_match_query_escape_operators():
+    assert search.terms("João, NEAR -silva") == ["João", "NEAR", "silva"]
+    assert search.match_query('jo "x" OR') == '"jo"* "x"* "OR"*'
+    assert search.search_students(None, "  ,. ") == []
+
+
+def test_students_by_prefix_only_approved(people):
+    assert names(people.search_students("jo")) == ["Joana Dias", "João Silva"]
+    assert names(people.search_students("joão sil")) == ["João Silva"]
+    # Pedro ainda não foi aprovado
+    assert people.search_students("pedro") == []
+    assert names(people.search_students("computação")) == ["João Silva"]
+
+
+def test_accents_are_ignored_with_fts(people):
+    if not search.has_fts(people.db.connection()):
+        pytest.skip("SQLite sem FTS5")
+    assert names(people.search_students("joao")) == ["João Silva"]
+    assert [row["title"] for row in people.search_activities("calculo")] == ["Lista de Cálculo"]
+
+
+def test_activities_and_feedback(people, tmp_path):
+    assert [row["title"] for row in people.search_activities("roteamento")] == ["Relatório de Redes"]
+
+    activity_id = people.search_activities("redes")[0]["id"]
+    path = tmp_path / "t.txt"
+    path.write_text("resposta")
+    people.submit_activity(activity_id, "aluno_3001", str(path))
+    submission_id = people.get_activity_submissions(activity_id)[0]["id"]
+    people.grade_submission(submission_id, 7.0, "Faltou explicar a máscara de sub-rede")
+
+    (row,) = people.search_feedback("mascara sub")
+    assert row["student_username"] == "aluno_3001" and row["title"] == "Relatório de Redes"
+
+
+def test_like_fallback_without_fts(people, monkeypatch):
+    monkeypatch.setattr(search, "has_fts", lambda conn, table="students_fts": False)
+    assert names(people.search_students("jo")) == ["Joana Dias", "João Silva"]
+    assert [row["title"] for row in people.search_activities("derivadas")] == ["Lista de Cálculo"]
+
+
+def test_index_follows_edits_and_rebuild(people):
+    conn = people.db.connection()
+    with conn:
+        conn.execute("UPDATE students SET nome = 'Joaquim Silva' WHERE username = 'aluno_3001'")
+    assert names(people.search_students("joaquim")) == ["Joaquim Silva"]
+    search.rebuild_index(conn)
+    assert names(people.search_students("joaquim")) == ["Joaquim Silva"]
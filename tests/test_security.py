@@ -0,0 +1,85 @@
+import hashlib
+
+import pytest
+
+from security import PasswordHasher, SessionCache
+
+CHEAP = 2 ** 10
+
+
+def test_scrypt_hash_and_verify():
+    hasher = PasswordHasher(n=CHEAP)
+    encoded = hasher.hash("segredo")
+    assert encoded.startswith(f"scrypt${CHEAP}$8$1$")
+    assert hasher.verify("segredo", encoded)
+    assert not hasher.verify("Segredo", encoded)
+    # Sal aleatório: o mesmo texto gera hashes diferentes
+    assert hasher.hash("segredo") != encoded
+
+
+def test_rehash_when_cost_changes_or_password_is_plain_text():
+    old = PasswordHasher(n=CHEAP).hash("segredo")
+    current = PasswordHasher(n=CHEAP * 2)
+    assert current.verify("segredo", old)
+    assert current.needs_rehash(old)
+    assert not current.needs_rehash(current.hash("segredo"))
+    # Senha antiga, gravada em texto puro
+    assert current.verify("admin123", "admin123")
+    assert current.needs_rehash("admin123")
+
+
+def test_pbkdf2_fallback():
+    hasher = PasswordHasher(iterations=1000)
+    hasher.algorithm = "pbkdf2_sha256"
+    encoded = hasher.hash("segredo")
+    assert encoded.startswith("pbkdf2_sha256$1000$")
+    assert hasher.verify("segredo", encoded)
+    assert PasswordHasher(n=CHEAP).verify("segredo", encoded)
+    assert hasher.needs_rehash(PasswordHasher(n=CHEAP).hash("segredo"))
+
+
+def test_with_cost_never_raises_the_cost():
+    hasher = PasswordHasher(n=2 ** 14, iterations=100000)
+    cheaper = hasher.with_cost(2 ** 12, 20000)
+    assert (cheaper.n, cheaper.iterations) == (2 ** 12, 20000)
+    assert hasher.with_cost(2 ** 16, 10 ** 6).n == 2 ** 14
+
+
+def test_session_cache(monkeypatch):
+    import security
+
+    clock = [100.0]
+    monkeypatch.setattr(security.time, "monotonic", lambda: clock[0])
+    cache = SessionCache(ttl=10)
+    cache.put("ana", "segredo", {"username": "ana"})
+    assert cache.get("ana", "segredo") == {"username": "ana"}
+    assert cache.get("ana", "errada") is None
+
+    clock[0] += 11
+    assert cache.get("ana", "segredo") is None
+
+
+def test_login_upgrades_plain_text_passwords(system):
+    with system.db.connection() as conn:
+        conn.execute("INSERT INTO users VALUES ('prof', 'antiga', 'professor', 1, 'admin', '2024-01-01')")
+        conn.commit()
+
+    assert system.authenticate("prof", "antiga")["username"] == "prof"
+    stored = system.db.connection().execute("SELECT password FROM users WHERE username = 'prof'").fetchone()[0]
+    assert stored.startswith("scrypt$") and system.hasher.verify("antiga", stored)
+    assert system.authenticate("prof", "errada") is None
+
+
+def test_rejected_user_cannot_reuse_a_cached_login(system):
+    system.register_user("prof", "segredo", "professor")
+    system.approve_students(["prof"], "admin")
+    assert system.authenticate("prof", "segredo") is not None
+
+    system.reject_users(["prof"])
+    assert system.authenticate("prof", "segredo") is None
+
+
+@pytest.mark.skipif(not hasattr(hashlib, "scrypt"), reason="scrypt indisponível")
+def test_kdf_cost_is_calibrated_once_and_shared(system):
+    stored = system.db.connection().execute("SELECT value FROM settings WHERE key = 'scrypt_n'").fetchone()[0]
+    assert int(stored) == system.hasher.n == CHEAP
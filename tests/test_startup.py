@@ -0,0 +1,34 @@
+import json
+
+import startup
+
+
+def test_report_lists_each_phase_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(startup, "_marks", [])
+    monkeypatch.setattr(startup, "_STARTED", 100.0)
+    startup._marks.extend([("imports", 100.05), ("banco", 100.125), ("login", 100.2)])
+
+    data = startup.write_report(str(tmp_path / "startup_report.json"))
+
+    assert [(phase["phase"], phase["ms"]) for phase in data["phases"]] == [
+        ("imports", 50.0), ("banco", 75.0), ("login", 75.0),
+    ]
+    assert data["total_ms"] == 200.0
+    with open(tmp_path / "startup_report.json", encoding="utf-8") as f:
+        assert json.load(f)["phases"] == data["phases"]
+
+
+def test_report_without_marks(monkeypatch):
+    monkeypatch.setattr(startup, "_marks", [])
+    assert startup.report()["total_ms"] == 0.0
+
+
+def test_enabled_by_flag_or_environment(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["Main.py"])
+    monkeypatch.delenv("VCLASS_STARTUP_REPORT", raising=False)
+    assert not startup.enabled()
+    monkeypatch.setenv("VCLASS_STARTUP_REPORT", "1")
+    assert startup.enabled()
+    monkeypatch.delenv("VCLASS_STARTUP_REPORT")
+    monkeypatch.setattr("sys.argv", ["Main.py", "--startup-report"])
+    assert startup.enabled()
@@ -0,0 +1,104 @@
+import os
+import sqlite3
+
+import pytest
+
+from storage import BlobStore
+
+
+def write(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def blob_rows(system):
+    return {row["hash"]: row["refcount"] for row in system.db.connection().execute("SELECT hash, refcount FROM blobs")}
+
+
+def blob_files(system):
+    return sorted(name for _, _, names in os.walk(system.blobs.root) for name in names)
+
+
+def add_student(system, matricula):
+    system.register_student({"matricula": matricula, "nome": "Aluno " + matricula, "cpf": "0"})
+    system.approve_students(["aluno_" + matricula], "admin")
+    return "aluno_" + matricula
+
+
+def test_identical_files_share_one_blob(system, student, tmp_path):
+    username, activity_id = student
+    other = add_student(system, "2024002")
+    source = write(tmp_path / "trabalho.txt", b"mesmo conteudo " * 100)
+
+    assert system.submit_activity(activity_id, username, source)[0]
+    assert system.submit_activity(activity_id, other, source)[0]
+
+    assert list(blob_rows(system).values()) == [2]
+    assert len(blob_files(system)) == 1
+
+
+def test_resubmission_collects_the_replaced_blob(system, student, tmp_path):
+    username, activity_id = student
+    system.submit_activity(activity_id, username, write(tmp_path / "v1.txt", b"primeira versao"))
+    system.submit_activity(activity_id, username, write(tmp_path / "v2.txt", b"segunda versao"))
+
+    assert list(blob_rows(system).values()) == [1]
+    assert len(blob_files(system)) == 1
+    (submission,) = system.get_activity_submissions(activity_id)
+    with open(system.get_submission_file(submission), "rb") as f:
+        assert f.read() == b"segunda versao"
+
+
+def fail(*args):
+    raise sqlite3.OperationalError("falha simulada")
+
+
+def test_failed_transaction_removes_the_new_file(system, student, tmp_path, monkeypatch):
+    username, activity_id = student
+    monkeypatch.setattr(system.blobs, "register", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        system.submit_activity(activity_id, username, write(tmp_path / "t.txt", b"conteudo"))
+
+    assert blob_rows(system) == {}
+    assert blob_files(system) == []
+    # Nem o temporário da cópia fica para trás
+    assert not [name for name in os.listdir(system.blobs.root) if name.endswith(".part")]
+
+
+def test_failed_transaction_keeps_a_shared_file(system, student, tmp_path, monkeypatch):
+    username, activity_id = student
+    other = add_student(system, "2024002")
+    source = write(tmp_path / "t.txt", b"conteudo compartilhado")
+    system.submit_activity(activity_id, username, source)
+
+    monkeypatch.setattr(system.blobs, "register", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        system.submit_activity(activity_id, other, source)
+
+    assert list(blob_rows(system).values()) == [1]
+    assert len(blob_files(system)) == 1
+
+
+def test_full_collection_sweeps_unregistered_files(system, student, tmp_path):
+    username, activity_id = student
+    system.submit_activity(activity_id, username, write(tmp_path / "a.txt", b"registrado"))
+
+    # Arquivo publicado por uma transação que não chegou ao commit
+    temp_path, blob_hash, _, codec, stored_size = system.blobs.stage(write(tmp_path / "b.txt", b"sem registro"))
+    system.blobs.place(temp_path, blob_hash, codec, stored_size)
+    assert len(blob_files(system)) == 2
+
+    assert system.collect_orphan_blobs() == 1
+    assert not system.blobs.exists(blob_hash)
+    assert len(blob_files(system)) == 1
+
+
+def test_compressed_blob_round_trips(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    content = b"texto repetitivo que comprime bem\n" * 2000
+    blob_hash, size, codec, stored_size = store.put(write(tmp_path / "texto.txt", content))
+
+    assert codec != "raw"
+    assert size == len(content) and stored_size < size
+    assert b"".join(store.iter_content(blob_hash)) == content
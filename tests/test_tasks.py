@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+tasks = pytest.importorskip("tasks")
+
+
+class ManualRoot:
+    """Substitui o Tk: ``run()`` executa os ``after`` agendados até esvaziar."""
+
+    def __init__(self):
+        self.scheduled = []
+        self.thread = threading.current_thread()
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+    def run(self, timeout=5):
+        for _ in range(int(timeout / 0.01)):
+            if not self.scheduled:
+                return
+            callback = self.scheduled.pop(0)
+            callback()
+            threading.Event().wait(0.01)
+        raise AssertionError("o loader não parou de agendar")
+
+
+@pytest.fixture
+def loader():
+    loader = tasks.BackgroundLoader(ManualRoot(), max_workers=2, poll_ms=1)
+    yield loader
+    loader.shutdown()
+
+
+def test_results_are_delivered_on_the_ui_thread(loader):
+    received = []
+    loader.submit("canal", lambda x: x * 2, 21,
+                  on_done=lambda value: received.append((value, threading.current_thread())))
+    loader.root.run()
+    assert received == [(42, loader.root.thread)]
+
+
+def test_newer_request_on_the_same_channel_wins(loader):
+    release = threading.Event()
+    received = []
+
+    def slow():
+        release.wait(5)
+        return "antigo"
+
+    old = loader.submit("canal", slow, on_done=received.append)
+    loader.submit("canal", lambda: "novo", on_done=received.append)
+    assert old.cancelled
+    release.set()
+    loader.root.run()
+    assert received == ["novo"]
+
+
+def test_errors_go_to_on_error_and_a_broken_callback_does_not_stop_the_rest(loader):
+    errors, received = [], []
+
+    def fail():
+        raise ValueError("falhou")
+
+    loader.submit("a", fail, on_error=errors.append)
+    loader.submit("b", lambda: 1, on_done=lambda value: 1 / 0)
+    loader.submit("c", lambda: 2, on_done=received.append)
+    loader.root.run()
+    assert [str(error) for error in errors] == ["falhou"]
+    assert received == [2]
+
+
+def test_ticket_reports_progress(loader):
+    reports = []
+
+    def work(ticket):
+        for step in range(3):
+            ticket.report(reports.append, step)
+        return "fim"
+
+    loader.submit("canal", work, with_ticket=True, on_done=reports.append)
+    loader.root.run()
+    assert reports == [0, 1, 2, "fim"]
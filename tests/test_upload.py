@@ -0,0 +1,60 @@
+import hashlib
+import os
+
+import pytest
+
+from storage import CODECS, copy_to_temp
+
+
+def test_chunked_copy_hashes_and_reports_progress(tmp_path):
+    content = os.urandom(10 * 1024 + 7)
+    source = tmp_path / "entrega.bin"
+    source.write_bytes(content)
+    calls = []
+
+    temp_path, digest, size, stored = copy_to_temp(
+        str(source), str(tmp_path), lambda done, total: calls.append((done, total)), chunk_size=4096
+    )
+
+    assert digest == hashlib.sha256(content).hexdigest()
+    assert size == stored == len(content)
+    assert calls == [(4096, len(content)), (8192, len(content)), (len(content), len(content))]
+    with open(temp_path, "rb") as f:
+        assert f.read() == content
+    assert os.path.basename(temp_path).startswith(".upload-")
+
+
+def test_compressed_copy_keeps_the_hash_of_the_original(tmp_path):
+    content = b"abc" * 50000
+    source = tmp_path / "texto.txt"
+    source.write_bytes(content)
+
+    temp_path, digest, size, stored = copy_to_temp(str(source), str(tmp_path), codec=CODECS["zlib"])
+    assert digest == hashlib.sha256(content).hexdigest()
+    assert size == len(content) and stored < size
+
+
+def test_failed_copy_leaves_no_temporary(tmp_path):
+    source = tmp_path / "entrega.bin"
+    source.write_bytes(b"x" * 10000)
+
+    def cancel(done, total):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        copy_to_temp(str(source), str(tmp_path), cancel, chunk_size=1000)
+    assert sorted(os.listdir(tmp_path)) == ["entrega.bin"]
+
+
+def test_submission_receipt_is_the_content_hash(system, student, tmp_path):
+    username, activity_id = student
+    source = tmp_path / "trabalho.pdf"
+    source.write_bytes(b"%PDF-1.4 conteudo")
+    progress = []
+
+    success, message = system.submit_activity(activity_id, username, str(source),
+                                              lambda done, total: progress.append(done))
+
+    assert success
+    assert hashlib.sha256(source.read_bytes()).hexdigest()[:16] in message
+    assert progress[-1] == source.stat().st_size
@@ -1,96 +1,104 @@
+import startup  # primeiro: marca o início da contagem do tempo de abertura
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk, ImageDraw
-import sqlite3
+from tkinter import ttk, messagebox
 from datetime import datetime
 import os
-import shutil
 import sys
 
-class AcademicSystem:
+from service import AcademicService
+from widgets import VirtualTreeview, ListSource, PagedSource, TreeReconciler, SearchBox, ImagePreview
+from tasks import BackgroundLoader
+from grades import parse_grade, format_grade, write_grades_csv, read_grades_csv
+from changes import ChangeWatcher
+
+startup.mark("imports")
+
+class AcademicSystem(AcademicService):
+    """Interface Tk sobre o AcademicService (tela de login e painéis)."""
+    
     def __init__(self):
-        self.db_file = "academic.db"
-        self.initialize_db()
+        super().__init__()
+        startup.mark("database")
         self.root = tk.Tk()
+        startup.mark("tk")
+        # Consultas e cópias de arquivo dos painéis rodam fora da thread do Tk
+        self.loader = BackgroundLoader(self.root)
+        # Mudanças feitas por outras máquinas chegam aos painéis abertos
+        self.watcher = ChangeWatcher(self.db, self.root, self.events)
+        self.watcher.start()
+        startup.mark("background")
         self.setup_ui()
-        self.activities_dir = "activities"
-        self.submissions_dir = "submissions"
+        startup.mark("login_ui")
+        self.loader.submit(
+            "legacy-submissions", self.migrate_legacy_submissions,
+            on_error=lambda e: messagebox.showerror("Erro", f"Falha ao migrar entregas antigas: {e}")
+        )
+    
+    def watch_changes(self, window, tables, callback, match=None):
+        """Chama ``callback()`` quando chegam mudanças em ``tables``.
+        
+        ``match(change)`` restringe às linhas que interessam ao painel. A
+        inscrição termina sozinha quando ``window`` é fechada.
+        """
+        def on_change(changes):
+            if changes is None or any(
+                change.table in tables and (match is None or match(change)) for change in changes
+            ):
+                callback()
+        
+        unsubscribe = self.events.subscribe("db_changed", on_change)
+        window.bind("<Destroy>", lambda e: unsubscribe() if e.widget is window else None, add="+")
+    
+    def export_in_background(self, owner, label, title, initialfile, export, *args):
+        """Pergunta onde salvar e roda ``export(caminho, *args)`` fora da thread do Tk.
+        
+        O progresso aparece em ``label``; o formato (CSV, XLSX ou PDF) vem da
+        extensão escolhida.
+        """
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            title=title,
+            initialfile=initialfile,
+            defaultextension=".xlsx",
+            filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv"), ("PDF", "*.pdf")]
+        )
+        if not path:
+            return
+        
+        def run(ticket):
+            def progress(done, total):
+                text = f"Exportando... {done}/{total}" if total else f"Exportando... {done}"
+                ticket.report(label.config, {"text": text})
+            return export(path, *args, progress=progress, cancelled=lambda: ticket.cancelled)
+        
+        def done(count):
+            label.config(text=f"{count} linha(s) exportada(s)")
+            messagebox.showinfo("Sucesso", f"Relatório salvo em:\n{path}")
+        
+        def failed(error):
+            label.config(text="")
+            messagebox.showerror("Erro", f"Falha na exportação: {error}")
         
-        # Criar diretórios se não existirem
-        os.makedirs(self.activities_dir, exist_ok=True)
-        os.makedirs(self.submissions_dir, exist_ok=True)
+        label.config(text="Exportando...")
+        self.loader.submit((owner, "export"), run, with_ticket=True, on_done=done, on_error=failed)
     
-    def initialize_db(self):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            
-            # Tabela de usuários
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    username TEXT PRIMARY KEY,
-                    password TEXT NOT NULL,
-                    user_type TEXT NOT NULL,
-                    is_approved INTEGER DEFAULT 0,
-                    approved_by TEXT,
-                    registered_at TEXT
-                )
-            """)
-            
-            # Tabela de alunos
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS students (
-                    username TEXT PRIMARY KEY,
-                    matricula TEXT NOT NULL,
-                    nome TEXT NOT NULL,
-                    data_nascimento TEXT,
-                    cpf TEXT,
-                    curso TEXT,
-                    email TEXT,
-                    telefone TEXT,
-                    endereco TEXT,
-                    progresso REAL DEFAULT 0,
-                    FOREIGN KEY (username) REFERENCES users(username)
-                )
-            """)
-            
-            # Tabela de atividades
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS activities (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    deadline TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    created_by TEXT NOT NULL,
-                    FOREIGN KEY (created_by) REFERENCES users(username)
-                )
-            """)
-            
-            # Tabela de submissões
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS submissions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    activity_id INTEGER NOT NULL,
-                    student_username TEXT NOT NULL,
-                    submission_date TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    grade REAL,
-                    feedback TEXT,
-                    FOREIGN KEY (activity_id) REFERENCES activities(id),
-                    FOREIGN KEY (student_username) REFERENCES users(username)
-                )
-            """)
-            
-            # Criar admin padrão se não existir
-            cursor.execute("SELECT * FROM users WHERE username='admin'")
-            if not cursor.fetchone():
-                cursor.execute("""
-                    INSERT INTO users VALUES (
-                        'admin', 'admin123', 'admin', 1, 'system', ?
-                    )
-                """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
-            
-            conn.commit()
+    def open_submission(self, channel, submission):
+        """Abre o arquivo da entrega no programa padrão do sistema.
+        
+        Blobs comprimidos são descompactados para o cache fora da thread do Tk.
+        """
+        def show(file_path):
+            from previews import open_with_system_viewer
+            try:
+                open_with_system_viewer(file_path)
+            except OSError:
+                messagebox.showerror("Erro", "Não foi possível abrir o arquivo!")
+        
+        self.loader.submit(
+            channel, self.get_submission_file, submission,
+            on_done=show,
+            on_error=lambda e: messagebox.showerror("Erro", "Não foi possível abrir o arquivo!")
+        )
     
     def setup_ui(self):
         self.root.title("Sistema Acadêmico")
@@ -143,258 +151,80 @@ class AcademicSystem:
         ).pack(side=tk.LEFT, expand=True, padx=5)
     
     def setup_logo(self):
-        try:
-            # Caminho base diferente quando executando como script vs executável
-            if getattr(sys, 'frozen', False):
-                # Modo executável - usa sys._MEIPASS
-                base_path = sys._MEIPASS
-            else:
-                # Modo desenvolvimento - usa o diretório do script
-                base_path = os.path.dirname(os.path.abspath(__file__))
+        # Caminho base diferente quando executando como script vs executável
+        if getattr(sys, 'frozen', False):
+            # Modo executável - usa sys._MEIPASS
+            base_path = sys._MEIPASS
+        else:
+            # Modo desenvolvimento - usa o diretório do script
+            base_path = os.path.dirname(os.path.abspath(__file__))
         
-            # Caminho para a logo
-            logo_path = os.path.join(base_path, 'vclass', 'logo.png')
+        try:
+            # Logo já reduzida para 200x200: o Tk lê o PNG direto, sem
+            # importar o Pillow nem redimensionar a cada abertura
+            self.logo = tk.PhotoImage(file=os.path.join(base_path, 'vclass', 'logo_200.png'))
+        except tk.TclError:
+            self.logo = self.render_logo(os.path.join(base_path, 'vclass', 'logo.png'))
         
-            img = Image.open(logo_path)
-            img = img.resize((200, 200), Image.Resampling.LANCZOS)
-            self.logo = ImageTk.PhotoImage(img)
+        if self.logo is not None:
             logo_label = tk.Label(self.root, image=self.logo)
             logo_label.pack(pady=20)
-        
+        else:
+            # Fallback - cria uma logo simples
+            canvas = tk.Canvas(self.root, width=200, height=200, bg="lightgray", highlightthickness=0)
+            canvas.create_text(100, 100, text="LOGO AQUI", fill="black")
+            canvas.pack(pady=20)
+    
+    def render_logo(self, logo_path):
+        """Redimensiona a logo original (só quando falta a versão pronta)."""
+        try:
+            from PIL import Image, ImageTk
+            img = Image.open(logo_path)
+            img = img.resize((200, 200), Image.Resampling.LANCZOS)
+            return ImageTk.PhotoImage(img)
         except Exception as e:
             print(f"Erro ao carregar logo: {str(e)}")
-            # Fallback - cria uma logo simples
-            img = Image.new('RGB', (200, 200), color='lightgray')
-            draw = ImageDraw.Draw(img)
-            draw.text((50, 90), "LOGO AQUI", fill="black")
-            self.logo = ImageTk.PhotoImage(img)
-            logo_label = tk.Label(self.root, image=self.logo)
-            logo_label.pack(pady=20)
+            return None
     
     def login(self):
         username = self.username_entry.get()
         password = self.password_entry.get()
         
-        with sqlite3.connect(self.db_file) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM users 
-                WHERE username=? AND password=? AND is_approved=1
-            """, (username, password))
-            
-            user = cursor.fetchone()
-            
-            if user:
-                messagebox.showinfo("Sucesso", f"Bem-vindo, {username}!")
-                self.root.withdraw()
-                
-                if user["user_type"] == "admin":
-                    AdminPanel(self)
-                elif user["user_type"] == "professor":
-                    ProfessorMainPanel(self, username)
-                elif user["user_type"] == "aluno":
-                    StudentPanel(self, username)
-            else:
-                messagebox.showerror("Erro", "Credenciais inválidas ou conta não aprovada!")
-    
-    def register_user(self, username, password, user_type):
-        try:
-            with sqlite3.connect(self.db_file) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO users (username, password, user_type, registered_at)
-                    VALUES (?, ?, ?, ?)
-                """, (username, password, user_type, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-                conn.commit()
-                return True, "Solicitação enviada com sucesso!"
-        except sqlite3.IntegrityError:
-            return False, "Usuário já existe!"
-    
-    def register_student(self, student_data):
-        try:
-            username = f"aluno_{student_data['matricula']}"
+        user = self.authenticate(username, password)
         
-            with sqlite3.connect(self.db_file) as conn:
-                cursor = conn.cursor()
-            
-                # Primeiro cria o usuário
-                cursor.execute("""
-                    INSERT INTO users (username, password, user_type, registered_at)
-                    VALUES (?, ?, ?, ?)
-                """, (username, student_data["cpf"], "aluno", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-            
-                # Depois insere os dados do aluno (agora com as colunas explicitas)
-                cursor.execute("""
-                    INSERT INTO students (
-                        username, matricula, nome, data_nascimento, cpf, 
-                        curso, email, telefone, endereco
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                username,
-                    student_data["matricula"],
-                    student_data["nome"],
-                    student_data.get("data_nascimento", ""),
-                    student_data.get("cpf", ""),
-                    student_data.get("curso", ""),
-                    student_data.get("email", ""),
-                    student_data.get("telefone", ""),
-                    student_data.get("endereco", "")
-                ))
+        if user:
+            messagebox.showinfo("Sucesso", f"Bem-vindo, {username}!")
+            self.root.withdraw()
             
-                conn.commit()
-                return True, f"Registro de aluno {student_data['nome']} solicitado com sucesso!"
-        except sqlite3.IntegrityError:
-            return False, "Matrícula já cadastrada!"
-    
-    def get_pending_students(self):
-        with sqlite3.connect(self.db_file) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT s.* FROM students s
-                JOIN users u ON s.username = u.username
-                WHERE u.is_approved = 0
-            """)
-            return cursor.fetchall()
-    
-    def approve_student(self, username, approved_by):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE users 
-                SET is_approved=1, approved_by=?
-                WHERE username=?
-            """, (approved_by, username))
-            conn.commit()
-            return True, f"Aluno {username} aprovado com sucesso!"
-    
-    def create_activity(self, title, description, deadline, professor_username):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO activities (title, description, deadline, created_at, created_by)
-                VALUES (?, ?, ?, ?, ?)
-            """, (title, description, deadline, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), professor_username))
-            conn.commit()
-            return True, "Atividade criada com sucesso!"
-    
-    def get_activities_for_student(self, student_username):
-        with sqlite3.connect(self.db_file) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT a.*, 
-                       CASE WHEN s.id IS NOT NULL THEN 1 ELSE 0 END as submitted,
-                       s.grade,
-                       s.feedback
-                FROM activities a
-                LEFT JOIN submissions s ON a.id = s.activity_id AND s.student_username = ?
-                ORDER BY a.deadline
-            """, (student_username,))
-            return cursor.fetchall()
-    
-    def submit_activity(self, activity_id, student_username, file_path):
-        # Copiar arquivo para o diretório de submissões
-        submission_dir = os.path.join(self.submissions_dir, f"activity_{activity_id}")
-        os.makedirs(submission_dir, exist_ok=True)
-        
-        filename = f"{student_username}_{os.path.basename(file_path)}"
-        dest_path = os.path.join(submission_dir, filename)
-        shutil.copyfile(file_path, dest_path)
-        
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            
-            # Verificar se já existe uma submissão
-            cursor.execute("""
-                SELECT id FROM submissions 
-                WHERE activity_id=? AND student_username=?
-            """, (activity_id, student_username))
-            
-            if cursor.fetchone():
-                cursor.execute("""
-                    UPDATE submissions
-                    SET submission_date=?, file_path=?
-                    WHERE activity_id=? AND student_username=?
-                """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), dest_path, activity_id, student_username))
-            else:
-                cursor.execute("""
-                    INSERT INTO submissions (activity_id, student_username, submission_date, file_path)
-                    VALUES (?, ?, ?, ?)
-                """, (activity_id, student_username, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), dest_path))
-            
-            # Atualizar progresso do aluno
-            cursor.execute("""
-                UPDATE students
-                SET progresso = (
-                    SELECT COUNT(DISTINCT activity_id) * 100.0 / 
-                           (SELECT COUNT(*) FROM activities)
-                    FROM submissions
-                    WHERE student_username = ?
-                )
-                WHERE username = ?
-            """, (student_username, student_username))
-            
-            conn.commit()
-            return True, "Atividade entregue com sucesso!"
-    
-    def get_all_students(self):
-        with sqlite3.connect(self.db_file) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT s.* FROM students s
-                JOIN users u ON s.username = u.username
-                WHERE u.is_approved = 1
-                ORDER BY s.nome
-            """)
-            return cursor.fetchall()
-    
-    def get_student_submissions(self, student_username):
-        with sqlite3.connect(self.db_file) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT a.title, a.deadline, s.submission_date, s.file_path, s.grade, s.feedback
-                FROM submissions s
-                JOIN activities a ON s.activity_id = a.id
-                WHERE s.student_username = ?
-                ORDER BY a.deadline
-            """, (student_username,))
-            return cursor.fetchall()
-    
-    def get_class_progress(self):
-        with sqlite3.connect(self.db_file) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT s.nome, s.matricula, s.progresso,
-                       (SELECT COUNT(*) FROM submissions WHERE student_username = s.username) as entregas,
-                       (SELECT COUNT(*) FROM activities) as total_atividades
-                FROM students s
-                JOIN users u ON s.username = u.username
-                WHERE u.is_approved = 1
-                ORDER BY s.nome
-            """)
-            return cursor.fetchall()
-    
-    def grade_submission(self, student_username, activity_title, grade, feedback):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE submissions
-                SET grade = ?, feedback = ?
-                WHERE student_username = ? AND activity_id = (
-                    SELECT id FROM activities WHERE title = ?
-                )
-            """, (grade, feedback, student_username, activity_title))
-            conn.commit()
-            return True, "Nota atribuída com sucesso!"
+            if user["user_type"] == "admin":
+                AdminPanel(self)
+            elif user["user_type"] == "professor":
+                ProfessorMainPanel(self, username)
+            elif user["user_type"] == "aluno":
+                StudentPanel(self, username)
+        else:
+            messagebox.showerror("Erro", "Credenciais inválidas ou conta não aprovada!")
+    
+    def report_startup(self):
+        # A janela de login aparece no primeiro <Map>, já dentro do mainloop
+        def on_map(event):
+            if event.widget is self.root:
+                self.root.unbind("<Map>", binding)
+                startup.mark("login_window")
+                startup.write_report()
+        
+        binding = self.root.bind("<Map>", on_map, add="+")
     
     def run(self):
         """Inicia o loop principal da aplicação"""
-        self.root.mainloop()
+        if startup.enabled():
+            self.report_startup()
+        try:
+            self.root.mainloop()
+        finally:
+            self.watcher.stop()
+            self.loader.shutdown()
+            self.db.close_all()
 
 class RegisterScreen:
     def __init__(self, system, user_type):
@@ -517,6 +347,7 @@ class AdminPanel:
         self.window.geometry("1000x600")
         
         self.setup_ui()
+        self.system.watch_changes(self.window, ("users",), self.load_requests)
     
     def setup_ui(self):
         notebook = ttk.Notebook(self.window)
@@ -526,9 +357,38 @@ class AdminPanel:
         approval_frame = ttk.Frame(notebook)
         notebook.add(approval_frame, text="Aprovar Cadastros")
         
-        self.tree = ttk.Treeview(approval_frame, columns=("username", "type"), show="headings")
+        # Filtros por tipo e por data de cadastro
+        filter_frame = tk.Frame(approval_frame)
+        filter_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        tk.Label(filter_frame, text="Tipo:").pack(side=tk.LEFT)
+        self.type_filter = ttk.Combobox(filter_frame, values=("Todos", "aluno", "professor"),
+                                        state="readonly", width=12)
+        self.type_filter.set("Todos")
+        self.type_filter.pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(filter_frame, text="Cadastro de (AAAA-MM-DD):").pack(side=tk.LEFT, padx=(10, 0))
+        self.date_from = tk.Entry(filter_frame, width=12)
+        self.date_from.pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(filter_frame, text="até:").pack(side=tk.LEFT)
+        self.date_until = tk.Entry(filter_frame, width=12)
+        self.date_until.pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(filter_frame, text="Filtrar", command=self.load_requests).pack(side=tk.LEFT, padx=5)
+        tk.Button(filter_frame, text="Selecionar Todos", command=self.select_all).pack(side=tk.RIGHT)
+        
+        self.pending = []
+        self.tree = VirtualTreeview(
+            approval_frame,
+            columns=("username", "type", "registered"),
+            format_row=lambda user: (user["username"], user["user_type"], user["registered_at"] or ""),
+            key=lambda user: user["username"],
+            selectmode="extended"
+        )
         self.tree.heading("username", text="Usuário")
         self.tree.heading("type", text="Tipo")
+        self.tree.heading("registered", text="Cadastrado em")
         self.tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
         
         btn_frame = tk.Frame(approval_frame)
@@ -550,61 +410,212 @@ class AdminPanel:
             fg="white"
         ).pack(side=tk.LEFT, expand=True, padx=5)
         
-        tk.Button(
+        self.import_button = tk.Button(
             btn_frame,
-            text="Atualizar",
-            command=self.load_requests,
-            bg="#2196F3",
+            text="Importar Alunos (CSV/XLSX)",
+            command=self.import_students,
+            bg="#FF9800",
             fg="white"
-        ).pack(side=tk.LEFT, expand=True, padx=5)
+        )
+        self.import_button.pack(side=tk.LEFT, expand=True, padx=5)
+        
+        self.status_label = tk.Label(approval_frame, anchor="w")
+        self.status_label.pack(fill=tk.X, padx=10)
         
+        self.setup_diagnostics(notebook)
         self.load_requests()
     
+    def setup_diagnostics(self, notebook):
+        # Aba de diagnóstico: consultas SQL agregadas e cache de consultas
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text="Diagnóstico")
+        
+        top = tk.Frame(frame)
+        top.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        tk.Label(top, text="Lenta acima de (ms):").pack(side=tk.LEFT)
+        self.slow_entry = tk.Entry(top, width=8)
+        self.slow_entry.insert(0, str(self.system.query_stats.slow_ms))
+        self.slow_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(top, text="Aplicar", command=self.set_slow_threshold).pack(side=tk.LEFT)
+        
+        tk.Button(top, text="Salvar Relatório", command=self.save_diagnostics).pack(side=tk.RIGHT)
+        tk.Button(top, text="Limpar Arquivos Órfãos", command=self.collect_orphans).pack(side=tk.RIGHT, padx=5)
+        tk.Button(top, text="Zerar", command=self.reset_diagnostics).pack(side=tk.RIGHT, padx=5)
+        tk.Button(top, text="Atualizar", command=self.refresh_diagnostics).pack(side=tk.RIGHT)
+        
+        columns = ("count", "total", "avg", "max", "rows", "slow", "caller", "sql")
+        self.stats_tree = ttk.Treeview(frame, columns=columns, show="headings")
+        for column, text, width in (
+            ("count", "Execuções", 80), ("total", "Total (ms)", 90), ("avg", "Média (ms)", 90),
+            ("max", "Máx. (ms)", 80), ("rows", "Linhas", 80), ("slow", "Lentas", 60),
+            ("caller", "Origem", 220), ("sql", "SQL", 500),
+        ):
+            self.stats_tree.heading(column, text=text)
+            self.stats_tree.column(column, width=width, stretch=column == "sql")
+        self.stats_tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        
+        self.cache_label = tk.Label(frame, anchor="w")
+        self.cache_label.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        self.refresh_diagnostics()
+    
+    def refresh_diagnostics(self):
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        for stats in self.system.get_query_stats():
+            callers = stats["callers"]
+            caller = max(callers, key=callers.get) if callers else ""
+            self.stats_tree.insert("", tk.END, values=(
+                stats["count"], f"{stats['total_ms']:.1f}", f"{stats['avg_ms']:.3f}",
+                f"{stats['max_ms']:.1f}", stats["rows"], stats["slow"], caller, stats["fingerprint"]
+            ))
+        
+        cache = self.system.get_cache_stats()
+        self.cache_label.config(text=(
+            f"Cache de consultas: {cache['entries']} entradas, {cache['hit_rate']:.0%} de acertos "
+            f"({cache['hits']} acertos, {cache['misses']} faltas, {cache['invalidations']} invalidações)"
+        ))
+    
+    def set_slow_threshold(self):
+        try:
+            slow_ms = float(self.slow_entry.get().replace(",", "."))
+        except ValueError:
+            messagebox.showerror("Erro", "Informe o limite em milissegundos!")
+            return
+        self.system.query_stats.slow_ms = slow_ms
+        messagebox.showinfo("Sucesso", f"Consultas acima de {slow_ms:g} ms serão registradas em\n"
+                                       f"{self.system.query_stats.log_path}")
+    
+    def reset_diagnostics(self):
+        self.system.query_stats.reset()
+        self.refresh_diagnostics()
+    
+    def save_diagnostics(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            title="Salvar relatório de diagnóstico",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")]
+        )
+        if path:
+            self.system.dump_diagnostics(path)
+            messagebox.showinfo("Sucesso", "Relatório salvo!")
+    
+    def collect_orphans(self):
+        # Varre o repositório inteiro: fora da thread do Tk
+        self.system.loader.submit(
+            (self, "orphans"), self.system.collect_orphan_blobs,
+            on_done=lambda removed: messagebox.showinfo("Sucesso", f"{removed} arquivo(s) órfão(s) removido(s)!")
+        )
+    
     def load_requests(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        with sqlite3.connect(self.system.db_file) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT username, user_type FROM users WHERE is_approved=0
-            """)
-            
-            for user in cursor.fetchall():
-                self.tree.insert("", tk.END, values=(user["username"], user["user_type"]))
+        user_type = self.type_filter.get()
+        filters = (
+            None if user_type == "Todos" else user_type,
+            self.date_from.get().strip() or None,
+            self.date_until.get().strip() or None
+        )
+        self.system.loader.submit(
+            (self, "requests"), self.system.get_pending_users, *filters,
+            on_done=self.show_requests
+        )
+    
+    def show_requests(self, users):
+        self.pending = users
+        self.tree.set_source(ListSource(users), reset=False)
+        self.status_label.config(text=f"{len(users)} cadastro(s) pendente(s)")
+    
+    def select_all(self):
+        self.tree.select_rows(self.pending)
+    
+    def remove_requests(self, usernames):
+        # Atualização incremental: tira da lista só as linhas processadas,
+        # sem consultar o banco de novo
+        done = set(usernames)
+        self.tree.clear_selection()
+        self.show_requests([user for user in self.pending if user["username"] not in done])
+    
+    def import_students(self):
+        from tkinter import filedialog
+        file_path = filedialog.askopenfilename(
+            title="Selecione a planilha de alunos",
+            filetypes=[("Planilhas", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if not file_path:
+            return
+        
+        auto_approve = messagebox.askyesno("Importar Alunos", "Aprovar automaticamente os alunos importados?")
+        
+        self.import_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Importando...")
+        self.system.loader.submit(
+            (self, "import"), self.run_import, file_path, auto_approve,
+            with_ticket=True,
+            on_done=self.finish_import,
+            on_error=self.import_failed
+        )
+    
+    def run_import(self, ticket, file_path, auto_approve):
+        def progress(imported, errors):
+            ticket.report(self.status_label.config,
+                          {"text": f"Importando... {imported} alunos, {errors} erros"})
+        
+        return self.system.import_students(file_path, auto_approve, "admin", progress)
+    
+    def import_failed(self, error):
+        self.import_button.config(state=tk.NORMAL)
+        self.status_label.config(text="")
+        messagebox.showerror("Erro", f"Falha na importação: {error}")
+    
+    def finish_import(self, report):
+        self.import_button.config(state=tk.NORMAL)
+        self.status_label.config(text=f"{report.imported} alunos importados, {len(report.errors)} erros")
+        self.load_requests()
+        
+        if not report.errors:
+            messagebox.showinfo("Sucesso", f"{report.imported} alunos importados!")
+            return
+        
+        if messagebox.askyesno(
+            "Importação concluída",
+            f"{report.imported} alunos importados e {len(report.errors)} linhas com erro.\n"
+            "Deseja salvar o relatório de erros?"
+        ):
+            from tkinter import filedialog
+            report_path = filedialog.asksaveasfilename(
+                title="Salvar relatório de erros",
+                defaultextension=".csv",
+                filetypes=[("CSV", "*.csv")]
+            )
+            if report_path:
+                report.write_csv(report_path)
     
     def approve_user(self):
-        selected = self.tree.focus()
-        if not selected:
+        usernames = [user["username"] for user in self.tree.selected_rows()]
+        if not usernames:
             messagebox.showwarning("Aviso", "Selecione um usuário!")
             return
         
-        username = self.tree.item(selected)["values"][0]
-        
-        success, message = self.system.approve_student(username, "admin")
+        success, message = self.system.approve_students(usernames, "admin")
+        if success:
+            self.remove_requests(usernames)
         messagebox.showinfo("Sucesso" if success else "Erro", message)
-        self.load_requests()
     
     def reject_user(self):
-        selected = self.tree.focus()
-        if not selected:
+        usernames = [user["username"] for user in self.tree.selected_rows()]
+        if not usernames:
             messagebox.showwarning("Aviso", "Selecione um usuário!")
             return
         
-        username = self.tree.item(selected)["values"][0]
-        
-        with sqlite3.connect(self.system.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM users WHERE username=?", (username,))
-            
-            if username.startswith("aluno_"):
-                cursor.execute("DELETE FROM students WHERE username=?", (username,))
-            
-            conn.commit()
+        if len(usernames) > 1 and not messagebox.askyesno(
+            "Confirmar", f"Recusar e remover {len(usernames)} cadastros?"
+        ):
+            return
         
-        messagebox.showinfo("Sucesso", f"Usuário {username} removido!")
-        self.load_requests()
+        success, message = self.system.reject_users(usernames)
+        if success:
+            self.remove_requests(usernames)
+        messagebox.showinfo("Sucesso" if success else "Erro", message)
 
 class ProfessorMainPanel:
     def __init__(self, system, professor_username):
@@ -613,7 +624,7 @@ class ProfessorMainPanel:
         
         self.window = tk.Toplevel()
         self.window.title(f"Painel do Professor - {professor_username}")
-        self.window.geometry("600x400")
+        self.window.geometry("600x700")
         
         self.setup_ui()
     
@@ -646,6 +657,39 @@ class ProfessorMainPanel:
             pady=15
         ).pack(fill=tk.X, pady=10)
         
+        # Botão para corrigir uma atividade inteira
+        tk.Button(
+            main_frame,
+            text="Corrigir Atividade (Notas em Lote)",
+            command=self.show_grading,
+            bg="#9C27B0",
+            fg="white",
+            font=("Helvetica", 12),
+            pady=15
+        ).pack(fill=tk.X, pady=10)
+        
+        # Botão para a triagem de plágio
+        tk.Button(
+            main_frame,
+            text="Verificar Similaridade (Plágio)",
+            command=self.show_similarity,
+            bg="#607D8B",
+            fg="white",
+            font=("Helvetica", 12),
+            pady=15
+        ).pack(fill=tk.X, pady=10)
+        
+        # Botão para as estatísticas das notas
+        tk.Button(
+            main_frame,
+            text="Estatísticas de Notas",
+            command=self.show_analytics,
+            bg="#009688",
+            fg="white",
+            font=("Helvetica", 12),
+            pady=15
+        ).pack(fill=tk.X, pady=10)
+        
         # Botão para atribuir nova atividade
         tk.Button(
             main_frame,
@@ -663,6 +707,15 @@ class ProfessorMainPanel:
     def show_student_progress(self):
         StudentSelectionPanel(self.system, self.professor_username)
     
+    def show_grading(self):
+        GradingPanel(self.system, self.professor_username)
+    
+    def show_similarity(self):
+        SimilarityPanel(self.system, self.professor_username)
+    
+    def show_analytics(self):
+        AnalyticsPanel(self.system, self.professor_username)
+    
     def create_activity(self):
         CreateActivityPanel(self.system, self.professor_username)
 
@@ -670,23 +723,40 @@ class ClassProgressPanel:
     def __init__(self, system, professor_username):
         self.system = system
         self.professor_username = professor_username
+        self.order_by = "nome"
+        self.descending = False
         
         self.window = tk.Toplevel()
         self.window.title("Progresso da Turma")
         self.window.geometry("1000x600")
         
         self.setup_ui()
+        self.system.watch_changes(self.window, ("users", "students", "activities", "submissions"),
+                                  self.refresh_progress)
     
     def setup_ui(self):
         main_frame = tk.Frame(self.window)
         main_frame.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
         
-        # Treeview para mostrar o progresso
-        self.tree = ttk.Treeview(main_frame, columns=("nome", "matricula", "progresso", "entregas", "total"), 
-                               show="headings")
-        self.tree.heading("nome", text="Nome")
-        self.tree.heading("matricula", text="Matrícula")
-        self.tree.heading("progresso", text="Progresso (%)")
+        self.search_box = SearchBox(main_frame, on_search=lambda text: self.load_progress())
+        self.search_box.pack(fill=tk.X, pady=(0, 10))
+        
+        # Lista virtual: só as linhas visíveis existem na Treeview
+        self.tree = VirtualTreeview(
+            main_frame,
+            columns=("nome", "matricula", "progresso", "entregas", "total"),
+            format_row=lambda student: (
+                student["nome"],
+                student["matricula"],
+                f"{student['progresso']:.1f}",
+                student["entregas"],
+                student["total_atividades"]
+            ),
+            key=lambda student: student["username"]
+        )
+        self.tree.heading("nome", text="Nome", command=lambda: self.sort_by("nome"))
+        self.tree.heading("matricula", text="Matrícula", command=lambda: self.sort_by("matricula"))
+        self.tree.heading("progresso", text="Progresso (%)", command=lambda: self.sort_by("progresso"))
         self.tree.heading("entregas", text="Atividades Entregues")
         self.tree.heading("total", text="Total de Atividades")
         
@@ -698,31 +768,85 @@ class ClassProgressPanel:
         
         self.tree.pack(expand=True, fill=tk.BOTH)
         
-        # Botão para atualizar
+        bottom_frame = tk.Frame(main_frame)
+        bottom_frame.pack(fill=tk.X, pady=10)
+        
+        self.total_label = tk.Label(bottom_frame)
+        self.total_label.pack(side=tk.LEFT)
+        
         tk.Button(
-            main_frame,
-            text="Atualizar",
-            command=self.load_progress,
+            bottom_frame,
+            text="Exportar Relatório",
+            command=self.export_report,
             bg="#2196F3",
             fg="white"
-        ).pack(pady=10)
+        ).pack(side=tk.RIGHT)
+        
+        self.export_label = tk.Label(bottom_frame)
+        self.export_label.pack(side=tk.RIGHT, padx=10)
         
         self.load_progress()
     
-    def load_progress(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        progress_data = self.system.get_class_progress()
+    def export_report(self):
+        # Exporta a turma inteira na ordenação atual (a busca não filtra o relatório)
+        self.system.export_in_background(
+            self, self.export_label, "Exportar progresso da turma", "progresso_turma",
+            self.system.export_class_progress, self.order_by, self.descending
+        )
+    
+    def refresh_progress(self):
+        # Mantém posição e seleção; só as linhas alteradas são redesenhadas
+        self.load_progress(reset=False)
+    
+    def sort_by(self, column):
+        # Clicar de novo na mesma coluna inverte a ordem
+        if self.order_by == column:
+            self.descending = not self.descending
+        else:
+            self.order_by = column
+            self.descending = False
+        self.load_progress()
+    
+    def load_progress(self, reset=True):
+        order_by, descending = self.order_by, self.descending
+        text = self.search_box.get()
+        if text:
+            self.total_label.config(text="Buscando...")
+            self.system.loader.submit(
+                (self, "progress"), self.system.search_students, text,
+                on_done=lambda students: self.show_search_results(students, reset)
+            )
+            return
         
-        for student in progress_data:
-            self.tree.insert("", tk.END, values=(
-                student["nome"],
-                student["matricula"],
-                f"{student['progresso']:.1f}",
-                student["entregas"],
-                student["total_atividades"]
-            ))
+        source = PagedSource(
+            count=self.system.count_approved_students,
+            fetch=lambda after, offset, limit: self.system.get_class_progress_page(
+                order_by, descending, after, limit, offset
+            ),
+            seek_key=lambda student: (student["sort_key"], student["username"]),
+            loader=self.system.loader
+        )
+        offset = 0 if reset else self.tree.offset
+        
+        # Uma nova carga (busca, ordenação ou mudança no banco) descarta a anterior
+        if reset:
+            self.total_label.config(text="Carregando...")
+        self.system.loader.submit(
+            (self, "progress"), source.prefetch, offset, max(self.tree.visible, 1),
+            on_done=lambda source: self.show_progress(source, reset)
+        )
+    
+    def show_progress(self, source, reset):
+        self.tree.set_source(source, reset=reset)
+        self.total_label.config(text=f"{source.count()} alunos")
+    
+    def show_search_results(self, students, reset):
+        # Poucos resultados: a ordenação da coluna escolhida é feita aqui mesmo
+        column = {"nome": "nome", "matricula": "matricula", "progresso": "entregas"}[self.order_by]
+        students = sorted(students, key=lambda student: (student[column], student["username"]),
+                          reverse=self.descending)
+        self.tree.set_source(ListSource(students), reset=reset)
+        self.total_label.config(text=f"{len(students)} alunos encontrados")
 
 class StudentSelectionPanel:
     def __init__(self, system, professor_username):
@@ -734,6 +858,8 @@ class StudentSelectionPanel:
         self.window.geometry("600x400")
         
         self.setup_ui()
+        self.system.watch_changes(self.window, ("users", "students"),
+                                  lambda: self.load_students(reset=False))
     
     def setup_ui(self):
         main_frame = tk.Frame(self.window)
@@ -742,9 +868,20 @@ class StudentSelectionPanel:
         tk.Label(main_frame, text="Selecione um aluno:", 
                 font=("Helvetica", 12)).pack(pady=10)
         
+        self.search_box = SearchBox(main_frame, on_search=lambda text: self.load_students())
+        self.search_box.pack(fill=tk.X)
+        
         # Lista de alunos
-        self.student_listbox = tk.Listbox(main_frame, font=("Helvetica", 12))
-        self.student_listbox.pack(expand=True, fill=tk.BOTH, pady=10)
+        self.student_list = VirtualTreeview(
+            main_frame,
+            columns=("nome", "matricula"),
+            format_row=lambda student: (student["nome"], student["matricula"]),
+            key=lambda student: student["username"]
+        )
+        self.student_list.heading("nome", text="Nome")
+        self.student_list.heading("matricula", text="Matrícula")
+        self.student_list.column("matricula", width=120, anchor="center")
+        self.student_list.pack(expand=True, fill=tk.BOTH, pady=10)
         
         # Botão para visualizar progresso
         tk.Button(
@@ -759,21 +896,32 @@ class StudentSelectionPanel:
         
         self.load_students()
     
-    def load_students(self):
-        self.student_listbox.delete(0, tk.END)
-        students = self.system.get_all_students()
+    def load_students(self, reset=True):
+        text = self.search_box.get()
+        if text:
+            self.system.loader.submit(
+                (self, "students"), self.system.search_students, text,
+                on_done=lambda students: self.student_list.set_source(ListSource(students), reset)
+            )
+            return
         
-        for student in students:
-            self.student_listbox.insert(tk.END, f"{student['nome']} - {student['matricula']}")
-            self.student_listbox.data = students  # Armazenar dados completos
+        source = PagedSource(
+            count=self.system.count_approved_students,
+            fetch=lambda after, offset, limit: self.system.get_all_students(limit, offset),
+            loader=self.system.loader
+        )
+        self.system.loader.submit(
+            (self, "students"), source.prefetch,
+            0 if reset else self.student_list.offset, max(self.student_list.visible, 1),
+            on_done=lambda source: self.student_list.set_source(source, reset)
+        )
     
     def show_student_progress(self):
-        selection = self.student_listbox.curselection()
-        if not selection:
+        selected_student = self.student_list.selected_row()
+        if not selected_student:
             messagebox.showwarning("Aviso", "Selecione um aluno!")
             return
         
-        selected_student = self.student_listbox.data[selection[0]]
         StudentProgressPanel(self.system, self.professor_username, selected_student["username"])
 
 class StudentProgressPanel:
@@ -784,38 +932,39 @@ class StudentProgressPanel:
         
         self.window = tk.Toplevel()
         self.window.title("Progresso do Aluno")
-        self.window.geometry("800x600")
+        self.window.geometry("1250x650")
         
         self.setup_ui()
+        self.system.watch_changes(
+            self.window, ("activities", "submissions"), self.load_submissions,
+            match=lambda change: change.table == "activities" or change.key == self.student_username
+        )
     
     def setup_ui(self):
         main_frame = tk.Frame(self.window)
         main_frame.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
         
-        # Obter informações do aluno
-        with sqlite3.connect(self.system.db_file) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT nome, matricula, progresso FROM students 
-                WHERE username = ?
-            """, (self.student_username,))
-            student_info = cursor.fetchone()
-        
-        # Cabeçalho com informações do aluno
+        # Cabeçalho com informações do aluno (preenchido por load_submissions)
         header_frame = tk.Frame(main_frame)
         header_frame.pack(fill=tk.X, pady=10)
         
-        tk.Label(header_frame, 
-                text=f"Aluno: {student_info['nome']} - Matrícula: {student_info['matricula']}",
-                font=("Helvetica", 12, "bold")).pack(side=tk.LEFT)
+        self.student_label = tk.Label(header_frame, text="Carregando...",
+                                      font=("Helvetica", 12, "bold"))
+        self.student_label.pack(side=tk.LEFT)
+        
+        self.progress_label = tk.Label(header_frame, font=("Helvetica", 12))
+        self.progress_label.pack(side=tk.RIGHT)
         
-        tk.Label(header_frame, 
-                text=f"Progresso: {student_info['progresso']:.1f}%",
-                font=("Helvetica", 12)).pack(side=tk.RIGHT)
+        content_frame = tk.Frame(main_frame)
+        content_frame.pack(expand=True, fill=tk.BOTH, pady=10)
+        
+        # Miniatura da entrega selecionada
+        self.preview = ImagePreview(content_frame)
+        self.preview.pack(side=tk.RIGHT, fill=tk.Y, padx=(10, 0))
+        self.preview.show_message("Selecione uma atividade")
         
         # Treeview para mostrar as atividades
-        self.tree = ttk.Treeview(main_frame, columns=("atividade", "prazo", "entrega", "nota"), 
+        self.tree = ttk.Treeview(content_frame, columns=("atividade", "prazo", "entrega", "nota"), 
                                 show="headings")
         self.tree.heading("atividade", text="Atividade")
         self.tree.heading("prazo", text="Prazo")
@@ -827,7 +976,19 @@ class StudentProgressPanel:
         self.tree.column("entrega", width=150)
         self.tree.column("nota", width=100)
         
-        self.tree.pack(expand=True, fill=tk.BOTH, pady=10)
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self.show_preview())
+        
+        self.submissions_sync = TreeReconciler(
+            self.tree,
+            key=lambda sub: sub["activity_id"],
+            format_row=lambda sub: (
+                sub["title"],
+                sub["deadline"],
+                sub["submission_date"],
+                sub["grade"] if sub["grade"] is not None else "Não avaliada"
+            )
+        )
         
         # Frame para atribuição de nota
         grade_frame = tk.Frame(main_frame)
@@ -858,22 +1019,68 @@ class StudentProgressPanel:
             fg="white"
         ).pack(fill=tk.X, pady=5)
         
+        export_frame = tk.Frame(main_frame)
+        export_frame.pack(fill=tk.X)
+        
+        tk.Button(
+            export_frame,
+            text="Exportar Histórico",
+            command=self.export_transcript
+        ).pack(side=tk.RIGHT)
+        
+        self.export_label = tk.Label(export_frame)
+        self.export_label.pack(side=tk.RIGHT, padx=10)
+        
         self.load_submissions()
     
+    def export_transcript(self):
+        self.system.export_in_background(
+            self, self.export_label, "Exportar histórico do aluno", f"historico_{self.student_username}",
+            self.system.export_student_transcript, self.student_username
+        )
+    
     def load_submissions(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        submissions = self.system.get_student_submissions(self.student_username)
+        # O progresso muda junto com as entregas: o cabeçalho é recarregado também
+        self.system.loader.submit(
+            (self, "student"), self.system.get_student_progress, self.student_username,
+            on_done=self.show_student_info
+        )
+        self.system.loader.submit(
+            (self, "submissions"), self.system.get_student_submissions, self.student_username,
+            on_done=self.show_submissions
+        )
+    
+    def show_student_info(self, student_info):
+        if student_info is None:
+            self.student_label.config(text="Aluno não encontrado")
+            return
+        self.student_label.config(
+            text=f"Aluno: {student_info['nome']} - Matrícula: {student_info['matricula']}"
+        )
+        self.progress_label.config(text=f"Progresso: {student_info['progresso']:.1f}%")
+    
+    def show_submissions(self, submissions):
+        self.submissions_sync.apply(submissions)
+        # Poucas entregas por aluno: gera logo todas as miniaturas
+        self.system.loader.submit(
+            (self, "prefetch"), lambda ticket: self.system.prefetch_previews(
+                submissions, cancelled=lambda: ticket.cancelled
+            ),
+            with_ticket=True
+        )
+    
+    def show_preview(self):
+        iid = self.tree.focus()
+        submission = self.submissions_sync.row(iid) if iid else None
+        if submission is None:
+            return
         
-        for sub in submissions:
-            nota = sub["grade"] if sub["grade"] is not None else "Não avaliada"
-            self.tree.insert("", tk.END, values=(
-                sub["title"],
-                sub["deadline"],
-                sub["submission_date"],
-                nota
-            ), tags=(sub["file_path"],))
+        self.preview.show_message("Carregando...")
+        self.system.loader.submit(
+            (self, "preview"), self.system.get_submission_preview, submission,
+            on_done=self.preview.show_image,
+            on_error=lambda e: self.preview.show_message("Pré-visualização indisponível")
+        )
     
     def view_submission_file(self):
         selected = self.tree.focus()
@@ -881,12 +1088,8 @@ class StudentProgressPanel:
             messagebox.showwarning("Aviso", "Selecione uma atividade!")
             return
         
-        file_path = self.tree.item(selected, "tags")[0]
-        
-        try:
-            os.startfile(file_path)
-        except:
-            messagebox.showerror("Erro", "Não foi possível abrir o arquivo!")
+        submission = self.submissions_sync.row(selected)
+        self.system.open_submission((self, "view"), submission)
     
     def assign_grade(self):
         selected = self.tree.focus()
@@ -894,7 +1097,7 @@ class StudentProgressPanel:
             messagebox.showwarning("Aviso", "Selecione uma atividade!")
             return
         
-        activity_title = self.tree.item(selected)["values"][0]
+        submission_id = self.submissions_sync.row(selected)["id"]
         grade = self.grade_entry.get()
         feedback = self.feedback_entry.get()
         
@@ -910,11 +1113,684 @@ class StudentProgressPanel:
             messagebox.showerror("Erro", "Nota inválida! Deve ser um número entre 0 e 10.")
             return
         
-        success, message = self.system.grade_submission(
-            self.student_username, activity_title, grade, feedback
+        success, message = self.system.grade_submission(submission_id, grade, feedback)
+        messagebox.showinfo("Sucesso" if success else "Erro", message)
+        self.load_submissions()
+
+class GradingPanel:
+    """Correção de uma atividade inteira, como numa planilha.
+    
+    Um duplo clique (ou Enter) edita a nota ou o feedback na própria linha;
+    as alterações ficam pendentes, destacadas, até "Salvar Notas", que
+    grava tudo de uma vez.
+    """
+    
+    EDITABLE_COLUMNS = ("nota", "feedback")
+    
+    def __init__(self, system, professor_username):
+        self.system = system
+        self.professor_username = professor_username
+        self.activities = []
+        self.activity_id = None
+        self.edits = {}
+        self.editor = None
+        
+        self.window = tk.Toplevel()
+        self.window.title("Correção em Lote")
+        self.window.geometry("1400x650")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.setup_ui()
+        self.system.watch_changes(
+            self.window, ("submissions",), self.load_submissions,
+            match=lambda change: change.related == str(self.activity_id)
         )
+    
+    def setup_ui(self):
+        main_frame = tk.Frame(self.window)
+        main_frame.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        
+        top_frame = tk.Frame(main_frame)
+        top_frame.pack(fill=tk.X)
+        
+        tk.Label(top_frame, text="Atividade:", font=("Helvetica", 12)).pack(side=tk.LEFT)
+        self.activity_combo = ttk.Combobox(top_frame, state="readonly", width=60)
+        self.activity_combo.pack(side=tk.LEFT, padx=5)
+        self.activity_combo.bind("<<ComboboxSelected>>", self.change_activity)
+        
+        self.status_label = tk.Label(top_frame, anchor="e")
+        self.status_label.pack(side=tk.RIGHT)
+        
+        content_frame = tk.Frame(main_frame)
+        content_frame.pack(expand=True, fill=tk.BOTH, pady=10)
+        
+        # Miniatura da entrega selecionada
+        self.preview = ImagePreview(content_frame)
+        self.preview.pack(side=tk.RIGHT, fill=tk.Y, padx=(10, 0))
+        self.preview.show_message("Selecione uma entrega")
+        
+        self.tree = ttk.Treeview(content_frame, columns=("nome", "matricula", "entrega", "nota", "feedback"),
+                                show="headings", selectmode="browse")
+        self.tree.heading("nome", text="Nome")
+        self.tree.heading("matricula", text="Matrícula")
+        self.tree.heading("entrega", text="Data de Entrega")
+        self.tree.heading("nota", text="Nota")
+        self.tree.heading("feedback", text="Feedback")
+        
+        self.tree.column("nome", width=220)
+        self.tree.column("matricula", width=100)
+        self.tree.column("entrega", width=140)
+        self.tree.column("nota", width=60, anchor="center")
+        self.tree.column("feedback", width=380)
+        self.tree.tag_configure("edited", background="#FFF59D")
+        
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self.show_preview())
+        self.tree.bind("<Double-1>", self.edit_clicked_cell)
+        self.tree.bind("<Return>", lambda e: self.edit_cell(self.tree.focus(), "nota"))
+        
+        self.submissions_sync = TreeReconciler(
+            self.tree,
+            key=lambda sub: sub["id"],
+            format_row=self.format_submission
+        )
+        
+        btn_frame = tk.Frame(main_frame)
+        btn_frame.pack(fill=tk.X)
+        
+        tk.Button(
+            btn_frame,
+            text="Salvar Notas",
+            command=self.save_grades,
+            bg="#4CAF50",
+            fg="white"
+        ).pack(side=tk.LEFT, expand=True, padx=5)
+        
+        tk.Button(
+            btn_frame,
+            text="Descartar Alterações",
+            command=self.discard_edits,
+            bg="#F44336",
+            fg="white"
+        ).pack(side=tk.LEFT, expand=True, padx=5)
+        
+        tk.Button(
+            btn_frame,
+            text="Exportar CSV",
+            command=self.export_csv,
+            bg="#2196F3",
+            fg="white"
+        ).pack(side=tk.LEFT, expand=True, padx=5)
+        
+        tk.Button(
+            btn_frame,
+            text="Importar CSV",
+            command=self.import_csv,
+            bg="#FF9800",
+            fg="white"
+        ).pack(side=tk.LEFT, expand=True, padx=5)
+        
+        tk.Button(
+            btn_frame,
+            text="Exportar Relatório",
+            command=self.export_report
+        ).pack(side=tk.LEFT, expand=True, padx=5)
+        
+        self.system.loader.submit(
+            (self, "activities"), self.system.get_activities,
+            on_done=self.show_activities
+        )
+    
+    # Dados
+    
+    def show_activities(self, activities):
+        self.activities = activities
+        self.activity_combo["values"] = [
+            f"{activity['title']} (prazo {activity['deadline']})" for activity in activities
+        ]
+        if activities:
+            self.activity_combo.current(0)
+            self.change_activity()
+    
+    def change_activity(self, event=None):
+        index = self.activity_combo.current()
+        if index < 0:
+            return
+        activity_id = self.activities[index]["id"]
+        if activity_id == self.activity_id:
+            return
+        
+        if self.edits and not messagebox.askyesno(
+            "Alterações pendentes", "Descartar as notas ainda não salvas?"
+        ):
+            # Volta a seleção para a atividade atual
+            current = [activity["id"] for activity in self.activities].index(self.activity_id)
+            self.activity_combo.current(current)
+            return
+        
+        self.activity_id = activity_id
+        self.edits.clear()
+        self.cancel_edit()
+        self.load_submissions()
+    
+    def load_submissions(self):
+        # Notas ainda não salvas continuam por cima dos valores recarregados
+        self.system.loader.submit(
+            (self, "submissions"), self.system.get_activity_submissions, self.activity_id,
+            on_done=self.show_submissions
+        )
+    
+    def show_submissions(self, submissions):
+        self.submissions_sync.apply(submissions)
+        for iid in self.submissions_sync.rows:
+            self.tree.item(iid, tags=("edited",) if int(iid) in self.edits else ())
+        self.update_status()
+    
+    PREFETCH_ROWS = 5
+    
+    def show_preview(self):
+        iid = self.tree.focus()
+        sub = self.submissions_sync.row(iid) if iid else None
+        if sub is None:
+            return
+        
+        self.preview.show_message("Carregando...")
+        self.system.loader.submit(
+            (self, "preview"), self.system.get_submission_preview, sub,
+            on_done=self.preview.show_image,
+            on_error=lambda e: self.preview.show_message("Pré-visualização indisponível")
+        )
+        
+        # Gera antes as miniaturas das próximas linhas, para a navegação
+        # com as setas não esperar pela renderização
+        children = self.tree.get_children()
+        index = children.index(iid)
+        upcoming = [self.submissions_sync.row(child)
+                    for child in children[index + 1:index + 1 + self.PREFETCH_ROWS]]
+        self.system.loader.submit(
+            (self, "prefetch"), lambda ticket: self.system.prefetch_previews(
+                upcoming, cancelled=lambda: ticket.cancelled
+            ),
+            with_ticket=True
+        )
+    
+    def current_values(self, sub):
+        """Nota e feedback da linha, já considerando as alterações pendentes."""
+        return self.edits.get(sub["id"], (sub["grade"], sub["feedback"] or ""))
+    
+    def format_submission(self, sub):
+        grade, feedback = self.current_values(sub)
+        return (sub["nome"], sub["matricula"], sub["submission_date"], format_grade(grade), feedback)
+    
+    def update_status(self):
+        total = len(self.submissions_sync.rows)
+        graded = sum(1 for sub in self.submissions_sync.rows.values()
+                     if self.current_values(sub)[0] is not None)
+        self.status_label.config(
+            text=f"{graded}/{total} avaliadas - {len(self.edits)} alteração(ões) pendente(s)"
+        )
+    
+    def set_edit(self, sub, grade, feedback):
+        if (grade, feedback) == (sub["grade"], sub["feedback"] or ""):
+            self.edits.pop(sub["id"], None)
+        else:
+            self.edits[sub["id"]] = (grade, feedback)
+        
+        iid = str(sub["id"])
+        self.submissions_sync.refresh_row(iid)
+        self.tree.item(iid, tags=("edited",) if sub["id"] in self.edits else ())
+    
+    # Edição na linha
+    
+    def edit_clicked_cell(self, event):
+        iid = self.tree.identify_row(event.y)
+        column = self.tree.identify_column(event.x)
+        if not iid or not column:
+            return
+        name = self.tree["columns"][int(column[1:]) - 1]
+        self.edit_cell(iid, name if name in self.EDITABLE_COLUMNS else "nota")
+    
+    def edit_cell(self, iid, column):
+        self.cancel_edit()
+        if not iid:
+            return
+        self.tree.see(iid)
+        self.tree.update_idletasks()
+        bbox = self.tree.bbox(iid, column)
+        if not bbox:
+            return
+        
+        sub = self.submissions_sync.row(iid)
+        grade, feedback = self.current_values(sub)
+        
+        self.editor = tk.Entry(self.tree)
+        self.editor.insert(0, format_grade(grade) if column == "nota" else feedback)
+        self.editor.select_range(0, tk.END)
+        self.editor.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
+        self.editor.focus_set()
+        
+        self.editor.bind("<Return>", lambda e: self.commit_edit(iid, column, step=1))
+        self.editor.bind("<Tab>", lambda e: self.commit_edit(iid, column, step=0))
+        self.editor.bind("<Down>", lambda e: self.commit_edit(iid, column, step=1))
+        self.editor.bind("<Up>", lambda e: self.commit_edit(iid, column, step=-1))
+        self.editor.bind("<Escape>", lambda e: self.cancel_edit())
+        self.editor.bind("<FocusOut>", lambda e: self.commit_edit(iid, column, step=None))
+    
+    def commit_edit(self, iid, column, step):
+        if self.editor is None:
+            return "break"
+        text = self.editor.get()
+        sub = self.submissions_sync.row(iid)
+        grade, feedback = self.current_values(sub)
+        
+        if column == "nota":
+            try:
+                grade = parse_grade(text)
+            except ValueError:
+                self.cancel_edit()
+                messagebox.showerror("Erro", "Nota inválida! Deve ser um número entre 0 e 10.")
+                return "break"
+        else:
+            feedback = text.strip()
+        
+        self.cancel_edit()
+        self.set_edit(sub, grade, feedback)
+        self.update_status()
+        
+        # Enter/setas seguem para a linha vizinha; Tab alterna nota/feedback
+        if step is not None:
+            children = self.tree.get_children()
+            index = children.index(iid)
+            if step == 0:
+                column = "feedback" if column == "nota" else "nota"
+            else:
+                index += step
+            if 0 <= index < len(children):
+                self.tree.selection_set(children[index])
+                self.tree.focus(children[index])
+                self.edit_cell(children[index], column)
+        return "break"
+    
+    def cancel_edit(self):
+        if self.editor is not None:
+            editor, self.editor = self.editor, None
+            editor.destroy()
+            self.tree.focus_set()
+    
+    # Ações
+    
+    def save_grades(self):
+        self.cancel_edit()
+        if not self.edits:
+            messagebox.showinfo("Aviso", "Nenhuma nota alterada!")
+            return
+        
+        grades = [(submission_id, grade, feedback)
+                  for submission_id, (grade, feedback) in self.edits.items()]
+        success, message = self.system.grade_submissions(grades)
+        if success:
+            self.edits.clear()
+            self.load_submissions()
         messagebox.showinfo("Sucesso" if success else "Erro", message)
+    
+    def discard_edits(self):
+        self.cancel_edit()
+        self.edits.clear()
         self.load_submissions()
+    
+    def export_csv(self):
+        from tkinter import filedialog
+        if self.activity_id is None:
+            return
+        path = filedialog.asksaveasfilename(
+            title="Exportar notas",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv")]
+        )
+        if not path:
+            return
+        
+        rows = []
+        for sub in self.submissions_sync.rows.values():
+            grade, feedback = self.current_values(sub)
+            rows.append({"matricula": sub["matricula"], "nome": sub["nome"],
+                         "grade": grade, "feedback": feedback})
+        write_grades_csv(path, rows)
+        messagebox.showinfo("Sucesso", f"{len(rows)} linhas exportadas!")
+    
+    def export_report(self):
+        # Relatório com as notas já gravadas (as alterações pendentes não entram)
+        if self.activity_id is None:
+            return
+        self.system.export_in_background(
+            self, self.status_label, "Exportar notas da atividade", f"notas_atividade_{self.activity_id}",
+            self.system.export_activity_grades, self.activity_id
+        )
+    
+    def import_csv(self):
+        from tkinter import filedialog
+        if self.activity_id is None:
+            return
+        path = filedialog.askopenfilename(
+            title="Importar notas",
+            filetypes=[("CSV", "*.csv")]
+        )
+        if not path:
+            return
+        
+        self.cancel_edit()
+        submissions = list(self.submissions_sync.rows.values())
+        try:
+            grades, errors = read_grades_csv(path, submissions)
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Erro", f"Não foi possível ler o arquivo: {e}")
+            return
+        
+        # As notas importadas entram como alterações pendentes, para revisão
+        for sub in submissions:
+            if sub["id"] in grades:
+                self.set_edit(sub, *grades[sub["id"]])
+        self.update_status()
+        
+        message = f"{len(grades)} notas carregadas. Revise e clique em \"Salvar Notas\"."
+        if errors:
+            details = "\n".join(f"Linha {line}: {matricula} - {error}"
+                                 for line, matricula, error in errors[:10])
+            message += f"\n\n{len(errors)} linha(s) ignorada(s):\n{details}"
+        messagebox.showinfo("Importar CSV", message)
+    
+    def close(self):
+        if self.edits and not messagebox.askyesno(
+            "Alterações pendentes", "Fechar sem salvar as notas alteradas?"
+        ):
+            return
+        self.window.destroy()
+
+class SimilarityPanel:
+    def __init__(self, system, professor_username):
+        self.system = system
+        self.professor_username = professor_username
+        self.activities = []
+        
+        self.window = tk.Toplevel()
+        self.window.title("Triagem de Plágio")
+        self.window.geometry("900x500")
+        
+        self.setup_ui()
+    
+    def setup_ui(self):
+        main_frame = tk.Frame(self.window)
+        main_frame.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        
+        top_frame = tk.Frame(main_frame)
+        top_frame.pack(fill=tk.X)
+        
+        tk.Label(top_frame, text="Atividade:", font=("Helvetica", 12)).pack(side=tk.LEFT)
+        self.activity_combo = ttk.Combobox(top_frame, state="readonly", width=50)
+        self.activity_combo.pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(top_frame, text="Similaridade mínima (%):").pack(side=tk.LEFT, padx=(10, 0))
+        self.threshold = tk.Spinbox(top_frame, from_=10, to=100, increment=5, width=5)
+        self.threshold.delete(0, tk.END)
+        self.threshold.insert(0, "50")
+        self.threshold.pack(side=tk.LEFT, padx=5)
+        
+        self.analyze_button = tk.Button(
+            top_frame,
+            text="Analisar",
+            command=self.analyze,
+            bg="#4CAF50",
+            fg="white"
+        )
+        self.analyze_button.pack(side=tk.LEFT, padx=5)
+        
+        self.status_label = tk.Label(main_frame, anchor="w")
+        self.status_label.pack(fill=tk.X, pady=(10, 0))
+        
+        self.tree = ttk.Treeview(main_frame, columns=("aluno_a", "aluno_b", "similaridade"),
+                                show="headings")
+        self.tree.heading("aluno_a", text="Aluno A")
+        self.tree.heading("aluno_b", text="Aluno B")
+        self.tree.heading("similaridade", text="Similaridade (%)")
+        self.tree.column("similaridade", width=120, anchor="center")
+        self.tree.pack(expand=True, fill=tk.BOTH, pady=10)
+        
+        self.pairs_sync = TreeReconciler(
+            self.tree,
+            key=lambda pair: f"{pair[0]['id']}-{pair[1]['id']}",
+            format_row=lambda pair: (pair[0]["nome"], pair[1]["nome"], f"{pair[2] * 100:.0f}")
+        )
+        
+        tk.Button(
+            main_frame,
+            text="Abrir os Dois Arquivos",
+            command=self.open_pair,
+            bg="#2196F3",
+            fg="white"
+        ).pack(fill=tk.X)
+        
+        self.system.loader.submit(
+            (self, "activities"), self.system.get_activities,
+            on_done=self.show_activities
+        )
+    
+    def show_activities(self, activities):
+        self.activities = activities
+        self.activity_combo["values"] = [
+            f"{activity['title']} (prazo {activity['deadline']})" for activity in activities
+        ]
+        if activities:
+            self.activity_combo.current(0)
+    
+    def analyze(self):
+        index = self.activity_combo.current()
+        if index < 0:
+            messagebox.showwarning("Aviso", "Selecione uma atividade!")
+            return
+        try:
+            threshold = float(self.threshold.get()) / 100
+        except ValueError:
+            messagebox.showerror("Erro", "Similaridade mínima inválida!")
+            return
+        
+        self.analyze_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Extraindo texto das entregas...")
+        self.system.loader.submit(
+            (self, "analyze"), self.run_analysis, self.activities[index]["id"], threshold,
+            with_ticket=True,
+            on_done=self.show_pairs,
+            on_error=self.analysis_failed
+        )
+    
+    def run_analysis(self, ticket, activity_id, threshold):
+        def progress(done, total):
+            ticket.report(self.status_label.config,
+                          {"text": f"Processando entregas novas: {done}/{total}"})
+        
+        return self.system.screen_similarity(activity_id, threshold, progress,
+                                             cancelled=lambda: ticket.cancelled)
+    
+    def analysis_failed(self, error):
+        self.analyze_button.config(state=tk.NORMAL)
+        self.status_label.config(text="")
+        messagebox.showerror("Erro", f"Falha na análise: {error}")
+    
+    def show_pairs(self, pairs):
+        self.analyze_button.config(state=tk.NORMAL)
+        self.pairs_sync.apply(pairs)
+        self.status_label.config(text=f"{len(pairs)} par(es) acima do limite")
+    
+    def open_pair(self):
+        selected = self.tree.focus()
+        if not selected:
+            messagebox.showwarning("Aviso", "Selecione um par!")
+            return
+        
+        first, second, _ = self.pairs_sync.row(selected)
+        for submission in (first, second):
+            self.system.open_submission((self, "view", submission["id"]), submission)
+
+class AnalyticsPanel:
+    # Barras do histograma em texto, da menor para a maior frequência
+    BARS = "▁▂▃▄▅▆▇█"
+    
+    def __init__(self, system, professor_username):
+        self.system = system
+        self.professor_username = professor_username
+        self.order_by = "slope"
+        self.descending = False
+        self.trends = []
+        
+        self.window = tk.Toplevel()
+        self.window.title("Estatísticas de Notas")
+        self.window.geometry("1100x600")
+        
+        self.setup_ui()
+        self.system.watch_changes(self.window, ("activities", "submissions"), self.load_stats)
+    
+    def setup_ui(self):
+        notebook = ttk.Notebook(self.window)
+        notebook.pack(expand=True, fill=tk.BOTH)
+        
+        # Aba das atividades: uma linha por atividade e o histograma da selecionada
+        activity_frame = ttk.Frame(notebook)
+        notebook.add(activity_frame, text="Por Atividade")
+        
+        columns = ("atividade", "prazo", "entregas", "notas", "media", "mediana", "desvio",
+                   "p25", "p75", "p90", "atraso", "histograma")
+        self.activity_tree = ttk.Treeview(activity_frame, columns=columns, show="headings")
+        for column, text, width in (
+            ("atividade", "Atividade", 220), ("prazo", "Prazo", 90), ("entregas", "Entregas", 70),
+            ("notas", "Avaliadas", 70), ("media", "Média", 60), ("mediana", "Mediana", 60),
+            ("desvio", "Desvio", 60), ("p25", "P25", 50), ("p75", "P75", 50), ("p90", "P90", 50),
+            ("atraso", "Atrasadas (%)", 90), ("histograma", "Distribuição (0 a 10)", 140),
+        ):
+            self.activity_tree.heading(column, text=text)
+            self.activity_tree.column(column, width=width, anchor="w" if column == "atividade" else "center",
+                                      stretch=column == "atividade")
+        self.activity_tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=(10, 0))
+        self.activity_tree.bind("<<TreeviewSelect>>", lambda e: self.draw_histogram())
+        
+        self.activities_sync = TreeReconciler(
+            self.activity_tree,
+            key=lambda stats: stats["activity_id"],
+            format_row=lambda stats: (
+                stats["title"],
+                stats["deadline"],
+                stats["submissions"],
+                stats["graded"],
+                format_grade(stats["mean"]),
+                format_grade(stats["median"]),
+                format_grade(stats["stdev"]),
+                format_grade(stats["percentiles"][25]),
+                format_grade(stats["percentiles"][75]),
+                format_grade(stats["percentiles"][90]),
+                f"{stats['late_rate'] * 100:.1f}" if stats["late_rate"] is not None else "",
+                self.sparkline(stats["histogram"])
+            )
+        )
+        
+        self.histogram = tk.Canvas(activity_frame, height=140, bg="white")
+        self.histogram.pack(fill=tk.X, padx=10, pady=10)
+        
+        # Aba dos alunos: tendência das notas ao longo das atividades
+        trend_frame = ttk.Frame(notebook)
+        notebook.add(trend_frame, text="Tendência dos Alunos")
+        
+        self.trend_tree = VirtualTreeview(
+            trend_frame,
+            columns=("nome", "matricula", "notas", "media", "ultima", "tendencia", "atrasos"),
+            format_row=lambda trend: (
+                trend["nome"],
+                trend["matricula"],
+                trend["graded"],
+                format_grade(trend["mean"]),
+                format_grade(trend["last"]),
+                f"{trend['slope']:+.3f}" if trend["slope"] is not None else "",
+                trend["late"]
+            ),
+            key=lambda trend: trend["username"]
+        )
+        for column, text, sort_key, width in (
+            ("nome", "Nome", "nome", 250), ("matricula", "Matrícula", "matricula", 100),
+            ("notas", "Notas", "graded", 70), ("media", "Média", "mean", 70),
+            ("ultima", "Última Nota", "last", 90), ("tendencia", "Tendência (por atividade)", "slope", 160),
+            ("atrasos", "Atrasos", "late", 70),
+        ):
+            self.trend_tree.heading(column, text=text, command=lambda key=sort_key: self.sort_by(key))
+            self.trend_tree.column(column, width=width, anchor="w" if column == "nome" else "center")
+        self.trend_tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        
+        self.status_label = tk.Label(self.window, anchor="w")
+        self.status_label.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        self.load_stats()
+    
+    def sparkline(self, histogram):
+        peak = max(histogram)
+        if not peak:
+            return ""
+        return "".join(self.BARS[count * (len(self.BARS) - 1) // peak] for count in histogram)
+    
+    def load_stats(self):
+        # Só as atividades alteradas desde a última carga são recalculadas
+        self.status_label.config(text="Calculando estatísticas...")
+        self.system.loader.submit(
+            (self, "stats"), self.system.get_activity_stats,
+            on_done=self.show_stats,
+            on_error=self.load_failed
+        )
+        self.system.loader.submit(
+            (self, "trends"), self.system.get_student_trends,
+            on_done=self.show_trends,
+            on_error=self.load_failed
+        )
+    
+    def load_failed(self, error):
+        self.status_label.config(text="")
+        messagebox.showerror("Erro", f"Não foi possível calcular as estatísticas: {error}")
+    
+    def show_stats(self, stats):
+        self.activities_sync.apply(stats)
+        self.draw_histogram()
+        graded = sum(item["graded"] for item in stats)
+        self.status_label.config(text=f"{len(stats)} atividades, {graded} notas lançadas")
+    
+    def draw_histogram(self):
+        self.histogram.delete("all")
+        stats = self.activities_sync.row(self.activity_tree.focus())
+        if stats is None:
+            return
+        
+        histogram = stats["histogram"]
+        peak = max(histogram) or 1
+        width = max(self.histogram.winfo_width(), 400)
+        height = int(self.histogram["height"])
+        bar_width = (width - 20) / len(histogram)
+        for index, count in enumerate(histogram):
+            x0 = 10 + index * bar_width
+            top = height - 20 - (height - 40) * count / peak
+            self.histogram.create_rectangle(x0 + 2, top, x0 + bar_width - 2, height - 20,
+                                            fill="#009688", outline="")
+            self.histogram.create_text(x0 + bar_width / 2, top - 8, text=str(count))
+            self.histogram.create_text(x0 + bar_width / 2, height - 10, text=f"{index}–{index + 1}")
+    
+    def sort_by(self, column):
+        # Clicar de novo na mesma coluna inverte a ordem
+        if self.order_by == column:
+            self.descending = not self.descending
+        else:
+            self.order_by = column
+            self.descending = False
+        self.show_trends(self.trends, reset=True)
+    
+    def show_trends(self, trends, reset=False):
+        self.trends = trends
+        # Alunos sem tendência (menos de duas notas) ficam sempre no fim
+        present = [trend for trend in trends if trend[self.order_by] is not None]
+        missing = [trend for trend in trends if trend[self.order_by] is None]
+        present.sort(key=lambda trend: (trend[self.order_by], trend["username"]), reverse=self.descending)
+        self.trend_tree.set_source(ListSource(present + missing), reset=reset)
 
 class CreateActivityPanel:
     def __init__(self, system, professor_username):
@@ -990,6 +1866,10 @@ class StudentPanel:
         self.window.geometry("800x600")
         
         self.setup_ui()
+        self.system.watch_changes(
+            self.window, ("activities", "submissions"), self.refresh,
+            match=lambda change: change.table == "activities" or change.key == self.student_username
+        )
     
     def setup_ui(self):
         self.notebook = ttk.Notebook(self.window)
@@ -1010,9 +1890,16 @@ class StudentPanel:
         self.notebook.add(activities_frame, text="Atividades")
         
         # Treeview para atividades
-        self.activities_tree = ttk.Treeview(activities_frame, 
-                                          columns=("title", "deadline", "status"), 
-                                          show="headings")
+        self.activities_tree = VirtualTreeview(
+            activities_frame,
+            columns=("title", "deadline", "status"),
+            format_row=lambda act: (
+                act["title"],
+                act["deadline"],
+                "Entregue" if act["submitted"] else "Pendente"
+            ),
+            key=lambda act: act["id"]
+        )
         self.activities_tree.heading("title", text="Atividade")
         self.activities_tree.heading("deadline", text="Prazo")
         self.activities_tree.heading("status", text="Status")
@@ -1037,14 +1924,17 @@ class StudentPanel:
             width=15
         ).pack(side=tk.LEFT, padx=5)
         
-        tk.Button(
+        self.submit_button = tk.Button(
             submission_frame,
             text="Entregar",
             command=self.submit_activity,
             bg="#4CAF50",
             fg="white",
             width=15
-        ).pack(side=tk.RIGHT)
+        )
+        self.submit_button.pack(side=tk.RIGHT)
+        
+        self.upload_progress = ttk.Progressbar(activities_frame, mode="determinate", maximum=100)
     
     def setup_grades_tab(self):
         grades_frame = ttk.Frame(self.notebook)
@@ -1063,36 +1953,37 @@ class StudentPanel:
         self.grades_tree.column("feedback", width=300)
         
         self.grades_tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        
+        self.grades_sync = TreeReconciler(
+            self.grades_tree,
+            key=lambda act: act["id"],
+            format_row=lambda act: (act["title"], f"{act['grade']:.1f}", act["feedback"] or "")
+        )
     
     def load_activities(self):
-        for item in self.activities_tree.get_children():
-            self.activities_tree.delete(item)
-        
-        activities = self.system.get_activities_for_student(self.student_username)
-        
-        for act in activities:
-            status = "Entregue" if act["submitted"] else "Pendente"
-            self.activities_tree.insert("", tk.END, values=(
-                act["title"],
-                act["deadline"],
-                status
-            ), tags=(act["id"],))
+        self.system.loader.submit(
+            (self, "activities"), self.system.get_activities_for_student, self.student_username,
+            on_done=lambda activities: self.activities_tree.set_source(ListSource(activities), reset=False)
+        )
+    
+    def refresh(self):
+        self.load_activities()
+        self.load_grades()
     
     def load_grades(self):
-        for item in self.grades_tree.get_children():
-            self.grades_tree.delete(item)
-        
-        activities = self.system.get_activities_for_student(self.student_username)
-        
-        for act in activities:
-            if act["submitted"] and act["grade"] is not None:
-                self.grades_tree.insert("", tk.END, values=(
-                    act["title"],
-                    f"{act['grade']:.1f}",
-                    act["feedback"] or ""
-                ))
+        self.system.loader.submit(
+            (self, "grades"), self.system.get_activities_for_student, self.student_username,
+            on_done=self.show_grades
+        )
+    
+    def show_grades(self, activities):
+        self.grades_sync.apply(
+            act for act in activities
+            if act["submitted"] and act["grade"] is not None
+        )
     
     def select_file(self):
+        from tkinter import filedialog
         file_path = filedialog.askopenfilename(
             title="Selecione o arquivo para enviar",
             filetypes=[("PDF Files", "*.pdf"), ("All Files", "*.*")]
@@ -1103,7 +1994,7 @@ class StudentPanel:
             self.selected_file = file_path
     
     def submit_activity(self):
-        selected = self.activities_tree.focus()
+        selected = self.activities_tree.selected_row()
         if not selected:
             messagebox.showwarning("Aviso", "Selecione uma atividade!")
             return
@@ -1112,12 +2003,43 @@ class StudentPanel:
             messagebox.showwarning("Aviso", "Selecione um arquivo para enviar!")
             return
         
-        activity_id = self.activities_tree.item(selected, "tags")[0]
-        
-        success, message = self.system.submit_activity(
-            activity_id, self.student_username, self.selected_file
+        activity_id = selected["id"]
+        
+        # A cópia do arquivo roda em segundo plano; o botão fica bloqueado até terminar
+        self.submit_button.config(state=tk.DISABLED)
+        self.file_path_label.config(text="Enviando...")
+        self.upload_progress.config(value=0)
+        self.upload_progress.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.system.loader.submit(
+            (self, "submit"), self.upload_file,
+            activity_id, self.selected_file,
+            with_ticket=True,
+            on_done=self.finish_submission,
+            on_error=self.submission_failed
         )
+    
+    def upload_file(self, ticket, activity_id, file_path):
+        # Roda na thread de trabalho; o progresso volta para a thread do Tk pelo ticket
+        def progress(copied, total):
+            ticket.report(self.show_upload_progress, copied, total)
         
+        return self.system.submit_activity(activity_id, self.student_username, file_path, progress)
+    
+    def show_upload_progress(self, copied, total):
+        percent = copied * 100 / total if total else 100
+        self.upload_progress.config(value=percent)
+        self.file_path_label.config(text=f"Enviando... {percent:.0f}%")
+    
+    def submission_failed(self, error):
+        self.upload_progress.pack_forget()
+        self.submit_button.config(state=tk.NORMAL)
+        self.file_path_label.config(text=self.selected_file)
+        messagebox.showerror("Erro", f"Falha ao entregar a atividade: {error}")
+    
+    def finish_submission(self, result):
+        success, message = result
+        self.upload_progress.pack_forget()
+        self.submit_button.config(state=tk.NORMAL)
         messagebox.showinfo("Sucesso" if success else "Erro", message)
         
         if success:
@@ -1125,8 +2047,15 @@ class StudentPanel:
             self.load_grades()
             self.file_path_label.config(text="Nenhum arquivo selecionado")
             delattr(self, 'selected_file')
+        else:
+            self.file_path_label.config(text=self.selected_file)
 
 # Executar o sistema
 if __name__ == "__main__":
+    # Necessário no executável congelado: os processos da triagem de plágio
+    # reexecutam este módulo
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     app = AcademicSystem()
     app.run()
\ No newline at end of file
@@ -0,0 +1,276 @@
+"""Estatísticas das notas por atividade e tendência de cada aluno.
+
+As notas são lidas de uma vez para vetores do NumPy e agregadas por grupo
+(atividade ou aluno) sem laço em Python: contagens e somas com
+``bincount``, mediana e percentis ordenando por (grupo, nota) e indexando
+o início de cada grupo.
+
+O resultado de cada atividade fica em cache junto com a versão dela na
+tabela ``activity_changes``, que os gatilhos incrementam a cada entrega,
+nota ou mudança de prazo; só as atividades cuja versão mudou são
+recalculadas. As tendências dos alunos dependem de todas as atividades e
+também dos alunos (aprovação, nome, matrícula): são refeitas quando
+qualquer versão muda ou quando ``change_log`` registra mudança em
+``users`` ou ``students``.
+"""
+
+import threading
+
+HISTOGRAM_BINS = 10
+MAX_GRADE = 10.0
+PERCENTILES = (25, 50, 75, 90)
+
+# Acima disso a lista de ids vira vários SELECTs (limite de parâmetros do SQLite)
+_CHUNK = 500
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("As estatísticas de notas requerem o pacote numpy")
+    return numpy
+
+
+def _group_quantiles(np, groups, values, size, quantiles):
+    """Quantis (interpolação linear) de ``values`` dentro de cada grupo.
+
+    Retorna uma matriz ``size x len(quantiles)``, com NaN nos grupos vazios.
+    """
+    order = np.lexsort((values, groups))
+    values = values[order]
+    counts = np.bincount(groups, minlength=size)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    result = np.full((size, len(quantiles)), np.nan)
+    present = counts > 0
+    if not present.any():
+        return result
+    starts, last = starts[present], counts[present] - 1
+    for column, q in enumerate(quantiles):
+        position = last * q
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, last)
+        fraction = position - low
+        result[present, column] = (values[starts + low] * (1 - fraction)
+                                   + values[starts + high] * fraction)
+    return result
+
+
+def _number(value, digits=2):
+    # NaN (grupo sem nota) vira None, como um NULL vindo do banco
+    return None if value != value else round(float(value), digits)
+
+
+class GradeAnalytics:
+    def __init__(self, db):
+        self.db = db
+        self._activities = {}  # id -> (versão, estatísticas)
+        self._trends = None    # ((versão dos alunos, versões das atividades), tendências)
+        self._lock = threading.Lock()
+
+    def _versions(self, conn):
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute("SELECT activity_id, version FROM activity_changes")
+        return dict(cursor.fetchall())
+
+    def _students_version(self, conn):
+        # Última mudança registrada em alunos ou usuários; a busca anda do
+        # fim do registro para trás e para na primeira que encontrar
+        row = conn.execute("""
+            SELECT id FROM change_log
+            WHERE table_name IN ('users', 'students')
+            ORDER BY id DESC LIMIT 1
+        """).fetchone()
+        return row[0] if row else None
+
+    def activity_stats(self):
+        """Estatísticas de cada atividade, na ordem dos prazos.
+
+        Cada item traz contagens, média, mediana, desvio padrão, percentis,
+        histograma (``HISTOGRAM_BINS`` faixas de 0 a ``MAX_GRADE``) e as
+        taxas de entrega no prazo e atrasada.
+        """
+        np = _numpy()
+        conn = self.db.connection()
+        # A versão é lida antes das notas: se algo mudar no meio, o cache
+        # guarda a versão antiga e a atividade é recalculada na próxima vez
+        versions = self._versions(conn)
+        with self._lock:
+            stale = [activity_id for activity_id, version in versions.items()
+                     if self._activities.get(activity_id, (None,))[0] != version]
+
+        if stale:
+            computed = self._compute_activities(np, conn, stale, len(stale) == len(versions))
+            with self._lock:
+                for activity_id in stale:
+                    self._activities[activity_id] = (versions[activity_id], computed[activity_id])
+                for activity_id in set(self._activities) - set(versions):
+                    del self._activities[activity_id]
+
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute("SELECT id, title, deadline FROM activities ORDER BY deadline, id")
+        with self._lock:
+            return [
+                dict(self._activities[activity_id][1], activity_id=activity_id, title=title, deadline=deadline)
+                for activity_id, title, deadline in cursor.fetchall()
+                if activity_id in self._activities
+            ]
+
+    def _fetch_grades(self, np, conn, activity_ids, everything):
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        # Entrega atrasada: o dia da entrega passou do prazo (que é só a data)
+        query = """
+            SELECT s.activity_id, s.grade, substr(s.submission_date, 1, 10) > a.deadline
+            FROM submissions s
+            JOIN activities a ON a.id = s.activity_id
+        """
+        if everything:
+            rows = cursor.execute(query).fetchall()
+        else:
+            rows = []
+            for start in range(0, len(activity_ids), _CHUNK):
+                chunk = activity_ids[start:start + _CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                rows.extend(cursor.execute(query + f" WHERE s.activity_id IN ({placeholders})", chunk))
+        # NULL (sem nota) vira NaN na conversão para float
+        data = np.array(rows, dtype=float).reshape(-1, 3)
+        return data[:, 0].astype(np.int64), data[:, 1], data[:, 2]
+
+    def _compute_activities(self, np, conn, activity_ids, everything):
+        ids, grades, late = self._fetch_grades(np, conn, activity_ids, everything)
+
+        # Atividades criadas depois da leitura das versões ficam para a próxima vez
+        lookup = np.array(activity_ids, dtype=np.int64)
+        known = np.isin(ids, lookup)
+        ids, grades, late = ids[known], grades[known], late[known]
+
+        # Os ids viram índices 0..n-1 para as funções de grupo
+        sorter = np.argsort(lookup)
+        groups = sorter[np.searchsorted(lookup, ids, sorter=sorter)]
+        size = len(activity_ids)
+
+        submitted = np.bincount(groups, minlength=size)
+        late_count = np.bincount(groups, weights=late, minlength=size)
+
+        graded = ~np.isnan(grades)
+        graded_groups, values = groups[graded], grades[graded]
+        count = np.bincount(graded_groups, minlength=size)
+        total = np.bincount(graded_groups, weights=values, minlength=size)
+        squares = np.bincount(graded_groups, weights=values * values, minlength=size)
+        minimum = np.full(size, np.inf)
+        maximum = np.full(size, -np.inf)
+        np.minimum.at(minimum, graded_groups, values)
+        np.maximum.at(maximum, graded_groups, values)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            # Desvio padrão populacional; max() evita raiz de -0.0000001
+            std = np.sqrt(np.maximum(squares / count - mean * mean, 0))
+            late_rate = late_count / submitted
+        quantiles = _group_quantiles(np, graded_groups, values, size, [p / 100 for p in PERCENTILES])
+
+        bins = np.minimum((values * HISTOGRAM_BINS / MAX_GRADE).astype(np.int64), HISTOGRAM_BINS - 1)
+        histogram = np.bincount(graded_groups * HISTOGRAM_BINS + bins,
+                                minlength=size * HISTOGRAM_BINS).reshape(size, HISTOGRAM_BINS)
+
+        result = {}
+        for position, activity_id in enumerate(activity_ids):
+            has_grades = count[position] > 0
+            result[activity_id] = {
+                "submissions": int(submitted[position]),
+                "graded": int(count[position]),
+                "mean": _number(mean[position]),
+                "median": _number(quantiles[position, PERCENTILES.index(50)]),
+                "stdev": _number(std[position]),
+                "min": _number(minimum[position]) if has_grades else None,
+                "max": _number(maximum[position]) if has_grades else None,
+                "percentiles": {p: _number(quantiles[position, column])
+                                for column, p in enumerate(PERCENTILES)},
+                "histogram": histogram[position].tolist(),
+                "late": int(late_count[position]),
+                "late_rate": _number(late_rate[position], 4),
+                "on_time_rate": _number(1 - late_rate[position], 4),
+            }
+        return result
+
+    def student_trends(self):
+        """Tendência das notas de cada aluno aprovado ao longo das atividades.
+
+        ``slope`` é a inclinação da reta de mínimos quadrados das notas em
+        função da ordem da atividade (pelo prazo): positiva quando o aluno
+        vem melhorando. Fica None com menos de duas notas.
+        """
+        np = _numpy()
+        conn = self.db.connection()
+        versions = self._versions(conn)
+        key = (self._students_version(conn), tuple(sorted(versions.items())))
+        with self._lock:
+            if self._trends is not None and self._trends[0] == key:
+                return self._trends[1]
+
+        trends = self._compute_trends(np, conn)
+        with self._lock:
+            self._trends = (key, trends)
+        return trends
+
+    def _compute_trends(self, np, conn):
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        # Ordenado por aluno e prazo: cada aluno é um bloco contíguo e a
+        # última linha do bloco é a nota mais recente
+        cursor.execute("""
+            WITH ordered AS (
+                SELECT id, deadline, ROW_NUMBER() OVER (ORDER BY deadline, id) AS position
+                FROM activities
+            )
+            SELECT st.rowid, o.position, s.grade, substr(s.submission_date, 1, 10) > o.deadline
+            FROM submissions s
+            JOIN ordered o ON o.id = s.activity_id
+            JOIN students st ON st.username = s.student_username
+            JOIN users u ON u.username = st.username
+            WHERE +u.is_approved = 1 AND s.grade IS NOT NULL
+            ORDER BY st.rowid, o.position
+        """)
+        data = np.array(cursor.fetchall(), dtype=float).reshape(-1, 4)
+        if not len(data):
+            return []
+
+        student_ids, groups = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+        x, y, late = data[:, 1], data[:, 2], data[:, 3]
+        size = len(student_ids)
+
+        n = np.bincount(groups, minlength=size)
+        sum_x = np.bincount(groups, weights=x, minlength=size)
+        sum_y = np.bincount(groups, weights=y, minlength=size)
+        sum_xx = np.bincount(groups, weights=x * x, minlength=size)
+        sum_xy = np.bincount(groups, weights=x * y, minlength=size)
+        late_count = np.bincount(groups, weights=late, minlength=size)
+        last = y[np.cumsum(n) - 1]
+
+        denominator = n * sum_xx - sum_x * sum_x
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = np.where((n > 1) & (denominator > 0),
+                             (n * sum_xy - sum_x * sum_y) / denominator, np.nan)
+        mean = sum_y / n
+
+        cursor.execute("SELECT rowid, username, nome, matricula FROM students")
+        students = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        trends = []
+        for position, student_id in enumerate(student_ids.tolist()):
+            username, nome, matricula = students[student_id]
+            trends.append({
+                "username": username,
+                "nome": nome,
+                "matricula": matricula,
+                "graded": int(n[position]),
+                "mean": _number(mean[position]),
+                "last": _number(last[position]),
+                "slope": _number(slope[position], 3),
+                "late": int(late_count[position]),
+            })
+        return trends
@@ -0,0 +1,484 @@
+"""API HTTP/JSON local sobre o AcademicService.
+
+Servidor HTTP/1.1 com keep-alive feito só com ``asyncio`` da biblioteca
+padrão, para scripts e integrações que não passam pela interface Tk. As
+chamadas ao banco (e o scrypt do login) rodam num ThreadPoolExecutor,
+então cada thread usa a sua conexão do ConnectionPool; um semáforo limita
+quantas requisições trabalham ao mesmo tempo.
+
+Rotas:
+    POST /login                   {"username", "password"} -> {"token", ...}
+    GET  /activities              atividades (do aluno, quando for aluno)
+    POST /activities              {"title", "description", "deadline"} (professor)
+    POST /submissions?activity_id=N
+                                  corpo = arquivo, nome no cabeçalho X-File-Name (aluno)
+    POST /grades                  {"grades": [{"submission_id", "grade", "feedback"}]}
+    GET  /progress                ?order_by=nome&descending=0&limit=50&offset=0
+    GET  /progress/<username>     entregas de um aluno
+    GET  /students/search?q=...
+
+Exceto /login, as rotas exigem ``Authorization: Bearer <token>``.
+
+Uso: python api.py --host 127.0.0.1 --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from changes import ChangeWatcher
+from grades import parse_grade
+from service import AcademicService
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_JSON_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+TOKEN_TTL = 8 * 60 * 60
+
+STATUS_TEXT = {
+    200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized",
+    403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, method, path, query, headers, reader, version="HTTP/1.1"):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.reader = reader
+        self.version = version
+        self.user = None
+        self.body_read = False
+
+    def param(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def int_param(self, name, default=None):
+        """Parâmetro inteiro da query string; sem ``default`` é obrigatório."""
+        value = self.param(name)
+        if value is None:
+            if default is None:
+                raise HTTPError(400, f"Informe o parâmetro '{name}'.")
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise HTTPError(400, f"Parâmetro '{name}' deve ser um número inteiro.")
+
+    def content_length(self, limit):
+        if "transfer-encoding" in self.headers:
+            raise HTTPError(411, "Envie o corpo com Content-Length.")
+        try:
+            length = int(self.headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Content-Length inválido.")
+        if length < 0:
+            raise HTTPError(400, "Content-Length inválido.")
+        if length > limit:
+            raise HTTPError(413, f"Corpo maior que o limite de {limit} bytes.")
+        return length
+
+    async def json(self):
+        data = await self.reader.readexactly(self.content_length(MAX_JSON_BYTES))
+        self.body_read = True
+        try:
+            body = json.loads(data or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Corpo JSON inválido.")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "O corpo deve ser um objeto JSON.")
+        return body
+
+    async def save_body(self, directory):
+        """Grava o corpo em blocos num arquivo temporário e retorna o caminho."""
+        remaining = self.content_length(MAX_UPLOAD_BYTES)
+        fd, path = tempfile.mkstemp(suffix=".upload", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while remaining:
+                    chunk = await self.reader.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise HTTPError(400, "Conexão encerrada antes do fim do arquivo.")
+                    out.write(chunk)
+                    remaining -= len(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        self.body_read = True
+        return path
+
+
+def to_json(value):
+    """Converte linhas do sqlite3 (e listas delas) em tipos serializáveis."""
+    if isinstance(value, sqlite3.Row):
+        return dict(value)
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+
+class TokenStore:
+    """Tokens de acesso em memória, emitidos pelo /login."""
+
+    def __init__(self, ttl=TOKEN_TTL):
+        self.ttl = ttl
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def issue(self, username, user_type):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._tokens[token] = (username, user_type, time.monotonic() + self.ttl)
+        return token
+
+    def get(self, token):
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del self._tokens[token]
+                return None
+            return {"username": entry[0], "user_type": entry[1]}
+
+    def revoke(self, username):
+        with self._lock:
+            for token in [token for token, entry in self._tokens.items() if entry[0] == username]:
+                del self._tokens[token]
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+class LoopScheduler:
+    """``after``/``after_cancel`` do Tk sobre o loop do asyncio.
+
+    Permite usar o ChangeWatcher no servidor: as sondagens rodam na thread
+    do loop, que é a única a usar a conexão dedicada dele.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def after(self, ms, callback):
+        return self.loop.call_later(ms / 1000, callback)
+
+    def after_cancel(self, handle):
+        handle.cancel()
+
+
+class APIServer:
+    def __init__(self, service, host="127.0.0.1", port=8765, workers=8, max_concurrent=32):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self.max_concurrent = max_concurrent
+        self.tokens = TokenStore()
+        self.server = None
+        self.watcher = None
+
+        # Escritas das outras máquinas (interface Tk) chegam pelo change_log:
+        # o serviço invalida o cache e aqui caem os tokens de contas alteradas
+        self.service.events.subscribe("db_changed", self.revoke_changed_users)
+
+        self.routes = [
+            ("POST", ("login",), self.login, False),
+            ("GET", ("activities",), self.list_activities, True),
+            ("POST", ("activities",), self.create_activity, True),
+            ("POST", ("submissions",), self.submit, True),
+            ("POST", ("grades",), self.save_grades, True),
+            ("GET", ("progress",), self.class_progress, True),
+            ("GET", ("progress", None), self.student_progress, True),
+            ("GET", ("students", "search"), self.search_students, True),
+        ]
+
+    def revoke_changed_users(self, changes):
+        if changes is None:
+            # Mudanças perdidas: não dá para saber quem foi recusado
+            self.tokens.clear()
+            return
+        for change in changes:
+            if change.table == "users" and change.op in ("U", "D"):
+                self.tokens.revoke(change.key)
+
+    async def call(self, function, *args):
+        """Roda uma chamada bloqueante do serviço no pool de threads."""
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    # Rotas
+
+    async def login(self, request):
+        body = await request.json()
+        username = body.get("username")
+        password = body.get("password")
+        if not isinstance(username, str) or not isinstance(password, str):
+            raise HTTPError(400, "Informe 'username' e 'password'.")
+        user = await self.call(self.service.authenticate, username, password)
+        if not user:
+            raise HTTPError(401, "Credenciais inválidas ou conta não aprovada!")
+        token = self.tokens.issue(username, user["user_type"])
+        return 200, {"token": token, "username": username, "user_type": user["user_type"],
+                     "expires_in": self.tokens.ttl}
+
+    async def list_activities(self, request):
+        user = request.user
+        if user["user_type"] == "aluno":
+            rows = await self.call(self.service.get_activities_for_student, user["username"])
+        else:
+            rows = await self.call(self.service.get_activities)
+        return 200, {"activities": to_json(rows)}
+
+    async def create_activity(self, request):
+        self.require(request, "professor")
+        body = await request.json()
+        title = (body.get("title") or "").strip()
+        deadline = (body.get("deadline") or "").strip()
+        if not title or not deadline:
+            raise HTTPError(400, "Preencha pelo menos o título e a data limite!")
+        try:
+            deadline = datetime.strptime(deadline, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            raise HTTPError(400, "Formato de data inválido! Use AAAA-MM-DD.")
+        success, message = await self.call(
+            self.service.create_activity, title, body.get("description") or "",
+            deadline, request.user["username"]
+        )
+        return (201 if success else 400), {"success": success, "message": message}
+
+    async def submit(self, request):
+        self.require(request, "aluno")
+        activity_id = request.int_param("activity_id")
+        file_name = os.path.basename(unquote(request.headers.get("x-file-name", "")))
+        if not file_name:
+            raise HTTPError(400, "Informe o nome do arquivo no cabeçalho X-File-Name.")
+        activities = await self.call(self.service.get_activities_for_student, request.user["username"])
+        if not any(row["id"] == activity_id for row in activities):
+            raise HTTPError(404, "Atividade não encontrada.")
+
+        # O nome original vira o nome do arquivo temporário: submit_activity
+        # grava o basename do caminho como nome da entrega
+        upload_dir = tempfile.mkdtemp(prefix="vclass-upload-")
+        try:
+            temp_path = await request.save_body(upload_dir)
+            path = os.path.join(upload_dir, file_name)
+            os.replace(temp_path, path)
+            success, message = await self.call(
+                self.service.submit_activity, activity_id, request.user["username"], path
+            )
+        finally:
+            for name in os.listdir(upload_dir):
+                os.remove(os.path.join(upload_dir, name))
+            os.rmdir(upload_dir)
+        return (201 if success else 400), {"success": success, "message": message}
+
+    async def save_grades(self, request):
+        self.require(request, "professor")
+        body = await request.json()
+        items = body.get("grades")
+        if not isinstance(items, list):
+            raise HTTPError(400, "Informe 'grades' como uma lista.")
+
+        grades = []
+        for item in items:
+            try:
+                submission_id = int(item["submission_id"])
+                grade = item.get("grade")
+                if grade is not None:
+                    grade = parse_grade(str(grade))
+            except (TypeError, KeyError, ValueError, AttributeError):
+                raise HTTPError(400, "Cada nota precisa de 'submission_id' e 'grade' entre 0 e 10.")
+            grades.append((submission_id, grade, item.get("feedback") or ""))
+
+        success, message = await self.call(self.service.grade_submissions, grades)
+        return (200 if success else 400), {"success": success, "message": message}
+
+    async def class_progress(self, request):
+        self.require(request, "professor", "admin")
+        order_by = request.param("order_by", "nome")
+        if order_by not in self.service.CLASS_PROGRESS_ORDER:
+            raise HTTPError(400, f"order_by deve ser um de: {', '.join(self.service.CLASS_PROGRESS_ORDER)}.")
+        descending = request.param("descending", "0") in ("1", "true")
+        limit = min(max(request.int_param("limit", 50), 1), 500)
+        offset = max(request.int_param("offset", 0), 0)
+        rows, total = await asyncio.gather(
+            self.call(self.service.get_class_progress_page, order_by, descending, None, limit, offset),
+            self.call(self.service.count_approved_students),
+        )
+        return 200, {"students": to_json(rows), "total": total, "limit": limit, "offset": offset}
+
+    async def student_progress(self, request, username):
+        user = request.user
+        if user["user_type"] == "aluno" and user["username"] != username:
+            raise HTTPError(403, "Alunos só podem ver o próprio progresso.")
+        rows = await self.call(self.service.get_student_submissions, username)
+        return 200, {"username": username, "submissions": to_json(rows)}
+
+    async def search_students(self, request):
+        self.require(request, "professor", "admin")
+        text = request.param("q", "")
+        limit = min(max(request.int_param("limit", 50), 1), 500)
+        rows = await self.call(self.service.search_students, text, limit)
+        return 200, {"students": to_json(rows)}
+
+    # Protocolo
+
+    def require(self, request, *user_types):
+        if request.user["user_type"] not in user_types:
+            raise HTTPError(403, "Acesso negado para este tipo de usuário.")
+
+    def resolve(self, method, path):
+        parts = tuple(unquote(part) for part in path.strip("/").split("/") if part)
+        allowed = False
+        for route_method, pattern, handler, needs_auth in self.routes:
+            if len(pattern) != len(parts) or any(p is not None and p != part for p, part in zip(pattern, parts)):
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            args = [part for p, part in zip(pattern, parts) if p is None]
+            return handler, args, needs_auth
+        if allowed:
+            raise HTTPError(405, "Método não permitido nesta rota.")
+        raise HTTPError(404, "Rota não encontrada.")
+
+    def authorize(self, request):
+        header = request.headers.get("authorization", "")
+        scheme, _, token = header.partition(" ")
+        user = self.tokens.get(token.strip()) if scheme.lower() == "bearer" else None
+        if user is None:
+            raise HTTPError(401, "Token ausente ou expirado; faça login em /login.")
+        return user
+
+    async def read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Linha de requisição inválida.")
+
+        headers = {}
+        size = len(line)
+        while True:
+            line = await reader.readline()
+            size += len(line)
+            if size > MAX_HEADER_BYTES:
+                raise HTTPError(413, "Cabeçalhos muito grandes.")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        return Request(method.upper(), url.path, parse_qs(url.query), headers, reader, version)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = None
+                try:
+                    request = await self.read_request(reader)
+                    if request is None:
+                        break
+                    handler, args, needs_auth = self.resolve(request.method, request.path)
+                    if needs_auth:
+                        request.user = self.authorize(request)
+                    status, payload = await handler(request, *args)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    status, payload = 500, {"error": f"Erro interno: {e}"}
+
+                keep_alive = (
+                    request is not None
+                    and request.version == "HTTP/1.1"
+                    and request.headers.get("connection", "").lower() != "close"
+                    # Corpo não consumido (erro antes da leitura) deixaria o fluxo dessincronizado
+                    and (request.body_read or request.headers.get("content-length", "0") == "0")
+                )
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def serve(self):
+        self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        self.watcher = ChangeWatcher(self.service.db, LoopScheduler(asyncio.get_running_loop()),
+                                     self.service.events)
+        self.watcher.start()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.watcher.stop()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP/JSON do Sistema Acadêmico")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="academic.db")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-concurrent", type=int, default=32)
+    args = parser.parse_args()
+
+    service = AcademicService(args.db)
+    server = APIServer(service, args.host, args.port, args.workers, args.max_concurrent)
+    print(f"API ouvindo em http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
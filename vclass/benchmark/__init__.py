@@ -0,0 +1,11 @@
+"""Benchmarks do sistema acadêmico, sem interface Tk.
+
+``dataset`` gera bancos sintéticos (``academic.db`` e arquivos de entrega)
+em várias escalas; ``runner`` cronometra os métodos do AcademicService e
+grava percentis em JSON, para comparar versões.
+
+Uso (a partir da pasta vclass)::
+
+    python -m benchmark generate --scale medio --out bench/medio
+    python -m benchmark run --data bench/medio --output medio.json --compare anterior.json
+"""
@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import sys
+
+# Os módulos do sistema são importados pelo nome, como no Main.py; isto
+# também permite rodar ``python benchmark`` sem estar na pasta vclass
+_VCLASS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _VCLASS_DIR not in sys.path:
+    sys.path.insert(0, _VCLASS_DIR)
+
+from benchmark.dataset import SCALES, generate_dataset
+from benchmark.runner import BenchmarkRunner, compare_results, save_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="Benchmarks do Sistema Acadêmico")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="gera um banco sintético")
+    generate.add_argument("--scale", choices=SCALES, default="pequeno")
+    generate.add_argument("--out", required=True, help="pasta do banco e das entregas")
+    generate.add_argument("--seed", type=int, default=1)
+    generate.add_argument("--students", type=int, help="substitui o número de alunos da escala")
+    generate.add_argument("--activities", type=int, help="substitui o número de atividades da escala")
+    generate.add_argument("--overwrite", action="store_true")
+
+    run = commands.add_parser("run", help="cronometra os métodos sobre um banco gerado")
+    run.add_argument("--data", required=True, help="pasta criada pelo generate")
+    run.add_argument("--repeat", type=int, default=50)
+    run.add_argument("--warmup", type=int, default=3)
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--only", nargs="*", help="prefixos dos casos a rodar")
+    run.add_argument("--output", help="arquivo JSON com os resultados")
+    run.add_argument("--compare", help="JSON de uma execução anterior")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        overrides = {key: value for key, value in
+                     (("students", args.students), ("activities", args.activities)) if value is not None}
+        info = generate_dataset(args.out, args.scale, args.seed, args.overwrite, **overrides)
+        print(json.dumps(info, ensure_ascii=False, indent=2))
+        return 0
+
+    runner = BenchmarkRunner(args.data, args.repeat, args.warmup, args.seed,
+                             progress=lambda message: print(message, file=sys.stderr))
+    try:
+        results = runner.run(args.only)
+    finally:
+        runner.close()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            results["comparison"] = compare_results(json.load(f), results)
+    if args.output:
+        save_results(args.output, results)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
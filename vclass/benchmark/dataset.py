@@ -0,0 +1,227 @@
+"""Geração de bancos sintéticos para os benchmarks.
+
+O banco é criado pelas migrações do sistema e preenchido com
+``executemany`` em lotes, passando pelos mesmos triggers (progresso,
+blobs, FTS, change_log) que as escritas reais. Todas as contas usam a
+senha ``BENCH_PASSWORD``; o hash é calculado uma vez só, com o custo de
+scrypt calibrado nesta máquina, então o login mede o KDF de verdade.
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from migrations import migrate
+from security import PasswordHasher, calibrate_scrypt
+from storage import BlobStore
+
+BENCH_PASSWORD = "benchmark"
+BATCH_SIZE = 10000
+
+# students: alunos aprovados; pending: cadastros aguardando aprovação;
+# submission_rate: fração dos alunos que entrega cada atividade
+SCALES = {
+    "pequeno": {"students": 100, "pending": 10, "professors": 3, "activities": 40,
+                "submission_rate": 0.8, "files": 50},
+    "medio": {"students": 10000, "pending": 300, "professors": 40, "activities": 1000,
+              "submission_rate": 0.2, "files": 500},
+    "grande": {"students": 100000, "pending": 2000, "professors": 300, "activities": 3000,
+               "submission_rate": 0.01, "files": 2000},
+}
+
+FIRST_NAMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela",
+    "João", "Larissa", "Lucas", "Mariana", "Mateus", "Natália", "Otávio", "Paula", "Rafael",
+    "Sofia", "Thiago", "Valéria", "Vinícius", "Yasmin", "Úrsula", "Ígor", "Letícia",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+    "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Araújo", "Melo", "Barbosa",
+    "Conceição", "Gonçalves", "Rocha", "Dias", "Nascimento", "Moreira", "Cardoso",
+]
+COURSES = ["Engenharia", "Direito", "Medicina", "Administração", "Computação", "Pedagogia", "Letras"]
+WORDS = [
+    "análise", "projeto", "relatório", "algoritmo", "estrutura", "dados", "hipótese", "método",
+    "resultado", "conclusão", "revisão", "referência", "experimento", "modelo", "síntese",
+    "argumento", "introdução", "capítulo", "tabela", "gráfico", "equação", "código", "teste",
+]
+FEEDBACK = [
+    "Bom trabalho", "Faltou a conclusão", "Revise as referências", "Excelente análise",
+    "Entregue fora do padrão", "Boa estrutura, mas pouca profundidade", "Cálculos incorretos",
+]
+
+
+def fake_cpf(rng):
+    """CPF com dígitos verificadores válidos."""
+    digits = [rng.randrange(10) for _ in range(9)]
+    for size in (9, 10):
+        total = sum(d * weight for d, weight in zip(digits, range(size + 1, 1, -1)))
+        digits.append((total * 10) % 11 % 10)
+    return "".join(map(str, digits))
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _write_files(rng, blobs, count, conn, created_at, progress):
+    """Cria ``count`` arquivos distintos no repositório de blobs.
+
+    Retorna ``[(hash, caminho, nome_do_arquivo)]``.
+    """
+    files = []
+    temp_dir = os.path.join(blobs.root, "..", "bench-tmp")
+    os.makedirs(temp_dir, exist_ok=True)
+    try:
+        for i in range(count):
+            # Metade texto (comprimível), metade binário aleatório
+            name = f"trabalho_{i}.txt" if i % 2 == 0 else f"trabalho_{i}.pdf"
+            path = os.path.join(temp_dir, name)
+            with open(path, "wb") as f:
+                if i % 2 == 0:
+                    f.write(_text(rng, rng.randrange(200, 4000)).encode("utf-8"))
+                else:
+                    f.write(b"%PDF-1.4\n" + rng.randbytes(rng.randrange(4096, 256 * 1024)))
+            blob_hash, size, codec, stored_size = blobs.put(path)
+            blobs.register(conn, blob_hash, size, codec, stored_size, created_at)
+            files.append((blob_hash, blobs.path_for(blob_hash, codec), name))
+            if progress and i % 50 == 0:
+                progress(f"arquivos: {i}/{count}")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return files
+
+
+def _insert_batches(conn, sql, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def generate_dataset(out_dir, scale="pequeno", seed=1, overwrite=False, progress=print, **overrides):
+    """Cria ``out_dir/academic.db`` e ``out_dir/submissions`` na escala pedida.
+
+    ``overrides`` substitui valores da escala (ex.: ``students=500``).
+    Retorna um dicionário com as contagens geradas e o tempo gasto.
+    """
+    params = dict(SCALES[scale], **overrides)
+    rng = random.Random(seed)
+    db_file = os.path.join(out_dir, "academic.db")
+    if os.path.exists(db_file):
+        if not overwrite:
+            raise FileExistsError(f"{db_file} já existe (use overwrite=True)")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_file + suffix):
+                os.remove(db_file + suffix)
+        shutil.rmtree(os.path.join(out_dir, "submissions"), ignore_errors=True)
+    os.makedirs(os.path.join(out_dir, "activities"), exist_ok=True)
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA journal_mode = wal")
+    # Só para a geração: uma queda no meio invalida o banco de qualquer forma
+    conn.execute("PRAGMA synchronous = off")
+    migrate(conn)
+
+    n = calibrate_scrypt()
+    password = PasswordHasher(n=n).hash(BENCH_PASSWORD)
+    base = datetime(2024, 2, 1)
+    now = base.strftime("%Y-%m-%d %H:%M:%S")
+    blobs = BlobStore(os.path.join(out_dir, "submissions", "blobs"))
+
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('scrypt_n', ?)", (str(n),))
+        conn.execute("INSERT INTO users VALUES ('admin', ?, 'admin', 1, 'system', ?)", (password, now))
+
+        professors = [f"prof_{i}" for i in range(params["professors"])]
+        conn.executemany(
+            "INSERT INTO users VALUES (?, ?, 'professor', 1, 'admin', ?)",
+            ((username, password, now) for username in professors)
+        )
+
+        total_students = params["students"] + params["pending"]
+        approved = []
+
+        def students():
+            for i in range(total_students):
+                matricula = str(2024000000 + i)
+                username = f"aluno_{matricula}"
+                is_approved = i < params["students"]
+                if is_approved:
+                    approved.append(username)
+                registered = (base + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+                nome = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+                yield (username, password, int(is_approved), "admin" if is_approved else None, registered,
+                       matricula, nome, fake_cpf(rng), rng.choice(COURSES),
+                       f"{username}@exemplo.edu.br")
+            if progress:
+                progress(f"alunos: {total_students}")
+
+        rows = list(students())
+        _insert_batches(conn, "INSERT INTO users VALUES (?, ?, 'aluno', ?, ?, ?)",
+                        (row[:5] for row in rows))
+        _insert_batches(conn, """
+            INSERT INTO students (username, matricula, nome, cpf, curso, email)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, ((row[0],) + row[5:] for row in rows))
+        del rows
+
+        _insert_batches(conn, """
+            INSERT INTO activities (title, description, deadline, created_at, created_by)
+            VALUES (?, ?, ?, ?, ?)
+        """, ((f"Atividade {i + 1}: {_text(rng, 3)}", _text(rng, 30),
+               (base + timedelta(days=i * 365 // params["activities"])).strftime("%Y-%m-%d"),
+               now, rng.choice(professors))
+              for i in range(params["activities"])))
+        activity_ids = [row[0] for row in conn.execute("SELECT id FROM activities ORDER BY id")]
+        if progress:
+            progress(f"atividades: {len(activity_ids)}")
+
+        files = _write_files(rng, blobs, params["files"], conn, now, progress)
+
+    per_activity = max(1, round(len(approved) * params["submission_rate"]))
+    submitted = 0
+    with conn:
+        def submissions():
+            nonlocal submitted
+            for index, activity_id in enumerate(activity_ids):
+                for username in rng.sample(approved, per_activity):
+                    blob_hash, path, name = rng.choice(files)
+                    graded = rng.random() < 0.6
+                    yield (activity_id, username, now, path, blob_hash, name,
+                           round(rng.uniform(0, 10), 1) if graded else None,
+                           rng.choice(FEEDBACK) if graded else None)
+                submitted += per_activity
+                if progress and index % 100 == 0:
+                    progress(f"entregas: {submitted}")
+
+        _insert_batches(conn, """
+            INSERT INTO submissions (
+                activity_id, student_username, submission_date, file_path,
+                blob_hash, file_name, grade, feedback
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, submissions())
+
+    conn.execute("ANALYZE")
+    conn.close()
+
+    return {
+        "scale": scale,
+        "seed": seed,
+        "students": params["students"],
+        "pending": params["pending"],
+        "professors": params["professors"],
+        "activities": len(activity_ids),
+        "submissions": submitted,
+        "files": len(files),
+        "scrypt_n": n,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
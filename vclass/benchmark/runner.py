@@ -0,0 +1,201 @@
+"""Cronometra os métodos do AcademicService sobre um banco gerado.
+
+Cada caso roda ``repeat`` vezes (após ``warmup`` execuções descartadas)
+com argumentos sorteados, e o resultado traz percentis em milissegundos.
+Consultas com cache aparecem duas vezes: o nome puro mede o banco (cache
+limpo antes de cada chamada) e o sufixo ``[cache]`` mede o acerto.
+
+Os casos de escrita (``submit_activity``, ``grade_submission``) alteram o
+banco do benchmark; gere-o de novo para comparar execuções exatamente
+iguais.
+"""
+
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from benchmark.dataset import BENCH_PASSWORD
+from migrations import LATEST_VERSION
+from service import AcademicService
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentiles(samples):
+    """Resumo de uma lista de durações em segundos (saída em ms)."""
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def at(p):
+        # Interpolação linear entre as duas amostras vizinhas
+        position = (count - 1) * p / 100
+        low = int(position)
+        high = min(low + 1, count - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+    summary = {"count": count, "min": ordered[0], "mean": statistics.fmean(ordered)}
+    summary.update({f"p{p}": at(p) for p in PERCENTILES})
+    summary["max"] = ordered[-1]
+    return {key: (round(value * 1000, 4) if key != "count" else value) for key, value in summary.items()}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class BenchmarkRunner:
+    def __init__(self, data_dir, repeat=50, warmup=3, seed=1, progress=print):
+        self.data_dir = data_dir
+        self.repeat = repeat
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+        self.progress = progress
+        self.service = AcademicService(
+            os.path.join(data_dir, "academic.db"),
+            os.path.join(data_dir, "activities"),
+            os.path.join(data_dir, "submissions"),
+        )
+        self._upload_dir = tempfile.mkdtemp(prefix="vclass-bench-")
+
+        conn = self.service.db.connection()
+        self.students = [row[0] for row in conn.execute(
+            "SELECT username FROM users WHERE user_type = 'aluno' AND is_approved = 1"
+        )]
+        self.activity_ids = [row[0] for row in conn.execute("SELECT id FROM activities")]
+        self.submission_ids = [row[0] for row in conn.execute("SELECT id FROM submissions")]
+        if not self.students or not self.activity_ids:
+            raise ValueError(f"{data_dir} não tem alunos e atividades; gere o banco antes")
+
+    def dataset_info(self):
+        conn = self.service.db.connection()
+        info = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("users", "students", "activities", "submissions", "blobs")}
+        info["db_bytes"] = os.path.getsize(self.service.db_file)
+        info["scrypt_n"] = self.service.hasher.n
+        return info
+
+    def time_case(self, call, before=None):
+        samples = []
+        for i in range(self.warmup + self.repeat):
+            args = before() if before else ()
+            start = time.perf_counter()
+            call(*args)
+            elapsed = time.perf_counter() - start
+            if i >= self.warmup:
+                samples.append(elapsed)
+        return percentiles(samples)
+
+    # Geradores de argumentos
+
+    def _student(self):
+        return self.rng.choice(self.students)
+
+    def _cold(self, args_factory=tuple):
+        def before():
+            self.service.query_cache.clear()
+            return args_factory()
+        return before
+
+    def _login(self):
+        # Sem a sessão em cache o login roda o scrypt, como no primeiro acesso
+        self.service.sessions.invalidate()
+        return self._student(), BENCH_PASSWORD
+
+    def _upload(self):
+        path = os.path.join(self._upload_dir, "entrega.txt")
+        with open(path, "wb") as f:
+            f.write(os.urandom(32 * 1024))
+        return self.rng.choice(self.activity_ids), self._student(), path
+
+    def _grade(self):
+        return (self.rng.choice(self.submission_ids), round(self.rng.uniform(0, 10), 1),
+                "Avaliado pelo benchmark")
+
+    def cases(self):
+        """``(nome, chamada, gerador_de_argumentos)`` de cada medição."""
+        service = self.service
+        student = lambda: (self._student(),)
+        cases = [
+            ("login", service.authenticate, self._login),
+            ("login[sessao]", service.authenticate, lambda: (self.students[0], BENCH_PASSWORD)),
+            ("get_activities_for_student", service.get_activities_for_student, self._cold(student)),
+            ("get_activities_for_student[cache]", service.get_activities_for_student,
+             lambda: (self.students[0],)),
+            ("get_student_submissions", service.get_student_submissions, self._cold(student)),
+            ("get_class_progress", service.get_class_progress, self._cold()),
+            ("get_class_progress[cache]", service.get_class_progress, None),
+            ("get_class_progress_page", service.get_class_progress_page, self._cold()),
+            ("get_class_progress_page[progresso]",
+             lambda: service.get_class_progress_page("progresso", True), self._cold()),
+            ("count_approved_students", service.count_approved_students, self._cold()),
+            ("get_pending_students", service.get_pending_students, self._cold()),
+            ("search_students", service.search_students,
+             lambda: (self.rng.choice(["silva", "ana", "oliv", "2024000"]),)),
+            ("submit_activity", service.submit_activity, self._upload),
+        ]
+        if self.submission_ids:
+            cases.append(("grade_submission", service.grade_submission, self._grade))
+        return cases
+
+    def run(self, only=None):
+        results = {}
+        for name, call, before in self.cases():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            if self.progress:
+                self.progress(f"{name}...")
+            results[name] = self.time_case(call, before)
+            if self.progress:
+                r = results[name]
+                self.progress(f"    p50 {r['p50']:.3f} ms   p95 {r['p95']:.3f} ms   p99 {r['p99']:.3f} ms")
+
+        return {
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": _git_revision(),
+            "schema_version": LATEST_VERSION,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": self.repeat,
+            "warmup": self.warmup,
+            "dataset": self.dataset_info(),
+            "results": results,
+        }
+
+    def close(self):
+        self.service.close()
+        for name in os.listdir(self._upload_dir):
+            os.remove(os.path.join(self._upload_dir, name))
+        os.rmdir(self._upload_dir)
+
+
+def compare_results(previous, current, metrics=("p50", "p95")):
+    """Razão atual/anterior por caso e métrica (> 1 significa mais lento)."""
+    comparison = {}
+    for name, result in current["results"].items():
+        before = previous.get("results", {}).get(name)
+        if not before:
+            continue
+        comparison[name] = {
+            metric: round(result[metric] / before[metric], 3) if before[metric] else None
+            for metric in metrics
+        }
+    return comparison
+
+
+def save_results(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
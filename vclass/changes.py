@@ -0,0 +1,83 @@
+"""Observa o banco compartilhado e avisa os painéis abertos sobre mudanças.
+
+Várias máquinas usam o mesmo ``academic.db``. Os triggers da migração 11
+gravam cada alteração em ``change_log``; o ``ChangeWatcher`` consulta
+``PRAGMA data_version`` (que muda quando outra conexão faz commit e não
+lê nenhuma tabela) e só então busca as linhas novas do registro,
+publicando-as no barramento de eventos.
+"""
+
+from collections import namedtuple
+
+Change = namedtuple("Change", "table op key related")
+
+
+class ChangeWatcher:
+    """Sonda o banco a cada ``interval_ms`` pela thread do Tk.
+
+    ``root`` só precisa de ``after``/``after_cancel``; a API usa um
+    adaptador para o loop do asyncio (``api.LoopScheduler``).
+
+    Publica ``db_changed(changes=[Change, ...])``; ``changes=None`` indica
+    que o registro foi podado antes de ser lido e tudo deve ser recarregado.
+    """
+
+    def __init__(self, db, root, events, interval_ms=1000):
+        self.db = db
+        self.root = root
+        self.events = events
+        self.interval_ms = interval_ms
+
+        self._conn = None
+        self._version = None
+        self._last_id = 0
+        self._job = None
+
+    def start(self):
+        self._conn = self.db.dedicated()
+        self._version = self._data_version()
+        self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM change_log").fetchone()[0]
+        self._schedule()
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _schedule(self):
+        self._job = self.root.after(self.interval_ms, self.poll)
+
+    def _data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll(self):
+        try:
+            version = self._data_version()
+            if version != self._version:
+                self._version = version
+                self._read_changes()
+        finally:
+            self._schedule()
+
+    def _read_changes(self):
+        rows = self._conn.execute("""
+            SELECT id, table_name, op, row_key, related_key FROM change_log
+            WHERE id > ? ORDER BY id
+        """, (self._last_id,)).fetchall()
+        if not rows:
+            return
+
+        # Se a primeira linha nova não é a seguinte, a poda chegou antes de nós
+        oldest = self._conn.execute("SELECT MIN(id) FROM change_log").fetchone()[0]
+        lost = self._last_id and oldest > self._last_id + 1
+        self._last_id = rows[-1]["id"]
+
+        if lost:
+            self.events.publish("db_changed", changes=None)
+            return
+
+        # Várias alterações na mesma linha viram um único aviso
+        changes = list(dict.fromkeys(
+            Change(row["table_name"], row["op"], row["row_key"], row["related_key"]) for row in rows
+        ))
+        self.events.publish("db_changed", changes=changes)
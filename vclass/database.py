@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+
+from instrumentation import InstrumentedConnection
+
+
+class ConnectionPool:
+    """Mantém uma conexão SQLite de longa duração por thread.
+
+    Abrir uma conexão a cada consulta custa o handshake com o arquivo e
+    descarta o cache de páginas; aqui cada thread reaproveita a sua própria
+    conexão, já configurada com os PRAGMAs de desempenho.
+    """
+
+    def __init__(self, db_file, journal_mode="wal", synchronous="normal",
+                 cache_size_kb=16384, mmap_size=64 * 1024 * 1024,
+                 busy_timeout_ms=5000, cached_statements=256, query_stats=None):
+        self.db_file = db_file
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        # QueryStats opcional: mede cada consulta das conexões do pool
+        self.query_stats = query_stats
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+            # Cada conexão só é usada pela thread que a criou; a flag apenas
+            # permite que close_all() feche todas ao encerrar a aplicação.
+            check_same_thread=False,
+            factory=InstrumentedConnection if self.query_stats is not None else sqlite3.Connection,
+        )
+        if self.query_stats is not None:
+            conn.query_stats = self.query_stats
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if self.journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        # Valor negativo = tamanho em KiB em vez de número de páginas
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = memory")
+        return conn
+
+    def connection(self):
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada.
+
+        Pode ser usada como gerenciador de contexto (``with pool.connection()
+        as conn``): o bloco faz commit ou rollback, mas não fecha a conexão.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def dedicated(self):
+        """Abre uma conexão exclusiva, fora do esquema de uma por thread.
+
+        Usada por quem precisa de uma conexão própria (ex.: o observador de
+        mudanças, já que ``PRAGMA data_version`` só enxerga commits de
+        outras conexões). Também é fechada por ``close_all``.
+        """
+        conn = self._open()
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def release_thread(self):
+        """Fecha a conexão da thread atual (usado por threads que terminam)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        self._local = threading.local()
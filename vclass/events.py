@@ -0,0 +1,164 @@
+"""Barramento de eventos e cache das consultas do AcademicSystem.
+
+As escritas publicam eventos (ex.: ``submission_saved``) e o cache
+descarta só as consultas marcadas com as etiquetas afetadas, por exemplo
+``submissions:aluno_123``. Além disso cada entrada expira após ``ttl``
+segundos, cobrindo alterações feitas por outras máquinas no mesmo banco.
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+class EventBus:
+    """Publicação/assinatura simples; os assinantes rodam na thread de quem publica."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, event, callback):
+        with self._lock:
+            self._subscribers[event].append(callback)
+        return lambda: self.unsubscribe(event, callback)
+
+    def unsubscribe(self, event, callback):
+        with self._lock:
+            if callback in self._subscribers[event]:
+                self._subscribers[event].remove(callback)
+
+    def publish(self, event, **payload):
+        with self._lock:
+            subscribers = list(self._subscribers[event])
+        for callback in subscribers:
+            callback(**payload)
+
+
+class QueryCache:
+    """Cache LRU com expiração para resultados de consultas.
+
+    Cada entrada tem etiquetas; ``invalidate(etiqueta)`` remove as entradas
+    marcadas com ela. Consultas iguais feitas ao mesmo tempo por threads
+    diferentes esperam a primeira em vez de irem todas ao banco.
+    """
+
+    def __init__(self, max_entries=256, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._entries = OrderedDict()
+        self._tags = defaultdict(set)
+        self._inflight = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, tags, load):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    self.misses += 1
+                    waiting = self._inflight[key] = threading.Event()
+                    generation = self._generation
+                    break
+            # Outra thread já está buscando esta mesma consulta
+            waiting.wait()
+
+        try:
+            value = load()
+            with self._lock:
+                # Uma escrita durante a consulta pode ter deixado o valor velho
+                if generation == self._generation:
+                    self._store(key, tags, value)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            waiting.set()
+
+    def _store(self, key, tags, value):
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags[tag].add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for tag in entry[2]:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+    def invalidate(self, *tags):
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def cached_query(*tags):
+    """Guarda o resultado de um método de consulta em ``self.query_cache``.
+
+    As etiquetas podem usar os argumentos do método, por exemplo
+    ``"submissions:{student_username}"``. Listas são devolvidas como cópia
+    para que quem chama possa alterá-las sem afetar o cache.
+    """
+    def decorator(method):
+        # Nomes e valores padrão dos parâmetros, lidos do código do método
+        # (mais leve que inspect.signature, que pesa na abertura do programa)
+        code = method.__code__
+        names = code.co_varnames[1:code.co_argcount]
+        defaults = method.__defaults__ or ()
+        default_arguments = dict(zip(names[len(names) - len(defaults):], defaults))
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            arguments = dict(default_arguments)
+            arguments.update(zip(names, args))
+            arguments.update(kwargs)
+            key = (method.__name__,) + tuple(arguments[name] for name in names)
+            entry_tags = tuple(tag.format(**arguments) for tag in tags)
+
+            value = self.query_cache.get_or_load(
+                key, entry_tags, lambda: method(self, *args, **kwargs)
+            )
+            return list(value) if isinstance(value, list) else value
+        return wrapper
+    return decorator
@@ -0,0 +1,346 @@
+"""Exportação de relatórios (progresso da turma, notas, histórico) em CSV, XLSX e PDF.
+
+As linhas chegam de um iterador sobre o cursor e são gravadas uma a uma,
+então a memória não cresce com o tamanho da turma. O XLSX é montado à mão
+com ``zipfile`` (células com texto embutido, sem tabela de strings
+compartilhadas) e o PDF usa as fontes padrão Helvetica, sem bibliotecas
+externas.
+"""
+
+import csv
+import os
+import re
+import zipfile
+import zlib
+from collections import namedtuple
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+# width: largura da coluna no PDF, em pontos; format: valor -> valor exibido
+Column = namedtuple("Column", "header key width format", defaults=(None,))
+Report = namedtuple("Report", "title columns")
+
+EXPORT_FORMATS = (".csv", ".xlsx", ".pdf")
+PROGRESS_EVERY = 500
+
+
+def _grade(value):
+    return "" if value is None else value
+
+
+def _percent(value):
+    return round(value or 0, 1)
+
+
+def class_progress_report():
+    return Report("Progresso da Turma", [
+        Column("Nome", "nome", 190),
+        Column("Matrícula", "matricula", 85),
+        Column("Progresso (%)", "progresso", 75, _percent),
+        Column("Entregas", "entregas", 60),
+        Column("Total de Atividades", "total_atividades", 105),
+    ])
+
+
+def activity_grades_report(title):
+    return Report(f"Notas - {title}", [
+        Column("Matrícula", "matricula", 75),
+        Column("Nome", "nome", 160),
+        Column("Entregue em", "submission_date", 95),
+        Column("Nota", "grade", 40, _grade),
+        Column("Feedback", "feedback", 145),
+    ])
+
+
+def student_transcript_report(nome, matricula):
+    return Report(f"Histórico - {nome} ({matricula})", [
+        Column("Atividade", "title", 170),
+        Column("Prazo", "deadline", 65),
+        Column("Entregue em", "submission_date", 95),
+        Column("Nota", "grade", 40, _grade),
+        Column("Feedback", "feedback", 145),
+    ])
+
+
+def _values(columns, row):
+    values = []
+    for column in columns:
+        value = row[column.key]
+        if column.format is not None:
+            value = column.format(value)
+        values.append("" if value is None else value)
+    return values
+
+
+# CSV
+
+def _write_csv(path, report, rows, tick):
+    # Mesmo formato do CSV de notas: ";" e BOM, para abrir direto no Excel
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([column.header for column in report.columns])
+        for row in rows:
+            writer.writerow(_values(report.columns, row))
+            if not tick():
+                return False
+    return True
+
+
+# XLSX
+
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+# Estilo 0: normal; estilo 1: negrito (cabeçalho)
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>
+</styleSheet>"""
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref, value, style=0):
+    style_attr = f' s="{style}"' if style else ""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        text = escape(_XML_INVALID.sub("", str(value)))
+        return f'<c r="{ref}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+    return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+
+
+def _write_xlsx(path, report, rows, tick):
+    letters = [_column_letter(i) for i in range(len(report.columns))]
+    # Nome da aba: até 31 caracteres, sem os proibidos pelo Excel
+    sheet_name = escape(re.sub(r"[\[\]:*?/\\]", " ", report.title)[:31])
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(name=sheet_name))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", _STYLES)
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            cols = "".join(
+                f'<col min="{i + 1}" max="{i + 1}" width="{max(column.width / 6, 8):.0f}" customWidth="1"/>'
+                for i, column in enumerate(report.columns)
+            )
+            header = "".join(_xlsx_cell(f"{letters[i]}1", column.header, 1)
+                             for i, column in enumerate(report.columns))
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                '</sheetView></sheetViews>'
+                f'<cols>{cols}</cols><sheetData><row r="1">{header}</row>'
+            ).encode("utf-8"))
+
+            buffer = []
+            for number, row in enumerate(rows, start=2):
+                cells = "".join(_xlsx_cell(f"{letters[i]}{number}", value)
+                                for i, value in enumerate(_values(report.columns, row)))
+                buffer.append(f'<row r="{number}">{cells}</row>')
+                if len(buffer) >= PROGRESS_EVERY:
+                    sheet.write("".join(buffer).encode("utf-8"))
+                    buffer.clear()
+                if not tick():
+                    return False
+            buffer.append("</sheetData></worksheet>")
+            sheet.write("".join(buffer).encode("utf-8"))
+    return True
+
+
+# PDF
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 em pontos
+MARGIN = 40
+FONT_SIZE = 9
+LINE_HEIGHT = 13
+# Largura média de um caractere da Helvetica, em frações do tamanho da fonte
+_AVERAGE_CHAR_WIDTH = 0.52
+
+
+def _pdf_text(value):
+    text = str(value).encode("cp1252", "replace")
+    return text.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _fit(value, width, size=FONT_SIZE):
+    text = f"{value:g}" if isinstance(value, float) else " ".join(str(value).split())
+    limit = max(int(width / (size * _AVERAGE_CHAR_WIDTH)) - 1, 1)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class _PDFWriter:
+    """Grava objetos PDF em sequência, guardando só os offsets para o xref."""
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = {}
+        self.next_id = 1
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def reserve(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def write(self, object_id, body):
+        self.offsets[object_id] = self.f.tell()
+        self.f.write(f"{object_id} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+
+    def stream(self, object_id, data):
+        data = zlib.compress(data)
+        self.write(object_id, f"<< /Length {len(data)} /Filter /FlateDecode >>\nstream\n".encode("ascii")
+                   + data + b"\nendstream")
+
+    def finish(self, root_id):
+        xref = self.f.tell()
+        count = self.next_id
+        lines = [f"xref\n0 {count}\n0000000000 65535 f \n"]
+        lines.extend(f"{self.offsets[i]:010d} 00000 n \n" for i in range(1, count))
+        lines.append(f"trailer\n<< /Size {count} /Root {root_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+        self.f.write("".join(lines).encode("ascii"))
+
+
+def _write_pdf(path, report, rows, tick):
+    generated = datetime.now().strftime("%d/%m/%Y %H:%M")
+    x_positions = []
+    x = MARGIN
+    for column in report.columns:
+        x_positions.append(x)
+        x += column.width
+    top = PAGE_HEIGHT - MARGIN
+    rows_per_page = int((top - 60 - MARGIN) / LINE_HEIGHT)
+
+    with open(path, "wb") as f:
+        pdf = _PDFWriter(f)
+        catalog_id, pages_id, font_id, bold_id = (pdf.reserve() for _ in range(4))
+        pdf.write(font_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        pdf.write(bold_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+        page_ids = []
+
+        def text(font, size, x, y, value):
+            return b"BT /%s %d Tf %.1f %.1f Td (%s) Tj ET\n" % (font, size, x, y, _pdf_text(value))
+
+        def flush_page(lines):
+            number = len(page_ids) + 1
+            content = [
+                text(b"F2", 13, MARGIN, top - 4, _fit(report.title, PAGE_WIDTH - 2 * MARGIN, 13)),
+                text(b"F1", 8, MARGIN, top - 20, f"Gerado em {generated}"),
+                text(b"F1", 8, PAGE_WIDTH - MARGIN - 50, MARGIN - 20, f"Página {number}"),
+                b"0.6 G %d %.1f m %d %.1f l S\n" % (MARGIN, top - 45, PAGE_WIDTH - MARGIN, top - 45),
+            ]
+            for column, x in zip(report.columns, x_positions):
+                content.append(text(b"F2", FONT_SIZE, x, top - 40, _fit(column.header, column.width)))
+            y = top - 45 - LINE_HEIGHT
+            for values in lines:
+                for column, x, value in zip(report.columns, x_positions, values):
+                    if value != "":
+                        content.append(text(b"F1", FONT_SIZE, x, y, _fit(value, column.width)))
+                y -= LINE_HEIGHT
+
+            content_id, page_id = pdf.reserve(), pdf.reserve()
+            pdf.stream(content_id, b"".join(content))
+            pdf.write(page_id, (
+                f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 {font_id} 0 R /F2 {bold_id} 0 R >> >> "
+                f"/Contents {content_id} 0 R >>"
+            ).encode("ascii"))
+            page_ids.append(page_id)
+
+        completed = True
+        lines = []
+        for row in rows:
+            lines.append(_values(report.columns, row))
+            if len(lines) == rows_per_page:
+                flush_page(lines)
+                lines = []
+            if not tick():
+                completed = False
+                break
+        if lines or not page_ids:
+            flush_page(lines)
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+        pdf.write(pages_id, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii"))
+        pdf.write(catalog_id, f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode("ascii"))
+        pdf.finish(catalog_id)
+    return completed
+
+
+_WRITERS = {".csv": _write_csv, ".xlsx": _write_xlsx, ".pdf": _write_pdf}
+
+
+def export_rows(path, report, rows, total=None, progress=None, cancelled=None):
+    """Grava ``rows`` em ``path`` no formato indicado pela extensão.
+
+    ``progress(feitas, total)`` é chamado a cada ``PROGRESS_EVERY`` linhas.
+    Retorna quantas linhas foram exportadas, ou ``None`` se ``cancelled()``
+    interrompeu a exportação (o arquivo incompleto é apagado).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    writer = _WRITERS.get(extension)
+    if writer is None:
+        raise ValueError(f"Formato não suportado: {extension or path} (use CSV, XLSX ou PDF)")
+
+    done = 0
+
+    def tick():
+        nonlocal done
+        done += 1
+        if done % PROGRESS_EVERY == 0:
+            if cancelled is not None and cancelled():
+                return False
+            if progress:
+                progress(done, total)
+        return True
+
+    try:
+        completed = writer(path, report, rows, tick)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    if not completed:
+        os.remove(path)
+        return None
+    if progress:
+        progress(done, total)
+    return done
@@ -0,0 +1,60 @@
+import csv
+
+from importer import read_csv_rows
+
+GRADE_COLUMNS = ("matricula", "nome", "nota", "feedback")
+
+
+def parse_grade(text):
+    """Converte a nota digitada (aceita vírgula decimal) e valida o intervalo 0-10.
+
+    Retorna ``None`` para texto vazio e levanta ``ValueError`` se inválida.
+    """
+    text = str(text).strip().replace(",", ".")
+    if not text:
+        return None
+    grade = float(text)
+    if not 0 <= grade <= 10:
+        raise ValueError(text)
+    return grade
+
+
+def format_grade(grade):
+    return "" if grade is None else f"{grade:g}"
+
+
+def write_grades_csv(path, submissions):
+    """Grava as notas de uma atividade no formato aberto pelo Excel (``;``)."""
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(GRADE_COLUMNS)
+        for sub in submissions:
+            writer.writerow((sub["matricula"], sub["nome"], format_grade(sub["grade"]),
+                             sub["feedback"] or ""))
+
+
+def read_grades_csv(path, submissions):
+    """Casa as linhas do CSV com as entregas da atividade pela matrícula.
+
+    Retorna ``(notas, erros)``: ``notas`` mapeia o id da entrega para
+    ``(nota, feedback)`` e ``erros`` lista ``(linha, matricula, mensagem)``.
+    Linhas com nota vazia são ignoradas.
+    """
+    by_matricula = {sub["matricula"]: sub for sub in submissions}
+    grades = {}
+    errors = []
+
+    for line_number, data in read_csv_rows(path):
+        matricula = data.get("matricula", "")
+        sub = by_matricula.get(matricula)
+        if sub is None:
+            errors.append((line_number, matricula, "Sem entrega nesta atividade"))
+            continue
+        try:
+            grade = parse_grade(data.get("nota", ""))
+        except ValueError:
+            errors.append((line_number, matricula, "Nota inválida"))
+            continue
+        if grade is not None:
+            grades[sub["id"]] = (grade, data.get("feedback", sub["feedback"] or ""))
+    return grades, errors
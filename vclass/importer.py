@@ -0,0 +1,223 @@
+import csv
+import os
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from security import INITIAL_PBKDF2_ITERATIONS, INITIAL_SCRYPT_N
+
+STUDENT_FIELDS = ("matricula", "nome", "data_nascimento", "cpf", "curso", "email", "telefone", "endereco")
+REQUIRED_FIELDS = ("nome", "matricula", "cpf")
+
+# Limite de parâmetros por consulta no SQLite anterior à 3.32
+MAX_SQL_VARIABLES = 999
+
+
+def valid_cpf(cpf):
+    """Confere formato e dígitos verificadores (aceita com ou sem pontuação)."""
+    digits = re.sub(r"\D", "", cpf or "")
+    if len(digits) != 11 or digits == digits[0] * 11:
+        return False
+    for size in (9, 10):
+        total = sum(int(d) * weight for d, weight in zip(digits[:size], range(size + 1, 1, -1)))
+        check = (total * 10) % 11 % 10
+        if check != int(digits[size]):
+            return False
+    return True
+
+
+# Cabeçalhos aceitos além dos nomes das colunas (iguais ao formulário de cadastro)
+HEADER_ALIASES = {
+    "nome_completo": "nome",
+    "e-mail": "email",
+    "data_de_nascimento": "data_nascimento",
+}
+
+
+def _normalize_header(name):
+    name = unicodedata.normalize("NFKD", (name or "").strip().lower().rstrip(":"))
+    name = "".join(c for c in name if not unicodedata.combining(c)).replace(" ", "_")
+    return HEADER_ALIASES.get(name, name)
+
+
+def read_csv_rows(path):
+    """Lê um CSV (separador detectado) e gera ``(linha, dados)`` por cabeçalho normalizado."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = [_normalize_header(name) for name in next(reader, [])]
+        for line_number, values in enumerate(reader, start=2):
+            if any(value.strip() for value in values):
+                yield line_number, dict(zip(header, (value.strip() for value in values)))
+
+
+def _read_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("Importar planilhas .xlsx requer o pacote openpyxl")
+
+    # read_only percorre a planilha linha a linha, sem carregá-la inteira
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_normalize_header(str(name or "")) for name in next(rows, ())]
+        for line_number, values in enumerate(rows, start=2):
+            values = ["" if value is None else str(value).strip() for value in values]
+            if any(values):
+                yield line_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def read_student_rows(path):
+    """Lê um arquivo CSV ou XLSX e gera ``(linha, dados)`` sob demanda."""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        return _read_xlsx(path)
+    return read_csv_rows(path)
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.errors = []
+
+    def add_error(self, line_number, matricula, message):
+        self.errors.append((line_number, matricula, message))
+
+    def write_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["linha", "matricula", "erro"])
+            writer.writerows(self.errors)
+
+
+class StudentImporter:
+    """Importa alunos em lote a partir de CSV/XLSX.
+
+    O arquivo é lido sob demanda em blocos de ``chunk_size`` linhas. Cada
+    bloco é validado de uma vez (campos obrigatórios, CPF, matrícula
+    repetida no arquivo ou já cadastrada, com uma única consulta ao banco)
+    e gravado com ``executemany`` numa transação própria. As senhas
+    iniciais (o CPF, como no cadastro manual) passam pelo KDF em paralelo,
+    com o custo reduzido de ``initial_n``/``initial_iterations``: o login
+    regrava cada uma com o custo normal do ``hasher``.
+    """
+
+    def __init__(self, db, hasher, chunk_size=500, hash_workers=4,
+                 initial_n=INITIAL_SCRYPT_N, initial_iterations=INITIAL_PBKDF2_ITERATIONS):
+        self.db = db
+        self.hasher = hasher.with_cost(initial_n, initial_iterations)
+        self.chunk_size = chunk_size
+        self.hash_workers = hash_workers
+
+    def run(self, path, auto_approve=False, approved_by=None, progress=None):
+        report = ImportReport()
+        seen = set()
+        conn = self.db.connection()
+
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as pool:
+            for chunk in _chunks(read_student_rows(path), self.chunk_size):
+                valid = self._validate(conn, chunk, seen, report)
+                if valid:
+                    passwords = list(pool.map(self.hasher.hash, (data["cpf"] for _, data in valid)))
+                    self._insert(conn, valid, passwords, auto_approve, approved_by, report)
+                if progress:
+                    progress(report.imported, len(report.errors))
+        return report
+
+    def _validate(self, conn, chunk, seen, report):
+        candidates = []
+        for line_number, data in chunk:
+            matricula = data.get("matricula", "")
+            missing = [field for field in REQUIRED_FIELDS if not data.get(field)]
+            if missing:
+                report.add_error(line_number, matricula, f"Campo obrigatório faltando: {', '.join(missing)}")
+            elif not valid_cpf(data["cpf"]):
+                report.add_error(line_number, matricula, "CPF inválido")
+            elif matricula in seen:
+                report.add_error(line_number, matricula, "Matrícula repetida no arquivo")
+            else:
+                seen.add(matricula)
+                candidates.append((line_number, data))
+
+        if not candidates:
+            return []
+
+        # Uma consulta por bloco para as matrículas que já existem no banco
+        existing = self._existing(conn, [data["matricula"] for _, data in candidates])
+
+        valid = []
+        for line_number, data in candidates:
+            if data["matricula"] in existing:
+                report.add_error(line_number, data["matricula"], "Matrícula já cadastrada")
+            else:
+                valid.append((line_number, data))
+        return valid
+
+    def _existing(self, conn, matriculas):
+        # Uma lista IN por consulta, cada uma dentro de MAX_SQL_VARIABLES
+        # (SQLite antigo ainda vem com Pythons antigos no Windows)
+        existing = set()
+        for start in range(0, len(matriculas), MAX_SQL_VARIABLES):
+            chunk = matriculas[start:start + MAX_SQL_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            existing.update(row[0] for row in conn.execute(
+                f"SELECT matricula FROM students WHERE matricula IN ({placeholders})", chunk
+            ))
+            existing.update(row[0] for row in conn.execute(
+                f"SELECT substr(username, 7) FROM users WHERE username IN ({placeholders})",
+                [f"aluno_{matricula}" for matricula in chunk]
+            ))
+        return existing
+
+    def _insert(self, conn, rows, passwords, auto_approve, approved_by, report):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Com a trava de escrita, confere de novo: outra máquina pode ter
+            # cadastrado a mesma matrícula depois da validação
+            taken = self._existing(conn, [data["matricula"] for _, data in rows])
+            pending = [(row, password) for row, password in zip(rows, passwords)
+                       if row[1]["matricula"] not in taken]
+
+            conn.executemany("""
+                INSERT INTO users (username, password, user_type, is_approved, approved_by, registered_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (f"aluno_{data['matricula']}", password, "aluno",
+                 1 if auto_approve else 0, approved_by if auto_approve else None, now)
+                for (_, data), password in pending
+            ])
+            conn.executemany("""
+                INSERT INTO students (username, matricula, nome, data_nascimento, cpf,
+                                      curso, email, telefone, endereco)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (f"aluno_{data['matricula']}",) + tuple(data.get(field, "") for field in STUDENT_FIELDS)
+                for (_, data), _ in pending
+            ])
+
+        for line_number, data in rows:
+            if data["matricula"] in taken:
+                report.add_error(line_number, data["matricula"], "Matrícula já cadastrada")
+            else:
+                report.imported += 1
@@ -0,0 +1,244 @@
+"""Instrumentação das consultas SQL: tempo, linhas, origem e consultas lentas.
+
+O ConnectionPool abre as conexões com ``InstrumentedConnection``; cada
+``execute``/``executemany`` passa por ``InstrumentedCursor``, que mede a
+duração e soma o resultado em ``QueryStats``, agrupado pela impressão
+digital do SQL (literais trocados por ``?``, espaços normalizados). O tempo
+e as linhas dos ``fetchone``/``fetchmany``/``fetchall`` contam para a
+consulta que os gerou; linhas lidas iterando o cursor não são contadas.
+
+Consultas acima de ``slow_ms`` vão para o log de lentas junto com o
+``EXPLAIN QUERY PLAN`` (capturado uma vez por impressão digital a cada
+``explain_interval`` segundos, para não pesar quando algo fica lento).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+
+DEFAULT_SLOW_MS = 100
+MAX_CALLERS = 5
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+# Quadros deste arquivo são ignorados ao procurar quem executou o SQL
+_THIS_FILE = __file__
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """SQL normalizado: literais viram ``?`` e listas ``IN (?, ?, ...)`` viram ``(?...)``."""
+    text = _STRING.sub("?", sql)
+    text = _NUMBER.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(?...)", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def _caller():
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename == _THIS_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+class StatementStats:
+    __slots__ = ("fingerprint", "count", "total", "max", "rows", "slow", "callers")
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.callers = Counter()
+
+    def as_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "rows": self.rows,
+            "slow": self.slow,
+            "callers": dict(self.callers.most_common(MAX_CALLERS)),
+        }
+
+
+class QueryStats:
+    """Contadores agregados por impressão digital e log das consultas lentas."""
+
+    def __init__(self, slow_ms=DEFAULT_SLOW_MS, log_path=None, explain_interval=300):
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self.explain_interval = explain_interval
+        self.enabled = True
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        self._statements = {}
+        self._explained = {}
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    def record(self, sql, elapsed, rows, caller):
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats(key)
+            stats.count += 1
+            stats.callers[caller] += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.rows += rows
+        return stats
+
+    def add_fetch(self, stats, elapsed, rows):
+        """Soma à consulta o tempo e as linhas lidas depois do execute."""
+        with self._lock:
+            stats.total += elapsed
+            stats.rows += rows
+
+    def check_slow(self, conn, sql, params, elapsed, caller, stats):
+        """Registra a consulta no log se passou do limite (chamada fora do lock)."""
+        if elapsed * 1000 < self.slow_ms:
+            return
+        with self._lock:
+            stats.slow += 1
+            now = time.monotonic()
+            explain = now - self._explained.get(stats.fingerprint, -self.explain_interval) >= self.explain_interval
+            if explain:
+                self._explained[stats.fingerprint] = now
+
+        plan = None
+        if explain and sql.lstrip().upper().startswith(_EXPLAINABLE):
+            try:
+                plan = [tuple(row)[-1] for row in
+                        sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params)]
+            except sqlite3.Error as e:
+                plan = [f"(sem plano: {e})"]
+        self._write_slow({
+            "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "ms": round(elapsed * 1000, 3),
+            "caller": caller,
+            "sql": stats.fingerprint,
+            "plan": plan,
+        })
+
+    def _write_slow(self, entry):
+        if not self.log_path:
+            return
+        try:
+            with self._log_lock, open(self.log_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError:
+            # O log é diagnóstico; falhar aqui não pode derrubar a consulta
+            pass
+
+    def snapshot(self, order_by="total_ms"):
+        with self._lock:
+            statements = [stats.as_dict() for stats in self._statements.values()]
+        statements.sort(key=lambda stats: stats[order_by], reverse=True)
+        return statements
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._explained.clear()
+            self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def dump(self, path, extra=None):
+        """Grava os contadores em JSON (``extra`` entra junto, ex.: o cache)."""
+        data = {
+            "since": self.started_at,
+            "dumped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "slow_ms": self.slow_ms,
+            "statements": self.snapshot(),
+        }
+        if extra:
+            data.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    _stats = None
+
+    def execute(self, sql, parameters=()):
+        query_stats = self.connection.query_stats
+        if query_stats is None or not query_stats.enabled:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            caller = _caller()
+            # rowcount é -1 em SELECT; as linhas lidas são somadas nos fetch*
+            self._stats = query_stats.record(sql, elapsed, max(self.rowcount, 0), caller)
+            query_stats.check_slow(self.connection, sql, parameters, elapsed, caller, self._stats)
+
+    def executemany(self, sql, seq_of_parameters):
+        query_stats = self.connection.query_stats
+        if query_stats is None or not query_stats.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            caller = _caller()
+            self._stats = query_stats.record(sql, elapsed, max(self.rowcount, 0), caller)
+            # Sem EXPLAIN: os parâmetros são uma sequência já consumida
+            query_stats.check_slow(self.connection, "", (), elapsed, caller, self._stats)
+
+    def _fetched(self, start, rows):
+        if self._stats is not None:
+            self.connection.query_stats.add_fetch(self._stats, time.perf_counter() - start, rows)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de ``conn.execute``) são medidos."""
+
+    query_stats = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,664 @@
+"""Migrações versionadas do banco acadêmico.
+
+Cada migração tem um número de versão, uma descrição e uma lista de
+comandos SQL (ou uma função que recebe a conexão). A versão aplicada fica
+em ``PRAGMA user_version``; ao iniciar, ``migrate`` aplica apenas as que
+faltam, cada uma na sua própria transação.
+"""
+
+import sqlite3
+
+SCHEMA_BASE = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password TEXT NOT NULL,
+        user_type TEXT NOT NULL,
+        is_approved INTEGER DEFAULT 0,
+        approved_by TEXT,
+        registered_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS students (
+        username TEXT PRIMARY KEY,
+        matricula TEXT NOT NULL,
+        nome TEXT NOT NULL,
+        data_nascimento TEXT,
+        cpf TEXT,
+        curso TEXT,
+        email TEXT,
+        telefone TEXT,
+        endereco TEXT,
+        progresso REAL DEFAULT 0,
+        FOREIGN KEY (username) REFERENCES users(username)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS activities (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        deadline TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        created_by TEXT NOT NULL,
+        FOREIGN KEY (created_by) REFERENCES users(username)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS submissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        activity_id INTEGER NOT NULL,
+        student_username TEXT NOT NULL,
+        submission_date TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        grade REAL,
+        feedback TEXT,
+        FOREIGN KEY (activity_id) REFERENCES activities(id),
+        FOREIGN KEY (student_username) REFERENCES users(username)
+    )
+    """,
+]
+
+INDICES_CONSULTAS = [
+    "CREATE INDEX IF NOT EXISTS idx_submissions_student ON submissions(student_username)",
+    "CREATE INDEX IF NOT EXISTS idx_activities_deadline ON activities(deadline)",
+    "CREATE INDEX IF NOT EXISTS idx_users_approval ON users(is_approved, user_type)",
+]
+
+SUBMISSAO_UNICA = [
+    # Bancos antigos podem ter entregas duplicadas; fica a mais recente
+    """
+    DELETE FROM submissions
+    WHERE id NOT IN (
+        SELECT MAX(id) FROM submissions
+        GROUP BY activity_id, student_username
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_activity_student
+    ON submissions(activity_id, student_username)
+    """,
+]
+
+PROGRESSO_INCREMENTAL = [
+    # Entregas por aluno e total de atividades, mantidos pelos triggers abaixo
+    """
+    CREATE TABLE IF NOT EXISTS student_progress (
+        username TEXT PRIMARY KEY,
+        submitted INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "DELETE FROM student_progress",
+    """
+    INSERT INTO student_progress (username, submitted)
+    SELECT student_username, COUNT(*) FROM submissions GROUP BY student_username
+    """,
+    """
+    INSERT OR REPLACE INTO counters (name, value)
+    VALUES ('activities', (SELECT COUNT(*) FROM activities))
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_progress_submission_insert
+    AFTER INSERT ON submissions
+    BEGIN
+        INSERT INTO student_progress (username, submitted)
+        VALUES (NEW.student_username, 1)
+        ON CONFLICT(username) DO UPDATE SET submitted = submitted + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_progress_submission_delete
+    AFTER DELETE ON submissions
+    BEGIN
+        UPDATE student_progress SET submitted = submitted - 1
+        WHERE username = OLD.student_username;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_progress_submission_move
+    AFTER UPDATE OF student_username ON submissions
+    WHEN OLD.student_username <> NEW.student_username
+    BEGIN
+        UPDATE student_progress SET submitted = submitted - 1
+        WHERE username = OLD.student_username;
+        INSERT INTO student_progress (username, submitted)
+        VALUES (NEW.student_username, 1)
+        ON CONFLICT(username) DO UPDATE SET submitted = submitted + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_progress_activity_insert
+    AFTER INSERT ON activities
+    BEGIN
+        UPDATE counters SET value = value + 1 WHERE name = 'activities';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_progress_activity_delete
+    AFTER DELETE ON activities
+    BEGIN
+        UPDATE counters SET value = value - 1 WHERE name = 'activities';
+        -- Entregas de uma atividade removida não contam mais para ninguém
+        DELETE FROM submissions WHERE activity_id = OLD.id;
+    END
+    """,
+    # Progresso calculado na leitura: uma busca por chave primária por aluno
+    """
+    CREATE VIEW IF NOT EXISTS student_progress_view AS
+    SELECT s.username, s.nome, s.matricula,
+           COALESCE(p.submitted, 0) AS entregas,
+           c.value AS total_atividades,
+           CASE WHEN c.value > 0
+                THEN COALESCE(p.submitted, 0) * 100.0 / c.value
+                ELSE 0 END AS progresso
+    FROM students s
+    LEFT JOIN student_progress p ON p.username = s.username
+    JOIN counters c ON c.name = 'activities'
+    """,
+]
+
+PAGINACAO_PROGRESSO = [
+    # Todo aluno passa a ter sua linha em student_progress, para que a
+    # ordenação por progresso possa usar um índice
+    """
+    INSERT OR IGNORE INTO student_progress (username, submitted)
+    SELECT username, 0 FROM students
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_progress_student_insert
+    AFTER INSERT ON students
+    BEGIN
+        INSERT OR IGNORE INTO student_progress (username, submitted)
+        VALUES (NEW.username, 0);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_progress_student_delete
+    AFTER DELETE ON students
+    BEGIN
+        DELETE FROM student_progress WHERE username = OLD.username;
+    END
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_students_nome ON students(nome, username)",
+    "CREATE INDEX IF NOT EXISTS idx_students_matricula ON students(matricula, username)",
+    "CREATE INDEX IF NOT EXISTS idx_progress_submitted ON student_progress(submitted, username)",
+]
+
+ARMAZENAMENTO_POR_CONTEUDO = [
+    # Um registro por conteúdo distinto; refcount = entregas que o usam
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        hash TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        refcount INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT
+    )
+    """,
+    "ALTER TABLE submissions ADD COLUMN blob_hash TEXT REFERENCES blobs(hash)",
+    "ALTER TABLE submissions ADD COLUMN file_name TEXT",
+    "CREATE INDEX IF NOT EXISTS idx_submissions_blob ON submissions(blob_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_blobs_orphans ON blobs(refcount) WHERE refcount <= 0",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_blobs_submission_insert
+    AFTER INSERT ON submissions
+    WHEN NEW.blob_hash IS NOT NULL
+    BEGIN
+        UPDATE blobs SET refcount = refcount + 1 WHERE hash = NEW.blob_hash;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_blobs_submission_delete
+    AFTER DELETE ON submissions
+    WHEN OLD.blob_hash IS NOT NULL
+    BEGIN
+        UPDATE blobs SET refcount = refcount - 1 WHERE hash = OLD.blob_hash;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_blobs_submission_update
+    AFTER UPDATE OF blob_hash ON submissions
+    WHEN OLD.blob_hash IS NOT NEW.blob_hash
+    BEGIN
+        UPDATE blobs SET refcount = refcount - 1 WHERE hash = OLD.blob_hash;
+        UPDATE blobs SET refcount = refcount + 1 WHERE hash = NEW.blob_hash;
+    END
+    """,
+]
+
+COMPRESSAO_BLOBS = [
+    "ALTER TABLE blobs ADD COLUMN codec TEXT NOT NULL DEFAULT 'raw'",
+    "ALTER TABLE blobs ADD COLUMN stored_size INTEGER",
+    "UPDATE blobs SET stored_size = size WHERE stored_size IS NULL",
+]
+
+CONFIGURACOES = [
+    # Parâmetros compartilhados por todas as máquinas (ex.: custo do KDF)
+    """
+    CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+    """,
+]
+
+# Índices FTS5 de conteúdo externo: guardam só os tokens e apontam para o
+# rowid da tabela de origem. Os triggers mantêm o índice em dia.
+BUSCA_TEXTUAL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+        nome, matricula, email, curso,
+        content='students', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS activities_fts USING fts5(
+        title, description,
+        content='activities', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS submissions_fts USING fts5(
+        feedback,
+        content='submissions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    "INSERT INTO students_fts(students_fts) VALUES ('rebuild')",
+    "INSERT INTO activities_fts(activities_fts) VALUES ('rebuild')",
+    "INSERT INTO submissions_fts(submissions_fts) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_students_insert
+    AFTER INSERT ON students
+    BEGIN
+        INSERT INTO students_fts(rowid, nome, matricula, email, curso)
+        VALUES (NEW.rowid, NEW.nome, NEW.matricula, NEW.email, NEW.curso);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_students_delete
+    AFTER DELETE ON students
+    BEGIN
+        INSERT INTO students_fts(students_fts, rowid, nome, matricula, email, curso)
+        VALUES ('delete', OLD.rowid, OLD.nome, OLD.matricula, OLD.email, OLD.curso);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_students_update
+    AFTER UPDATE OF nome, matricula, email, curso ON students
+    BEGIN
+        INSERT INTO students_fts(students_fts, rowid, nome, matricula, email, curso)
+        VALUES ('delete', OLD.rowid, OLD.nome, OLD.matricula, OLD.email, OLD.curso);
+        INSERT INTO students_fts(rowid, nome, matricula, email, curso)
+        VALUES (NEW.rowid, NEW.nome, NEW.matricula, NEW.email, NEW.curso);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_activities_insert
+    AFTER INSERT ON activities
+    BEGIN
+        INSERT INTO activities_fts(rowid, title, description)
+        VALUES (NEW.id, NEW.title, NEW.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_activities_delete
+    AFTER DELETE ON activities
+    BEGIN
+        INSERT INTO activities_fts(activities_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_activities_update
+    AFTER UPDATE OF title, description ON activities
+    BEGIN
+        INSERT INTO activities_fts(activities_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        INSERT INTO activities_fts(rowid, title, description)
+        VALUES (NEW.id, NEW.title, NEW.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_submissions_insert
+    AFTER INSERT ON submissions
+    WHEN NEW.feedback IS NOT NULL
+    BEGIN
+        INSERT INTO submissions_fts(rowid, feedback) VALUES (NEW.id, NEW.feedback);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_submissions_delete
+    AFTER DELETE ON submissions
+    WHEN OLD.feedback IS NOT NULL
+    BEGIN
+        INSERT INTO submissions_fts(submissions_fts, rowid, feedback)
+        VALUES ('delete', OLD.id, OLD.feedback);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_submissions_update
+    AFTER UPDATE OF feedback ON submissions
+    WHEN OLD.feedback IS NOT NEW.feedback
+    BEGIN
+        INSERT INTO submissions_fts(submissions_fts, rowid, feedback)
+        SELECT 'delete', OLD.id, OLD.feedback WHERE OLD.feedback IS NOT NULL;
+        INSERT INTO submissions_fts(rowid, feedback)
+        SELECT NEW.id, NEW.feedback WHERE NEW.feedback IS NOT NULL;
+    END
+    """,
+]
+
+
+def _tem_fts5(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def criar_busca_textual(conn):
+    # Sem o módulo FTS5 compilado no SQLite a busca usa LIKE (ver search.py);
+    # garantir_busca_textual cria os índices quando o módulo aparecer
+    if _tem_fts5(conn):
+        _apply(conn, BUSCA_TEXTUAL)
+
+
+def garantir_busca_textual(conn):
+    """Cria os índices FTS5 que a migração 9 pulou por falta do módulo.
+
+    O banco pode ter sido migrado por um SQLite sem FTS5 e aberto depois por
+    outro que o tem; sem isto a busca ficaria no LIKE para sempre.
+    """
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'students_fts'").fetchone():
+        return
+    if not _tem_fts5(conn):
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Outra máquina pode ter criado os índices enquanto esperávamos a trava
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'students_fts'").fetchone():
+            _apply(conn, BUSCA_TEXTUAL)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+ASSINATURAS_TEXTO = [
+    # Assinaturas MinHash por conteúdo (ver plagiarism.py); signature NULL
+    # marca arquivos já processados que não têm texto extraível
+    """
+    CREATE TABLE IF NOT EXISTS text_signatures (
+        blob_hash TEXT PRIMARY KEY,
+        shingles INTEGER NOT NULL,
+        signature BLOB,
+        created_at TEXT
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_signatures_blob_delete
+    AFTER DELETE ON blobs
+    BEGIN
+        DELETE FROM text_signatures WHERE blob_hash = OLD.hash;
+    END
+    """,
+]
+
+REGISTRO_DE_MUDANCAS = [
+    # Alimentado por triggers e lido pelo ChangeWatcher (changes.py). Para
+    # entregas, row_key é o aluno e related_key a atividade.
+    """
+    CREATE TABLE IF NOT EXISTS change_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        op TEXT NOT NULL,
+        row_key TEXT,
+        related_key TEXT
+    )
+    """,
+    # Mantém só as últimas mudanças; quem ficar para trás recarrega tudo
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_change_log_prune
+    AFTER INSERT ON change_log
+    BEGIN
+        DELETE FROM change_log WHERE id <= NEW.id - 10000;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_users_insert
+    AFTER INSERT ON users
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('users', 'I', NEW.username, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_users_update
+    AFTER UPDATE OF is_approved, user_type ON users
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('users', 'U', NEW.username, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_users_delete
+    AFTER DELETE ON users
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('users', 'D', OLD.username, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_students_insert
+    AFTER INSERT ON students
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('students', 'I', NEW.username, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_students_update
+    AFTER UPDATE ON students
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('students', 'U', NEW.username, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_students_delete
+    AFTER DELETE ON students
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('students', 'D', OLD.username, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_activities_insert
+    AFTER INSERT ON activities
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('activities', 'I', NEW.id, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_activities_update
+    AFTER UPDATE ON activities
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('activities', 'U', NEW.id, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_activities_delete
+    AFTER DELETE ON activities
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('activities', 'D', OLD.id, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_submissions_insert
+    AFTER INSERT ON submissions
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('submissions', 'I', NEW.student_username, NEW.activity_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_submissions_update
+    AFTER UPDATE ON submissions
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('submissions', 'U', NEW.student_username, NEW.activity_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_changes_submissions_delete
+    AFTER DELETE ON submissions
+    BEGIN
+        INSERT INTO change_log (table_name, op, row_key, related_key)
+        VALUES ('submissions', 'D', OLD.student_username, OLD.activity_id);
+    END
+    """,
+]
+
+CONTADOR_POR_ATIVIDADE = [
+    # Versão de cada atividade, incrementada a cada entrega, nota ou mudança
+    # de prazo; as estatísticas (analytics.py) ficam em cache por esta versão
+    """
+    CREATE TABLE IF NOT EXISTS activity_changes (
+        activity_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT OR IGNORE INTO activity_changes (activity_id, version) SELECT id, 1 FROM activities",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_activity_changes_activity_insert
+    AFTER INSERT ON activities
+    BEGIN
+        INSERT INTO activity_changes (activity_id, version) VALUES (NEW.id, 1)
+        ON CONFLICT(activity_id) DO UPDATE SET version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_activity_changes_activity_update
+    AFTER UPDATE OF deadline ON activities
+    BEGIN
+        INSERT INTO activity_changes (activity_id, version) VALUES (NEW.id, 1)
+        ON CONFLICT(activity_id) DO UPDATE SET version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_activity_changes_activity_delete
+    AFTER DELETE ON activities
+    BEGIN
+        DELETE FROM activity_changes WHERE activity_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_activity_changes_submission_insert
+    AFTER INSERT ON submissions
+    BEGIN
+        INSERT INTO activity_changes (activity_id, version) VALUES (NEW.activity_id, 1)
+        ON CONFLICT(activity_id) DO UPDATE SET version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_activity_changes_submission_update
+    AFTER UPDATE OF grade, submission_date, activity_id ON submissions
+    BEGIN
+        INSERT INTO activity_changes (activity_id, version) VALUES (NEW.activity_id, 1)
+        ON CONFLICT(activity_id) DO UPDATE SET version = version + 1;
+        -- Entrega movida para outra atividade: a antiga também muda
+        INSERT INTO activity_changes (activity_id, version)
+        SELECT OLD.activity_id, 1 WHERE OLD.activity_id <> NEW.activity_id
+        ON CONFLICT(activity_id) DO UPDATE SET version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_activity_changes_submission_delete
+    AFTER DELETE ON submissions
+    BEGIN
+        INSERT INTO activity_changes (activity_id, version) VALUES (OLD.activity_id, 1)
+        ON CONFLICT(activity_id) DO UPDATE SET version = version + 1;
+    END
+    """,
+]
+
+PROGRESSO_SEM_CASCATA = [
+    # O gatilho da migração 4 apagava as entregas junto com a atividade (e
+    # deixava os blobs sem referência para a coleta); ele volta a só
+    # atualizar o contador
+    "DROP TRIGGER IF EXISTS trg_progress_activity_delete",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_progress_activity_delete
+    AFTER DELETE ON activities
+    BEGIN
+        UPDATE counters SET value = value - 1 WHERE name = 'activities';
+    END
+    """,
+]
+
+MIGRATIONS = [
+    (1, "Esquema inicial", SCHEMA_BASE),
+    (2, "Índices das consultas dos painéis", INDICES_CONSULTAS),
+    (3, "Uma entrega por aluno e atividade", SUBMISSAO_UNICA),
+    (4, "Progresso incremental por triggers", PROGRESSO_INCREMENTAL),
+    (5, "Paginação do progresso da turma", PAGINACAO_PROGRESSO),
+    (6, "Armazenamento das entregas por conteúdo", ARMAZENAMENTO_POR_CONTEUDO),
+    (7, "Compressão dos blobs", COMPRESSAO_BLOBS),
+    (8, "Tabela de configurações", CONFIGURACOES),
+    (9, "Busca textual (FTS5)", criar_busca_textual),
+    (10, "Assinaturas de texto para triagem de plágio", ASSINATURAS_TEXTO),
+    (11, "Registro de mudanças para notificar outras máquinas", REGISTRO_DE_MUDANCAS),
+    (12, "Contador de alterações por atividade", CONTADOR_POR_ATIVIDADE),
+    (13, "Gatilho de atividades sem exclusão em cascata", PROGRESSO_SEM_CASCATA),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _apply(conn, step):
+    if callable(step):
+        step(conn)
+    else:
+        for statement in step:
+            conn.execute(statement)
+
+
+def migrate(conn):
+    """Aplica as migrações pendentes e retorna a versão final do esquema."""
+    if get_version(conn) >= LATEST_VERSION:
+        garantir_busca_textual(conn)
+        return LATEST_VERSION
+
+    for version, description, step in MIGRATIONS:
+        # BEGIN IMMEDIATE garante que duas máquinas iniciando ao mesmo tempo
+        # não apliquem a mesma migração duas vezes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_version(conn) >= version:
+                conn.execute("COMMIT")
+                continue
+            _apply(conn, step)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    garantir_busca_textual(conn)
+    return get_version(conn)
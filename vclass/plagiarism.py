@@ -0,0 +1,250 @@
+"""Triagem de plágio: extração de texto, MinHash e LSH por atividade.
+
+O texto de cada entrega vira um conjunto de shingles (sequências de
+``SHINGLE_SIZE`` palavras) resumido numa assinatura MinHash de
+``NUM_PERM`` valores. As assinaturas ficam na tabela ``text_signatures``
+indexadas pelo hash do blob, então só entregas novas são processadas; o
+LSH compara apenas os pares que caem no mesmo balde em alguma faixa.
+
+Este módulo não importa o Tk: as funções de nível de módulo rodam nos
+processos do ``ProcessPoolExecutor``.
+"""
+
+import io
+import os
+import random
+import re
+import struct
+import unicodedata
+import zipfile
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from storage import BlobStore
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = 0.5
+
+# Limite para não gastar minutos num PDF de centenas de páginas
+MAX_WORDS = 50000
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+# Extração de texto
+
+def _pdf_text_pypdf(data):
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+_PDF_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\n?endstream", re.S)
+_PDF_STRING = re.compile(rb"\(((?:\\.|[^\\)])*)\)")
+_PDF_TEXT_OP = re.compile(rb"(\((?:\\.|[^\\)])*\)\s*(?:Tj|'|\")|\[(?:\\.|[^\]])*\]\s*TJ)")
+
+
+def _pdf_text_crude(data):
+    # Sem pypdf: descompacta os streams e recolhe as strings dos operadores
+    # de texto (Tj/TJ). Não entende fontes CID, mas cobre PDFs de editores
+    # de texto comuns.
+    parts = []
+    for match in _PDF_STREAM.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for operator in _PDF_TEXT_OP.findall(stream):
+            for text in _PDF_STRING.findall(operator):
+                parts.append(re.sub(rb"\\(.)", rb"\1", text).decode("latin-1"))
+            parts.append(" ")
+    return "".join(parts)
+
+
+def _docx_text(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        xml = archive.read("word/document.xml").decode("utf-8", "ignore")
+    return re.sub(r"<[^>]+>", " ", xml)
+
+
+def extract_text(data, file_name=""):
+    """Texto de uma entrega (PDF, DOCX ou texto puro)."""
+    extension = os.path.splitext(file_name)[1].lower()
+    if data.startswith(b"%PDF") or extension == ".pdf":
+        if PdfReader is not None:
+            try:
+                return _pdf_text_pypdf(data)
+            except Exception:
+                pass
+        return _pdf_text_crude(data)
+    if extension == ".docx" or (data.startswith(b"PK") and extension != ".zip"):
+        try:
+            return _docx_text(data)
+        except (zipfile.BadZipFile, KeyError):
+            return ""
+    return data.decode("utf-8", "ignore")
+
+
+# Assinaturas
+
+def words(text):
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.findall(r"\w+", text)[:MAX_WORDS]
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    tokens = words(text)
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode())} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i:i + size]).encode())
+            for i in range(len(tokens) - size + 1)}
+
+
+def minhash(shingle_set):
+    return [min((a * x + b) % _PRIME for x in shingle_set) for a, b in _PERMUTATIONS]
+
+
+def pack_signature(signature):
+    return struct.pack(f"<{len(signature)}Q", *signature)
+
+
+def unpack_signature(data):
+    return list(struct.unpack(f"<{len(data) // 8}Q", data))
+
+
+def similarity(sig_a, sig_b):
+    """Estimativa do índice de Jaccard entre os dois conjuntos de shingles."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def compute_signature(blob_root, blob_hash, file_name):
+    """Roda num processo de trabalho: lê o blob, extrai o texto e gera a assinatura.
+
+    Retorna ``(hash, quantidade_de_shingles, assinatura_empacotada)``; a
+    assinatura é ``None`` quando o arquivo não tem texto extraível.
+    """
+    data = b"".join(BlobStore(blob_root).iter_content(blob_hash))
+    shingle_set = shingles(extract_text(data, file_name or ""))
+    if not shingle_set:
+        return blob_hash, 0, None
+    return blob_hash, len(shingle_set), pack_signature(minhash(shingle_set))
+
+
+def candidate_pairs(signatures):
+    """Pares de chaves que colidem em pelo menos uma faixa do LSH."""
+    pairs = set()
+    for band in range(BANDS):
+        start = band * ROWS_PER_BAND
+        buckets = defaultdict(list)
+        for key, signature in signatures.items():
+            buckets[tuple(signature[start:start + ROWS_PER_BAND])].append(key)
+        for bucket in buckets.values():
+            for i, first in enumerate(bucket):
+                for second in bucket[i + 1:]:
+                    pairs.add((first, second) if first < second else (second, first))
+    return pairs
+
+
+class SimilarityScreener:
+    """Compara as entregas de uma atividade e aponta os pares parecidos.
+
+    ``screen(activity_id)`` calcula as assinaturas que faltam num pool de
+    processos, grava-as em ``text_signatures`` e retorna os pares com
+    similaridade estimada acima de ``threshold``.
+    """
+
+    def __init__(self, db, blobs, workers=None):
+        self.db = db
+        self.blobs = blobs
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+
+    def _missing(self, conn, activity_id):
+        return conn.execute("""
+            SELECT DISTINCT s.blob_hash, s.file_name FROM submissions s
+            LEFT JOIN text_signatures t ON t.blob_hash = s.blob_hash
+            WHERE s.activity_id = ? AND s.blob_hash IS NOT NULL AND t.blob_hash IS NULL
+        """, (activity_id,)).fetchall()
+
+    def update_signatures(self, activity_id, progress=None, cancelled=None):
+        """Gera as assinaturas ainda não calculadas; retorna quantas foram geradas."""
+        conn = self.db.connection()
+        missing = self._missing(conn, activity_id)
+        if not missing:
+            return 0
+
+        done = 0
+        batch = []
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+            futures = [pool.submit(compute_signature, self.blobs.root, row["blob_hash"], row["file_name"])
+                       for row in missing]
+            for future in as_completed(futures):
+                if cancelled is not None and cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                try:
+                    blob_hash, count, signature = future.result()
+                except Exception:
+                    # Arquivo ilegível não impede a análise das outras entregas
+                    continue
+                batch.append((blob_hash, count, signature, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+                done += 1
+                if progress:
+                    progress(done, len(missing))
+
+        with conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO text_signatures (blob_hash, shingles, signature, created_at)
+                VALUES (?, ?, ?, ?)
+            """, batch)
+        return len(batch)
+
+    def similar_pairs(self, activity_id, threshold=DEFAULT_THRESHOLD):
+        """Pares ``(entrega_a, entrega_b, similaridade)`` em ordem decrescente."""
+        rows = self.db.connection().execute("""
+            SELECT s.id, s.student_username, st.nome, s.blob_hash, s.file_name, t.signature
+            FROM submissions s
+            JOIN students st ON st.username = s.student_username
+            LEFT JOIN text_signatures t ON t.blob_hash = s.blob_hash
+            WHERE s.activity_id = ? AND s.blob_hash IS NOT NULL
+        """, (activity_id,)).fetchall()
+
+        submissions = {row["id"]: row for row in rows}
+        signatures = {row["id"]: unpack_signature(row["signature"])
+                      for row in rows if row["signature"] is not None}
+
+        # Arquivos idênticos (mesmo blob) entram mesmo sem texto extraível
+        scores = {}
+        by_blob = defaultdict(list)
+        for row in rows:
+            by_blob[row["blob_hash"]].append(row["id"])
+        for ids in by_blob.values():
+            for i, first in enumerate(ids):
+                for second in ids[i + 1:]:
+                    scores[(min(first, second), max(first, second))] = 1.0
+
+        for pair in candidate_pairs(signatures):
+            if pair not in scores:
+                scores[pair] = similarity(signatures[pair[0]], signatures[pair[1]])
+
+        pairs = [(submissions[first], submissions[second], score)
+                 for (first, second), score in scores.items() if score >= threshold]
+        pairs.sort(key=lambda pair: pair[2], reverse=True)
+        return pairs
+
+    def screen(self, activity_id, threshold=DEFAULT_THRESHOLD, progress=None, cancelled=None):
+        self.update_signatures(activity_id, progress, cancelled)
+        return self.similar_pairs(activity_id, threshold)
@@ -0,0 +1,173 @@
+"""Miniaturas da primeira página das entregas e abertura no visualizador.
+
+As miniaturas são PNGs num cache em disco indexado pelo hash do blob; o
+cache tem tamanho máximo e descarta primeiro as menos usadas (o mtime do
+arquivo marca o último acesso). O PNG é lido pela interface com
+``tk.PhotoImage``, então a renderização pode rodar fora da thread do Tk.
+"""
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+
+from PIL import Image, ImageDraw, UnidentifiedImageError
+
+from plagiarism import extract_text
+
+try:
+    import fitz  # PyMuPDF, opcional: renderiza a página do PDF de verdade
+except ImportError:
+    fitz = None
+
+THUMBNAIL_SIZE = (420, 560)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def open_with_system_viewer(path):
+    """Abre o arquivo no programa padrão do sistema (Windows, macOS ou Linux)."""
+    if sys.platform == "win32":
+        os.startfile(path)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", path])
+    else:
+        subprocess.Popen(["xdg-open", path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _render_pdf(data, size):
+    document = fitz.open(stream=data, filetype="pdf")
+    try:
+        page = document[0]
+        zoom = min(size[0] / page.rect.width, size[1] / page.rect.height)
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        return Image.open(io.BytesIO(pixmap.tobytes("png")))
+    finally:
+        document.close()
+
+
+def _render_text(text, size, file_name):
+    # Sem renderizador para o formato: mostra o começo do texto numa "página"
+    page = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(page)
+    draw.rectangle([0, 0, size[0] - 1, size[1] - 1], outline="#BDBDBD")
+    draw.text((12, 10), file_name, fill="#1565C0")
+
+    lines = []
+    for paragraph in text.splitlines():
+        lines.extend(textwrap.wrap(paragraph, width=size[0] // 7) or [""])
+        if len(lines) > size[1] // 14:
+            break
+    y = 34
+    for line in lines:
+        if y > size[1] - 16:
+            break
+        draw.text((12, y), line, fill="black")
+        y += 14
+    if not text.strip():
+        draw.text((12, y), "(sem pré-visualização para este formato)", fill="#757575")
+    return page
+
+
+def render_first_page(data, file_name, size=THUMBNAIL_SIZE):
+    """Imagem da primeira página: imagens e PDFs (com PyMuPDF) de verdade,
+    demais formatos como texto."""
+    if data.startswith(b"%PDF") and fitz is not None:
+        try:
+            image = _render_pdf(data, size)
+        except Exception:
+            image = None
+        if image is not None:
+            return image
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        image = image.convert("RGB")
+    except (UnidentifiedImageError, OSError):
+        text = extract_text(data, file_name)
+        sample = text[:2000]
+        # Binário decodificado como texto vira lixo: melhor não mostrar nada
+        if sum(c.isprintable() or c.isspace() for c in sample) < 0.9 * len(sample):
+            text = ""
+        image = _render_text(text, size, file_name)
+
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    return image
+
+
+class ThumbnailCache:
+    """Cache em disco de miniaturas com limite de tamanho (LRU pelo mtime)."""
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES, size=THUMBNAIL_SIZE):
+        self.root = root or os.path.join(tempfile.gettempdir(), "vclass-thumbs")
+        self.max_bytes = max_bytes
+        self.size = size
+        self._lock = threading.Lock()
+        self._total = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, blob_hash):
+        width, height = self.size
+        return os.path.join(self.root, f"{blob_hash}-{width}x{height}.png")
+
+    def get(self, blob_hash, file_name, blobs):
+        """Caminho do PNG da entrega, renderizando-o na primeira vez."""
+        path = self.path_for(blob_hash)
+        try:
+            os.utime(path)  # marca como usado recentemente
+            return path
+        except FileNotFoundError:
+            pass
+
+        data = b"".join(blobs.iter_content(blob_hash))
+        image = render_first_page(data, file_name or "", self.size)
+
+        fd, temp_path = tempfile.mkstemp(suffix=".part", dir=self.root)
+        with os.fdopen(fd, "wb") as out:
+            image.save(out, "PNG", optimize=True)
+        os.replace(temp_path, path)
+
+        self._added(os.path.getsize(path))
+        return path
+
+    def prefetch(self, items, blobs, cancelled=None):
+        """Gera as miniaturas de ``(hash, nome_do_arquivo)`` que ainda faltam."""
+        for blob_hash, file_name in items:
+            if cancelled is not None and cancelled():
+                return
+            if not os.path.exists(self.path_for(blob_hash)):
+                try:
+                    self.get(blob_hash, file_name, blobs)
+                except Exception:
+                    # Prefetch é só otimização; o erro aparece quando a linha for aberta
+                    pass
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".png"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _added(self, size):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += size
+            if self._total <= self.max_bytes:
+                return
+
+            # Remove as menos usadas até ficar em 90% do limite
+            for mtime, size, path in sorted(self._entries()):
+                if self._total <= self.max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                    self._total -= size
+                except FileNotFoundError:
+                    pass
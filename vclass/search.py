@@ -0,0 +1,126 @@
+"""Busca textual sobre alunos, atividades e feedback das entregas.
+
+Usa os índices FTS5 criados pela migração 9 quando existem; se o SQLite
+não tiver FTS5 a mesma busca é feita com ``LIKE``, mais lenta e sem
+ignorar acentos ("joao" não encontra "João").
+"""
+
+import re
+
+MAX_TERMS = 8
+
+
+def terms(text):
+    """Palavras digitadas pelo usuário, sem a pontuação."""
+    return re.findall(r"\w+", text or "")[:MAX_TERMS]
+
+
+def match_query(text):
+    """Consulta FTS5 em que cada palavra é um prefixo obrigatório.
+
+    As palavras vão entre aspas para que operadores (AND, NEAR, ``-``...)
+    digitados na caixa de busca não sejam interpretados.
+    """
+    return " ".join(f'"{term}"*' for term in terms(text))
+
+
+def has_fts(conn, table="students_fts"):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def _like_filter(columns, text):
+    # Cada palavra precisa aparecer em alguma das colunas
+    conditions = []
+    params = []
+    for term in terms(text):
+        conditions.append("(" + " OR ".join(f"{column} LIKE ?" for column in columns) + ")")
+        params.extend([f"%{term}%"] * len(columns))
+    return " AND ".join(conditions), params
+
+
+def search_students(conn, text, limit=200):
+    """Alunos aprovados com progresso, do mais ao menos relevante."""
+    if not terms(text):
+        return []
+    if has_fts(conn):
+        return conn.execute("""
+            SELECT v.* FROM students_fts f
+            JOIN students s ON s.rowid = f.rowid
+            JOIN users u ON u.username = s.username
+            JOIN student_progress_view v ON v.username = s.username
+            WHERE students_fts MATCH ? AND u.is_approved = 1
+            ORDER BY f.rank
+            LIMIT ?
+        """, (match_query(text), limit)).fetchall()
+
+    where, params = _like_filter(("s.nome", "s.matricula", "s.email", "s.curso"), text)
+    return conn.execute(f"""
+        SELECT v.* FROM students s
+        JOIN users u ON u.username = s.username
+        JOIN student_progress_view v ON v.username = s.username
+        WHERE {where} AND u.is_approved = 1
+        ORDER BY s.nome
+        LIMIT ?
+    """, params + [limit]).fetchall()
+
+
+def search_activities(conn, text, limit=100):
+    if not terms(text):
+        return []
+    if has_fts(conn, "activities_fts"):
+        return conn.execute("""
+            SELECT a.id, a.title, a.description, a.deadline FROM activities_fts f
+            JOIN activities a ON a.id = f.rowid
+            WHERE activities_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        """, (match_query(text), limit)).fetchall()
+
+    where, params = _like_filter(("title", "description"), text)
+    return conn.execute(f"""
+        SELECT id, title, description, deadline FROM activities
+        WHERE {where}
+        ORDER BY deadline
+        LIMIT ?
+    """, params + [limit]).fetchall()
+
+
+def search_feedback(conn, text, limit=100):
+    """Entregas cujo feedback contém as palavras buscadas."""
+    if not terms(text):
+        return []
+    select = """
+        SELECT s.id, s.activity_id, a.title, s.student_username, st.nome,
+               s.grade, s.feedback
+    """
+    if has_fts(conn, "submissions_fts"):
+        return conn.execute(select + """
+            FROM submissions_fts f
+            JOIN submissions s ON s.id = f.rowid
+            JOIN activities a ON a.id = s.activity_id
+            JOIN students st ON st.username = s.student_username
+            WHERE submissions_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        """, (match_query(text), limit)).fetchall()
+
+    where, params = _like_filter(("s.feedback",), text)
+    return conn.execute(select + f"""
+        FROM submissions s
+        JOIN activities a ON a.id = s.activity_id
+        JOIN students st ON st.username = s.student_username
+        WHERE {where}
+        ORDER BY s.id DESC
+        LIMIT ?
+    """, params + [limit]).fetchall()
+
+
+def rebuild_index(conn):
+    """Reconstrói os índices FTS5 (necessário após um VACUUM, que pode
+    renumerar o rowid de ``students``)."""
+    with conn:
+        for table in ("students_fts", "activities_fts", "submissions_fts"):
+            if has_fts(conn, table):
+                conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+# Custo inicial do scrypt (N) enquanto a calibração não roda
+DEFAULT_SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 310000
+
+# Custo das senhas iniciais gravadas em lote pela importação de alunos (o
+# CPF): com o custo calibrado para o login, 2.000 alunos levariam mais de
+# um minuto. O custo fica gravado no hash e ``needs_rehash`` o sobe para o
+# calibrado no primeiro login.
+INITIAL_SCRYPT_N = 2 ** 12
+INITIAL_PBKDF2_ITERATIONS = 20000
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _unb64(text):
+    return base64.b64decode(text.encode("ascii"))
+
+
+def _scrypt(password, salt, n, r, p):
+    # maxmem precisa acompanhar N: o padrão do OpenSSL (32 MiB) barra N >= 2**15
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r, dklen=32)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+class PasswordHasher:
+    """Hash de senhas com scrypt (ou PBKDF2 quando o scrypt não existe).
+
+    Formatos gravados em ``users.password``::
+
+        scrypt$<n>$<r>$<p>$<salt>$<hash>
+        pbkdf2_sha256$<iterações>$<salt>$<hash>
+
+    Qualquer outro valor é tratado como senha antiga em texto puro; ela
+    ainda é aceita, e ``needs_rehash`` indica que deve ser convertida.
+    """
+
+    def __init__(self, n=DEFAULT_SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, iterations=PBKDF2_ITERATIONS):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.iterations = iterations
+        self.algorithm = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+
+    def with_cost(self, n, iterations):
+        """Outro hasher com o mesmo algoritmo e custo até ``n``/``iterations``."""
+        return PasswordHasher(n=min(self.n, n), r=self.r, p=self.p,
+                              iterations=min(self.iterations, iterations))
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        if self.algorithm == "scrypt":
+            digest = _scrypt(password, salt, self.n, self.r, self.p)
+            return f"scrypt${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+        digest = _pbkdf2(password, salt, self.iterations)
+        return f"pbkdf2_sha256${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        parts = encoded.split("$")
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = (int(value) for value in parts[1:4])
+            digest = _scrypt(password, _unb64(parts[4]), n, r, p)
+            return hmac.compare_digest(digest, _unb64(parts[5]))
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            digest = _pbkdf2(password, _unb64(parts[2]), int(parts[1]))
+            return hmac.compare_digest(digest, _unb64(parts[3]))
+        # Senha antiga em texto puro
+        return hmac.compare_digest(password.encode("utf-8"), encoded.encode("utf-8"))
+
+    def needs_rehash(self, encoded):
+        parts = encoded.split("$")
+        if self.algorithm == "scrypt":
+            return parts[:4] != ["scrypt", str(self.n), str(self.r), str(self.p)]
+        return parts[:2] != ["pbkdf2_sha256", str(self.iterations)]
+
+
+def calibrate_scrypt(target_ms=150, r=SCRYPT_R, p=SCRYPT_P, max_n=2 ** 20):
+    """Escolhe o maior N (potência de 2) cujo hash leva até ``target_ms``.
+
+    Mede nesta máquina dobrando N a partir de 2**12; o valor resultante
+    define quanto tempo cada login gasta no KDF.
+    """
+    n = 2 ** 12
+    while n < max_n:
+        start = time.perf_counter()
+        _scrypt("calibracao", b"\0" * 16, n * 2, r, p)
+        if (time.perf_counter() - start) * 1000 > target_ms:
+            break
+        n *= 2
+    return n
+
+
+class SessionCache:
+    """Cache curto de credenciais já verificadas.
+
+    Guarda apenas um HMAC da senha com uma chave aleatória do processo, de
+    modo que reabrir painéis ou repetir o login não paga o KDF de novo.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _tag(self, username, password):
+        message = f"{username}\0{password}".encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def get(self, username, password):
+        with self._lock:
+            entry = self._entries.get(username)
+        if entry is None:
+            return None
+        tag, user, expires = entry
+        if time.monotonic() > expires:
+            self.invalidate(username)
+            return None
+        if not hmac.compare_digest(tag, self._tag(username, password)):
+            return None
+        return user
+
+    def put(self, username, password, user):
+        entry = (self._tag(username, password), user, time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[username] = entry
+
+    def invalidate(self, username=None):
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
@@ -0,0 +1,748 @@
+"""Regras de negócio e acesso a dados do sistema acadêmico, sem interface.
+
+``AcademicService`` concentra as consultas e escritas (cadastros, atividades,
+entregas, notas, progresso) e não depende do Tk: é usado pela interface
+(``AcademicSystem`` em Main.py) e pela API HTTP (api.py).
+"""
+
+import sqlite3
+from datetime import datetime
+import os
+
+from database import ConnectionPool
+from migrations import migrate
+from storage import BlobStore
+from security import PasswordHasher, SessionCache, calibrate_scrypt
+from importer import StudentImporter
+import search
+from events import EventBus, QueryCache, cached_query
+from instrumentation import QueryStats, DEFAULT_SLOW_MS
+
+class AcademicService:
+    def __init__(self, db_file="academic.db", activities_dir="activities", submissions_dir="submissions",
+                 slow_query_ms=DEFAULT_SLOW_MS):
+        self.db_file = db_file
+        # Tempo, linhas e origem de cada consulta; as lentas vão para o log com o plano
+        self.query_stats = QueryStats(
+            slow_ms=slow_query_ms,
+            log_path=os.path.join(os.path.dirname(os.path.abspath(db_file)), "slow_queries.log")
+        )
+        # Conexões reaproveitadas por todos os métodos e painéis
+        self.db = ConnectionPool(self.db_file, query_stats=self.query_stats)
+        self.setup_cache()
+        self.initialize_db()
+        self.activities_dir = activities_dir
+        self.submissions_dir = submissions_dir
+        
+        # Criar diretórios se não existirem
+        os.makedirs(self.activities_dir, exist_ok=True)
+        os.makedirs(self.submissions_dir, exist_ok=True)
+        
+        # Arquivos entregues, armazenados uma única vez por conteúdo
+        self.blobs = BlobStore(os.path.join(self.submissions_dir, "blobs"))
+        # Miniaturas da primeira página, num cache local por hash (criado no primeiro uso)
+        self._thumbnails = None
+        self._analytics = None
+    
+    def initialize_db(self):
+        conn = self.db.connection()
+        # Cria ou atualiza o esquema conforme o PRAGMA user_version
+        migrate(conn)
+        
+        # Senhas com hash; logins repetidos dentro do TTL não rodam o KDF de novo
+        self.hasher = PasswordHasher(n=self.get_kdf_cost())
+        self.sessions = SessionCache()
+        
+        with conn:
+            cursor = conn.cursor()
+            
+            # Criar admin padrão se não existir
+            cursor.execute("SELECT * FROM users WHERE username='admin'")
+            if not cursor.fetchone():
+                cursor.execute("""
+                    INSERT INTO users VALUES (
+                        'admin', ?, 'admin', 1, 'system', ?
+                    )
+                """, (self.hasher.hash("admin123"), datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            
+            conn.commit()
+    
+    def setup_cache(self):
+        """Cache das consultas, invalidado pelos eventos que as escritas publicam."""
+        self.events = EventBus()
+        self.query_cache = QueryCache(max_entries=256, ttl=30)
+        
+        invalidate = self.query_cache.invalidate
+        self.events.subscribe("users_changed", lambda: invalidate("users", "progress"))
+        self.events.subscribe("activity_created", lambda: invalidate("activities", "progress"))
+        self.events.subscribe(
+            "submission_saved",
+            lambda student_username, activity_id: invalidate(
+                f"submissions:{student_username}", f"activity:{activity_id}", "progress"
+            )
+        )
+        self.events.subscribe("db_changed", self.invalidate_changes)
+        self.events.subscribe(
+            "grades_saved",
+            lambda submissions: invalidate(*{
+                tag for student_username, activity_id in submissions
+                for tag in (f"submissions:{student_username}", f"activity:{activity_id}")
+            })
+        )
+    
+    def invalidate_changes(self, changes):
+        # Mudanças vistas no change_log (inclusive as de outras máquinas)
+        if changes is None:
+            self.query_cache.clear()
+            return
+        tags = set()
+        for change in changes:
+            if change.table in ("users", "students"):
+                tags.update(("users", "progress"))
+                if change.table == "users":
+                    # Conta aprovada, recusada ou alterada em outra máquina
+                    self.sessions.invalidate(change.key)
+            elif change.table == "activities":
+                tags.update(("activities", "progress"))
+            elif change.table == "submissions":
+                tags.update((f"submissions:{change.key}", f"activity:{change.related}", "progress"))
+        self.query_cache.invalidate(*tags)
+    
+    def get_cache_stats(self):
+        """Contadores do cache de consultas (acertos, faltas, invalidações...)."""
+        return self.query_cache.stats()
+    
+    def get_query_stats(self, order_by="total_ms"):
+        """Consultas SQL agrupadas por impressão digital, das mais custosas para as menos."""
+        return self.query_stats.snapshot(order_by)
+    
+    def dump_diagnostics(self, path):
+        """Grava em JSON os contadores de SQL e do cache de consultas."""
+        self.query_stats.dump(path, {"query_cache": self.get_cache_stats()})
+    
+    def get_kdf_cost(self):
+        """Custo N do scrypt, calibrado na primeira execução e salvo no banco."""
+        with self.db.connection() as conn:
+            row = conn.execute("SELECT value FROM settings WHERE key = 'scrypt_n'").fetchone()
+            if row:
+                return int(row["value"])
+            
+            n = calibrate_scrypt()
+            conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('scrypt_n', ?)", (str(n),))
+            return int(conn.execute("SELECT value FROM settings WHERE key = 'scrypt_n'").fetchone()["value"])
+    
+    def authenticate(self, username, password):
+        """Retorna o usuário aprovado com essas credenciais, ou None."""
+        user = self.sessions.get(username, password)
+        if user is not None:
+            return user
+        
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM users 
+                WHERE username=? AND is_approved=1
+            """, (username,))
+            user = cursor.fetchone()
+            
+            if not user or not self.hasher.verify(password, user["password"]):
+                return None
+            
+            # Senhas em texto puro ou com custo antigo são convertidas no login
+            if self.hasher.needs_rehash(user["password"]):
+                cursor.execute("UPDATE users SET password=? WHERE username=?",
+                               (self.hasher.hash(password), username))
+                conn.commit()
+        
+        self.sessions.put(username, password, user)
+        return user
+    
+    def register_user(self, username, password, user_type):
+        try:
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO users (username, password, user_type, registered_at)
+                    VALUES (?, ?, ?, ?)
+                """, (username, self.hasher.hash(password), user_type, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+                conn.commit()
+            self.events.publish("users_changed")
+            return True, "Solicitação enviada com sucesso!"
+        except sqlite3.IntegrityError:
+            return False, "Usuário já existe!"
+    
+    def register_student(self, student_data):
+        try:
+            username = f"aluno_{student_data['matricula']}"
+        
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+            
+                # Primeiro cria o usuário
+                cursor.execute("""
+                    INSERT INTO users (username, password, user_type, registered_at)
+                    VALUES (?, ?, ?, ?)
+                """, (username, self.hasher.hash(student_data["cpf"]), "aluno", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            
+                # Depois insere os dados do aluno (agora com as colunas explicitas)
+                cursor.execute("""
+                    INSERT INTO students (
+                        username, matricula, nome, data_nascimento, cpf, 
+                        curso, email, telefone, endereco
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                username,
+                    student_data["matricula"],
+                    student_data["nome"],
+                    student_data.get("data_nascimento", ""),
+                    student_data.get("cpf", ""),
+                    student_data.get("curso", ""),
+                    student_data.get("email", ""),
+                    student_data.get("telefone", ""),
+                    student_data.get("endereco", "")
+                ))
+            
+                conn.commit()
+            self.events.publish("users_changed")
+            return True, f"Registro de aluno {student_data['nome']} solicitado com sucesso!"
+        except sqlite3.IntegrityError:
+            return False, "Matrícula já cadastrada!"
+    
+    def import_students(self, file_path, auto_approve=False, approved_by=None, progress=None):
+        """Importa alunos de um CSV/XLSX; retorna um ImportReport com os erros por linha."""
+        importer = StudentImporter(self.db, self.hasher)
+        try:
+            return importer.run(file_path, auto_approve, approved_by, progress)
+        finally:
+            # Blocos já gravados continuam no banco mesmo se a importação falhar
+            self.events.publish("users_changed")
+    
+    @cached_query("users")
+    def get_pending_students(self):
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.* FROM students s
+                JOIN users u ON s.username = u.username
+                WHERE u.is_approved = 0
+            """)
+            return cursor.fetchall()
+    
+    @cached_query("users")
+    def get_pending_users(self, user_type=None, registered_from=None, registered_until=None):
+        """Cadastros aguardando aprovação, opcionalmente filtrados por tipo e
+        pelo intervalo de datas de cadastro (``AAAA-MM-DD``, inclusivo)."""
+        conditions = ["is_approved = 0"]
+        params = []
+        if user_type:
+            conditions.append("user_type = ?")
+            params.append(user_type)
+        if registered_from:
+            conditions.append("registered_at >= ?")
+            params.append(registered_from)
+        if registered_until:
+            # Datas gravadas com hora: "até" inclui o dia inteiro
+            conditions.append("registered_at < date(?, '+1 day')")
+            params.append(registered_until)
+        
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT username, user_type, registered_at FROM users
+                WHERE {" AND ".join(conditions)}
+                ORDER BY registered_at, username
+            """, params)
+            return cursor.fetchall()
+    
+    def approve_student(self, username, approved_by):
+        success, message = self.approve_students([username], approved_by)
+        if success:
+            message = f"Aluno {username} aprovado com sucesso!"
+        return success, message
+    
+    def approve_students(self, usernames, approved_by):
+        """Aprova vários cadastros numa única transação."""
+        usernames = list(usernames)
+        if not usernames:
+            return False, "Nenhum usuário selecionado!"
+        
+        conn = self.db.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.executemany("""
+                UPDATE users 
+                SET is_approved=1, approved_by=?
+                WHERE username=? AND is_approved=0
+            """, [(approved_by, username) for username in usernames])
+            approved = cursor.rowcount
+        self.events.publish("users_changed")
+        return True, f"{approved} cadastro(s) aprovado(s) com sucesso!"
+    
+    def reject_users(self, usernames):
+        """Remove vários cadastros (e os dados de aluno) numa única transação."""
+        usernames = list(usernames)
+        if not usernames:
+            return False, "Nenhum usuário selecionado!"
+        
+        params = [(username,) for username in usernames]
+        students = [(username,) for username in usernames if username.startswith("aluno_")]
+        
+        conn = self.db.connection()
+        released = []
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            removed = conn.executemany("DELETE FROM users WHERE username=?", params).rowcount
+            for (username,) in students:
+                released.extend(row[0] for row in conn.execute(
+                    "SELECT blob_hash FROM submissions WHERE student_username = ?", (username,)
+                ))
+            if students:
+                conn.executemany("DELETE FROM students WHERE username=?", students)
+                conn.executemany("DELETE FROM submissions WHERE student_username=?", students)
+        self.events.publish("users_changed")
+        
+        # Arquivos que só esses usuários referenciavam deixam o repositório
+        self.blobs.collect_garbage(conn, released)
+        for username in usernames:
+            self.sessions.invalidate(username)
+        return True, f"{removed} cadastro(s) removido(s)!"
+    
+    def create_activity(self, title, description, deadline, professor_username):
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO activities (title, description, deadline, created_at, created_by)
+                VALUES (?, ?, ?, ?, ?)
+            """, (title, description, deadline, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), professor_username))
+            conn.commit()
+        self.events.publish("activity_created")
+        return True, "Atividade criada com sucesso!"
+    
+    @cached_query("activities", "submissions:{student_username}")
+    def get_activities_for_student(self, student_username):
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT a.*, 
+                       CASE WHEN s.id IS NOT NULL THEN 1 ELSE 0 END as submitted,
+                       s.grade,
+                       s.feedback
+                FROM activities a
+                LEFT JOIN submissions s ON a.id = s.activity_id AND s.student_username = ?
+                ORDER BY a.deadline
+            """, (student_username,))
+            return cursor.fetchall()
+    
+    def submit_activity(self, activity_id, student_username, file_path, progress=None):
+        # Cópia em blocos para um temporário no repositório por hash; o arquivo
+        # só é publicado dentro da transação que o registra
+        temp_path, blob_hash, size, codec, stored_size = self.blobs.stage(file_path, progress)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        try:
+            with self.db.connection() as conn:
+                # IMMEDIATE: a coleta de lixo espera a entrega ser gravada
+                conn.execute("BEGIN IMMEDIATE")
+                created = False
+                try:
+                    cursor = conn.cursor()
+                    previous = cursor.execute("""
+                        SELECT blob_hash FROM submissions WHERE activity_id = ? AND student_username = ?
+                    """, (activity_id, student_username)).fetchone()
+                    
+                    # Reenvios e arquivos idênticos reaproveitam o blob já existente
+                    codec, stored_size, created = self.blobs.place(temp_path, blob_hash, codec, stored_size)
+                    self.blobs.register(conn, blob_hash, size, codec, stored_size, now)
+                    
+                    # Upsert: a restrição UNIQUE (activity_id, student_username) substitui o SELECT prévio
+                    cursor.execute("""
+                        INSERT INTO submissions (
+                            activity_id, student_username, submission_date, file_path, blob_hash, file_name
+                        )
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(activity_id, student_username) DO UPDATE SET
+                            submission_date = excluded.submission_date,
+                            file_path = excluded.file_path,
+                            blob_hash = excluded.blob_hash,
+                            file_name = excluded.file_name
+                    """, (activity_id, student_username, now, self.blobs.path_for(blob_hash, codec),
+                          blob_hash, os.path.basename(file_path)))
+                    
+                    # O progresso é mantido pelos triggers de student_progress
+                    conn.commit()
+                except BaseException:
+                    # O rollback desfaz o registro; o arquivo novo sai ainda com a trava
+                    if created:
+                        self.blobs.remove(blob_hash)
+                    raise
+        finally:
+            self.blobs.discard(temp_path)
+        self.events.publish("submission_saved", student_username=student_username, activity_id=activity_id)
+        
+        # Só o arquivo da entrega substituída pode ter ficado sem referências
+        if previous is not None and previous["blob_hash"] != blob_hash:
+            self.blobs.collect_garbage(self.db.connection(), [previous["blob_hash"]])
+        return True, f"Atividade entregue com sucesso!\nComprovante (SHA-256): {blob_hash[:16]}"
+    
+    def migrate_legacy_submissions(self):
+        """Move entregas antigas (uma cópia por aluno) para o repositório por hash."""
+        conn = self.db.connection()
+        legacy = conn.execute("""
+            SELECT id, activity_id, student_username, file_path FROM submissions
+            WHERE blob_hash IS NULL
+        """).fetchall()
+        
+        moved = 0
+        for row in legacy:
+            if not os.path.exists(row["file_path"]):
+                continue
+            
+            temp_path, blob_hash, size, codec, stored_size = self.blobs.stage(row["file_path"])
+            file_name = os.path.basename(row["file_path"])
+            prefix = f"{row['student_username']}_"
+            if file_name.startswith(prefix):
+                file_name = file_name[len(prefix):]
+            
+            try:
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    created = False
+                    try:
+                        codec, stored_size, created = self.blobs.place(temp_path, blob_hash, codec, stored_size)
+                        self.blobs.register(conn, blob_hash, size, codec, stored_size,
+                                            datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                        updated = conn.execute("""
+                            UPDATE submissions SET blob_hash = ?, file_name = ?, file_path = ?
+                            WHERE id = ? AND blob_hash IS NULL
+                        """, (blob_hash, file_name, self.blobs.path_for(blob_hash, codec), row["id"])).rowcount
+                        conn.commit()
+                    except BaseException:
+                        if created:
+                            self.blobs.remove(blob_hash)
+                        raise
+            finally:
+                self.blobs.discard(temp_path)
+            
+            if updated:
+                os.remove(row["file_path"])
+                moved += 1
+                self.events.publish("submission_saved", student_username=row["student_username"],
+                                    activity_id=row["activity_id"])
+            else:
+                # Outra máquina migrou a entrega antes: o blob registrado pode ter sobrado
+                self.blobs.collect_garbage(conn, [blob_hash])
+        return moved
+    
+    def collect_orphan_blobs(self):
+        """Apaga os arquivos de entregas que nenhuma entrega referencia mais."""
+        return self.blobs.collect_garbage(self.db.connection())
+    
+    def get_storage_stats(self):
+        """Espaço ocupado pelas entregas de cada atividade.
+        
+        ``original_bytes`` soma o tamanho de cada arquivo entregue;
+        ``stored_bytes`` é o que de fato ocupa o disco, com blobs
+        compartilhados divididos entre as entregas que os usam.
+        """
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT a.id AS activity_id, a.title,
+                       COUNT(s.id) AS entregas,
+                       COALESCE(SUM(b.size), 0) AS original_bytes,
+                       COALESCE(SUM(b.stored_size * 1.0 / MAX(b.refcount, 1)), 0) AS stored_bytes,
+                       COALESCE(SUM(CASE WHEN b.codec <> 'raw' THEN 1 ELSE 0 END), 0) AS comprimidas
+                FROM activities a
+                JOIN submissions s ON s.activity_id = a.id
+                JOIN blobs b ON b.hash = s.blob_hash
+                GROUP BY a.id
+                ORDER BY a.id
+            """)
+            return [
+                dict(row, saved_bytes=row["original_bytes"] - row["stored_bytes"])
+                for row in cursor.fetchall()
+            ]
+    
+    def get_submission_file(self, submission):
+        """Caminho do arquivo de uma entrega, pronto para abrir no visualizador."""
+        if submission["blob_hash"]:
+            return self.blobs.materialize(submission["blob_hash"],
+                                          submission["file_name"] or submission["blob_hash"])
+        return submission["file_path"]
+    
+    @property
+    def thumbnails(self):
+        # O Pillow só é importado quando a primeira pré-visualização é pedida
+        if self._thumbnails is None:
+            from previews import ThumbnailCache
+            self._thumbnails = ThumbnailCache()
+        return self._thumbnails
+    
+    def get_submission_preview(self, submission):
+        """PNG com a primeira página da entrega (gerado e guardado no cache)."""
+        if not submission["blob_hash"]:
+            raise FileNotFoundError(submission["file_path"])
+        return self.thumbnails.get(submission["blob_hash"], submission["file_name"], self.blobs)
+    
+    def prefetch_previews(self, submissions, cancelled=None):
+        items = [(sub["blob_hash"], sub["file_name"]) for sub in submissions if sub["blob_hash"]]
+        self.thumbnails.prefetch(items, self.blobs, cancelled)
+    
+    def screen_similarity(self, activity_id, threshold=0.5, progress=None, cancelled=None):
+        """Pares de entregas parecidas na atividade (triagem de plágio)."""
+        from plagiarism import SimilarityScreener
+        screener = SimilarityScreener(self.db, self.blobs)
+        return screener.screen(activity_id, threshold, progress, cancelled)
+    
+    @property
+    def analytics(self):
+        # Guarda as estatísticas já calculadas; o NumPy só é importado no primeiro cálculo
+        if self._analytics is None:
+            from analytics import GradeAnalytics
+            self._analytics = GradeAnalytics(self.db)
+        return self._analytics
+    
+    def get_activity_stats(self):
+        """Média, mediana, percentis, histograma e atrasos de cada atividade."""
+        return self.analytics.activity_stats()
+    
+    def get_student_trends(self):
+        """Média, última nota e tendência (inclinação) das notas de cada aluno."""
+        return self.analytics.student_trends()
+    
+    @cached_query("users")
+    def get_all_students(self, limit=-1, offset=0):
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.* FROM students s
+                JOIN users u ON s.username = u.username
+                WHERE +u.is_approved = 1
+                ORDER BY s.nome, s.username
+                LIMIT ? OFFSET ?
+            """, (limit, offset))
+            return cursor.fetchall()
+    
+    def search_students(self, text, limit=200):
+        """Alunos aprovados (com progresso) que casam com o texto buscado."""
+        return search.search_students(self.db.connection(), text, limit)
+    
+    def search_activities(self, text, limit=100):
+        return search.search_activities(self.db.connection(), text, limit)
+    
+    def search_feedback(self, text, limit=100):
+        return search.search_feedback(self.db.connection(), text, limit)
+    
+    @cached_query("progress", "users")
+    def get_student_progress(self, student_username):
+        """Nome, matrícula e progresso (%) de um aluno."""
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT nome, matricula, progresso FROM student_progress_view
+                WHERE username = ?
+            """, (student_username,))
+            return cursor.fetchone()
+    
+    @cached_query("activities", "submissions:{student_username}")
+    def get_student_submissions(self, student_username):
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.id, s.activity_id, a.title, a.deadline, s.submission_date,
+                       s.file_path, s.blob_hash, s.file_name, s.grade, s.feedback
+                FROM submissions s
+                JOIN activities a ON s.activity_id = a.id
+                WHERE s.student_username = ?
+                ORDER BY a.deadline
+            """, (student_username,))
+            return cursor.fetchall()
+    
+    # Colunas aceitas para ordenar o progresso da turma e o desempate pelo
+    # username da mesma tabela, para que a ordenação use o índice composto
+    CLASS_PROGRESS_ORDER = {
+        "nome": ("s.nome", "s.username"),
+        "matricula": ("s.matricula", "s.username"),
+        "progresso": ("p.submitted", "p.username"),
+    }
+    
+    def _class_progress_query(self, order_by, descending, after):
+        sort_column, key_column = self.CLASS_PROGRESS_ORDER[order_by]
+        direction = "DESC" if descending else "ASC"
+        # O "+" impede o uso de idx_users_approval aqui: o plano deve percorrer
+        # o índice da coluna de ordenação e parar no LIMIT
+        where = "+u.is_approved = 1"
+        params = []
+        
+        # Paginação por chave: continua a partir da última linha já exibida
+        if after is not None:
+            comparison = "<" if descending else ">"
+            where += f" AND ({sort_column}, {key_column}) {comparison} (?, ?)"
+            params.extend(after)
+        
+        # Subconsulta sem correlação: o SQLite a avalia uma única vez
+        total = "(SELECT value FROM counters WHERE name = 'activities')"
+        query = f"""
+            SELECT s.username, s.nome, s.matricula,
+                   {sort_column} AS sort_key,
+                   COALESCE(p.submitted * 100.0 / NULLIF({total}, 0), 0) AS progresso,
+                   p.submitted AS entregas,
+                   {total} AS total_atividades
+            FROM students s
+            JOIN student_progress p ON p.username = s.username
+            JOIN users u ON u.username = s.username
+            WHERE {where}
+            ORDER BY {sort_column} {direction}, {key_column} {direction}
+        """
+        return query, params
+    
+    @cached_query("progress", "users", "activities")
+    def get_class_progress(self, order_by="nome", descending=False):
+        query, params = self._class_progress_query(order_by, descending, None)
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    
+    @cached_query("progress", "users", "activities")
+    def get_class_progress_page(self, order_by="nome", descending=False, after=None, limit=50, offset=0):
+        """Retorna uma página do progresso da turma.
+        
+        ``after`` é a chave ``(sort_key, username)`` da última linha da página
+        anterior; ``None`` começa do início (ou de ``offset``, quando a chave
+        da página ainda não é conhecida).
+        """
+        query, params = self._class_progress_query(order_by, descending, after)
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query + " LIMIT ? OFFSET ?", params + [limit, offset])
+            return cursor.fetchall()
+    
+    @cached_query("users")
+    def count_approved_students(self):
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*) FROM students s
+                JOIN users u ON s.username = u.username
+                WHERE u.is_approved = 1
+            """)
+            return cursor.fetchone()[0]
+    
+    @cached_query("activities")
+    def get_activities(self):
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, title, deadline FROM activities ORDER BY deadline, id")
+            return cursor.fetchall()
+    
+    @cached_query("activity:{activity_id}", "users")
+    def get_activity_submissions(self, activity_id):
+        """Entregas de uma atividade com os dados do aluno, para a correção em lote."""
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.id, s.student_username, st.nome, st.matricula, s.submission_date,
+                       s.file_path, s.blob_hash, s.file_name, s.grade, s.feedback
+                FROM submissions s
+                JOIN students st ON st.username = s.student_username
+                WHERE s.activity_id = ?
+                ORDER BY st.nome, st.username
+            """, (activity_id,))
+            return cursor.fetchall()
+    
+    # Exportação de relatórios: as linhas vêm direto do cursor, sem fetchall
+    
+    def _stream(self, query, params, chunk_size=500):
+        cursor = self.db.connection().execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield from rows
+    
+    def export_class_progress(self, path, order_by="nome", descending=False, progress=None, cancelled=None):
+        """Exporta o progresso da turma para CSV, XLSX ou PDF (pela extensão de ``path``)."""
+        import export
+        query, params = self._class_progress_query(order_by, descending, None)
+        return export.export_rows(path, export.class_progress_report(), self._stream(query, params),
+                                  self.count_approved_students(), progress, cancelled)
+    
+    def export_activity_grades(self, path, activity_id, progress=None, cancelled=None):
+        """Exporta a planilha de notas de uma atividade."""
+        import export
+        conn = self.db.connection()
+        activity = conn.execute("SELECT title FROM activities WHERE id = ?", (activity_id,)).fetchone()
+        if activity is None:
+            raise ValueError("Atividade não encontrada")
+        total = conn.execute("SELECT COUNT(*) FROM submissions WHERE activity_id = ?", (activity_id,)).fetchone()[0]
+        rows = self._stream("""
+            SELECT st.matricula, st.nome, s.submission_date, s.grade, s.feedback
+            FROM submissions s
+            JOIN students st ON st.username = s.student_username
+            WHERE s.activity_id = ?
+            ORDER BY st.nome, st.username
+        """, (activity_id,))
+        return export.export_rows(path, export.activity_grades_report(activity["title"]), rows, total,
+                                  progress, cancelled)
+    
+    def export_student_transcript(self, path, student_username, progress=None, cancelled=None):
+        """Exporta o histórico de entregas e notas de um aluno."""
+        import export
+        conn = self.db.connection()
+        student = conn.execute("SELECT nome, matricula FROM students WHERE username = ?",
+                               (student_username,)).fetchone()
+        if student is None:
+            raise ValueError("Aluno não encontrado")
+        total = conn.execute("SELECT COUNT(*) FROM submissions WHERE student_username = ?",
+                             (student_username,)).fetchone()[0]
+        rows = self._stream("""
+            SELECT a.title, a.deadline, s.submission_date, s.grade, s.feedback
+            FROM submissions s
+            JOIN activities a ON s.activity_id = a.id
+            WHERE s.student_username = ?
+            ORDER BY a.deadline
+        """, (student_username,))
+        report = export.student_transcript_report(student["nome"], student["matricula"])
+        return export.export_rows(path, report, rows, total, progress, cancelled)
+    
+    def grade_submission(self, submission_id, grade, feedback):
+        success, message = self.grade_submissions([(submission_id, grade, feedback)])
+        if success:
+            message = "Nota atribuída com sucesso!"
+        return success, message
+    
+    def grade_submissions(self, grades):
+        """Grava várias notas numa única transação.
+        
+        ``grades`` é uma sequência de ``(id_da_entrega, nota, feedback)``.
+        """
+        params = [(grade, feedback, submission_id) for submission_id, grade, feedback in grades]
+        if not params:
+            return False, "Nenhuma nota alterada!"
+        
+        conn = self.db.connection()
+        updated = 0
+        # Alunos e atividades afetados, para invalidar só as consultas deles;
+        # lidos entrega a entrega para não esbarrar no limite de parâmetros
+        affected = {}
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for grade, feedback, submission_id in params:
+                row = conn.execute("""
+                    SELECT student_username, activity_id FROM submissions WHERE id = ?
+                """, (submission_id,)).fetchone()
+                if row is None:
+                    continue
+                conn.execute("""
+                    UPDATE submissions
+                    SET grade = ?, feedback = ?
+                    WHERE id = ?
+                """, (grade, feedback, submission_id))
+                updated += 1
+                affected[tuple(row)] = None
+        self.events.publish("grades_saved", submissions=list(affected))
+        return True, f"{updated} nota(s) gravada(s) com sucesso!"
+    
+    def close(self):
+        self.db.close_all()
@@ -0,0 +1,56 @@
+"""Tempo de abertura do programa, da primeira linha do Main.py até a tela de login.
+
+Importado antes de tudo no Main.py, então o relógio começa quando o
+interpretador (e, no executável, o bootloader do PyInstaller) já terminou.
+``mark(nome)`` registra o fim de uma etapa; o relatório mostra quanto cada
+etapa levou. Ative com ``--startup-report`` ou ``VCLASS_STARTUP_REPORT=1``.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+_STARTED = time.perf_counter()
+_marks = []
+
+REPORT_FILE = "startup_report.json"
+
+
+def enabled():
+    return "--startup-report" in sys.argv or os.environ.get("VCLASS_STARTUP_REPORT") == "1"
+
+
+def mark(name):
+    _marks.append((name, time.perf_counter()))
+
+
+def report():
+    """Etapas com duração e tempo acumulado, em milissegundos."""
+    phases = []
+    previous = _STARTED
+    for name, at in _marks:
+        phases.append({
+            "phase": name,
+            "ms": round((at - previous) * 1000, 2),
+            "elapsed_ms": round((at - _STARTED) * 1000, 2),
+        })
+        previous = at
+    return {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "python": sys.version.split()[0],
+        "modules_loaded": len(sys.modules),
+        "total_ms": phases[-1]["elapsed_ms"] if phases else 0.0,
+        "phases": phases,
+    }
+
+
+def write_report(path=REPORT_FILE):
+    data = report()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    for phase in data["phases"]:
+        print(f"{phase['phase']:<24} {phase['ms']:>9.1f} ms  (acumulado {phase['elapsed_ms']:.1f} ms)")
+    return data
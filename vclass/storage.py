@@ -0,0 +1,300 @@
+import hashlib
+import math
+from collections import Counter
+import os
+import tempfile
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 1024 * 1024
+SAMPLE_SIZE = 64 * 1024
+
+# Acima disso (bits por byte) o conteúdo já está comprimido: PDF com
+# streams deflate, DOCX/ZIP, JPEG, vídeo...
+ENTROPY_THRESHOLD = 7.5
+
+
+class RawCodec:
+    name = "raw"
+    suffix = ""
+
+    def compressor(self):
+        return None
+
+    def decompressor(self):
+        return None
+
+
+class ZlibCodec:
+    name = "zlib"
+    suffix = ".zz"
+
+    def compressor(self):
+        return zlib.compressobj(6)
+
+    def decompressor(self):
+        return zlib.decompressobj()
+
+
+class ZstdCodec:
+    name = "zstd"
+    suffix = ".zst"
+
+    def compressor(self):
+        return zstandard.ZstdCompressor(level=3).compressobj()
+
+    def decompressor(self):
+        return zstandard.ZstdDecompressor().decompressobj()
+
+
+CODECS = {codec.name: codec for codec in (RawCodec(), ZlibCodec(), ZstdCodec())}
+
+
+def sample_entropy(data):
+    """Entropia de Shannon (bits por byte) de uma amostra."""
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(c / total * math.log2(c / total) for c in Counter(data).values())
+
+
+def choose_codec(sample):
+    if sample_entropy(sample) >= ENTROPY_THRESHOLD:
+        return CODECS["raw"]
+    return CODECS["zstd"] if zstandard is not None else CODECS["zlib"]
+
+
+def _fsync_directory(path):
+    # Garante que o rename sobreviva a uma queda de energia (só POSIX)
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def copy_to_temp(source_path, dest_dir, progress=None, chunk_size=CHUNK_SIZE, codec=None):
+    """Copia ``source_path`` em blocos para um temporário em ``dest_dir``.
+
+    O SHA-256 (do conteúdo original) é calculado durante a cópia e o
+    temporário recebe fsync antes de retornar, pronto para ser renomeado.
+    Com ``codec`` o conteúdo é comprimido no mesmo passo.
+    ``progress(copiados, total)`` é chamado após cada bloco. Retorna
+    ``(caminho_temporario, hash, tamanho, tamanho_gravado)``.
+    """
+    total = os.path.getsize(source_path)
+    digest = hashlib.sha256()
+    compressor = codec.compressor() if codec else None
+    copied = 0
+
+    fd, temp_path = tempfile.mkstemp(prefix=".upload-", suffix=".part", dir=dest_dir)
+    try:
+        with open(source_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                dst.write(compressor.compress(chunk) if compressor else chunk)
+                digest.update(chunk)
+                copied += len(chunk)
+                if progress:
+                    progress(copied, total)
+            if compressor:
+                dst.write(compressor.flush())
+            dst.flush()
+            os.fsync(dst.fileno())
+            stored = dst.tell()
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return temp_path, digest.hexdigest(), copied, stored
+
+
+class BlobStore:
+    """Armazena os arquivos entregues pelo hash do conteúdo.
+
+    Cada conteúdo distinto existe uma única vez em
+    ``<root>/<hash[:2]>/<hash>``; as entregas apontam para ele pela coluna
+    ``submissions.blob_hash``. A contagem de referências fica na tabela
+    ``blobs`` (mantida por triggers) e ``collect_garbage`` apaga os blobs
+    que ninguém mais referencia.
+
+    Com ``compression=True`` arquivos de baixa entropia (texto, PDFs sem
+    compressão...) são gravados com zstd, ou zlib quando o pacote
+    ``zstandard`` não está instalado; o sufixo do arquivo indica o codec.
+    """
+
+    def __init__(self, root, compression=True):
+        self.root = root
+        self.compression = compression
+        self.view_dir = os.path.join(tempfile.gettempdir(), "vclass-view")
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, blob_hash, codec="raw"):
+        return os.path.join(self.root, blob_hash[:2], blob_hash + CODECS[codec].suffix)
+
+    def codec_of(self, blob_hash):
+        """Codec do blob gravado em disco, ou ``None`` se ele não existe."""
+        for codec in CODECS:
+            if os.path.exists(self.path_for(blob_hash, codec)):
+                return codec
+        return None
+
+    def exists(self, blob_hash):
+        return self.codec_of(blob_hash) is not None
+
+    def _choose_codec(self, source_path):
+        if not self.compression:
+            return CODECS["raw"]
+        with open(source_path, "rb") as f:
+            return choose_codec(f.read(SAMPLE_SIZE))
+
+    def stage(self, source_path, progress=None):
+        """Copia o arquivo para um temporário no repositório, ainda sem publicá-lo.
+
+        Retorna ``(temporario, hash, tamanho, codec, tamanho_gravado)``. A
+        coleta de lixo não enxerga temporários; ``place`` os publica.
+        """
+        codec = self._choose_codec(source_path)
+        temp_path, blob_hash, size, stored_size = copy_to_temp(
+            source_path, self.root, progress, codec=codec
+        )
+        return temp_path, blob_hash, size, codec.name, stored_size
+
+    def place(self, temp_path, blob_hash, codec, stored_size):
+        """Publica o temporário como blob, ou o descarta se o conteúdo já existe.
+
+        Deve rodar com a trava de escrita do banco (``BEGIN IMMEDIATE``), na
+        mesma transação do ``register``, que a coleta de lixo também toma.
+        Retorna ``(codec, tamanho_gravado, criado)``; com ``criado`` o
+        arquivo é novo e, se a transação não chegar ao commit, quem chamou
+        deve apagá-lo com ``remove`` antes de soltar a trava. Um arquivo que
+        ainda assim fique sem registro (queda no meio da transação) é
+        apagado pela coleta completa.
+        """
+        try:
+            existing = self.codec_of(blob_hash)
+            if existing is not None:
+                os.remove(temp_path)
+                return existing, os.path.getsize(self.path_for(blob_hash, existing)), False
+            dest_path = self.path_for(blob_hash, codec)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            os.replace(temp_path, dest_path)
+            _fsync_directory(os.path.dirname(dest_path))
+        except BaseException:
+            self.discard(temp_path)
+            raise
+        return codec, stored_size, True
+
+    def discard(self, temp_path):
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    def put(self, source_path, progress=None):
+        """Grava o arquivo no repositório (``stage`` seguido de ``place``).
+
+        Retorna ``(hash, tamanho, codec, tamanho_gravado)``. Sem transação
+        aberta, serve só para quem não disputa o banco com a coleta de lixo
+        (ex.: o gerador de dados dos benchmarks).
+        """
+        temp_path, blob_hash, size, codec, stored_size = self.stage(source_path, progress)
+        codec, stored_size, _ = self.place(temp_path, blob_hash, codec, stored_size)
+        return blob_hash, size, codec, stored_size
+
+    def register(self, conn, blob_hash, size, codec, stored_size, created_at):
+        # Linha com refcount 0; os triggers de submissions incrementam
+        conn.execute("""
+            INSERT OR IGNORE INTO blobs (hash, size, refcount, created_at, codec, stored_size)
+            VALUES (?, ?, 0, ?, ?, ?)
+        """, (blob_hash, size, created_at, codec, stored_size))
+
+    def remove(self, blob_hash):
+        """Apaga o arquivo do blob, qualquer que seja o codec."""
+        for codec in CODECS:
+            try:
+                os.remove(self.path_for(blob_hash, codec))
+            except FileNotFoundError:
+                pass
+
+    def _stored_hashes(self):
+        # Hashes dos arquivos em <root>/<hash[:2]>/; temporários ficam na raiz
+        for entry in os.scandir(self.root):
+            if not entry.is_dir() or len(entry.name) != 2:
+                continue
+            for blob in os.scandir(entry.path):
+                blob_hash = blob.name.split(".", 1)[0]
+                if blob.is_file() and len(blob_hash) == 64 and blob_hash.startswith(entry.name):
+                    yield blob_hash
+
+    def collect_garbage(self, conn, hashes=None):
+        """Remove os blobs sem referências; retorna quantos foram apagados.
+
+        Com ``hashes`` só esses blobs são verificados (ex.: os que uma
+        reentrega acabou de substituir), sem varrer a tabela inteira. A
+        coleta completa também apaga os arquivos em disco sem linha em
+        ``blobs``, que uma transação interrompida depois do ``place`` deixa.
+        """
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if hashes is None:
+                orphans = [row[0] for row in conn.execute(
+                    "SELECT hash FROM blobs WHERE refcount <= 0"
+                )]
+                registered = {row[0] for row in conn.execute("SELECT hash FROM blobs")}
+                unregistered = set(self._stored_hashes()) - registered
+            else:
+                orphans = [blob_hash for blob_hash in set(hashes) if blob_hash and conn.execute(
+                    "SELECT 1 FROM blobs WHERE hash = ? AND refcount <= 0", (blob_hash,)
+                ).fetchone()]
+                unregistered = set()
+            conn.executemany("DELETE FROM blobs WHERE hash = ? AND refcount <= 0",
+                             [(blob_hash,) for blob_hash in orphans])
+
+            # Os arquivos saem ainda com a trava de escrita: quem publica um
+            # blob (place) também a segura, então ninguém reaproveita o
+            # arquivo entre o DELETE e a remoção. Se o commit falhar, voltam
+            # só linhas sem referência, que a próxima coleta apaga.
+            for blob_hash in orphans + sorted(unregistered):
+                self.remove(blob_hash)
+        return len(orphans) + len(unregistered)
+
+    def iter_content(self, blob_hash, chunk_size=CHUNK_SIZE):
+        """Lê o conteúdo original do blob em blocos, descomprimindo se preciso."""
+        codec = self.codec_of(blob_hash)
+        if codec is None:
+            raise FileNotFoundError(blob_hash)
+        decompressor = CODECS[codec].decompressor()
+        with open(self.path_for(blob_hash, codec), "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield decompressor.decompress(chunk) if decompressor else chunk
+        flush = getattr(decompressor, "flush", None)
+        if flush is not None:
+            tail = flush()
+            if tail:
+                yield tail
+
+    def materialize(self, blob_hash, file_name):
+        """Cópia descomprimida com o nome original, para o visualizador do sistema.
+
+        Fica num cache temporário e só é gerada na primeira abertura.
+        """
+        view_path = os.path.join(self.view_dir, blob_hash, file_name)
+        if not os.path.exists(view_path):
+            os.makedirs(os.path.dirname(view_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(view_path))
+            with os.fdopen(fd, "wb") as out:
+                for chunk in self.iter_content(blob_hash):
+                    out.write(chunk)
+            os.replace(temp_path, view_path)
+        return view_path
@@ -0,0 +1,132 @@
+import queue
+import threading
+import traceback
+import tkinter as tk
+from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Ticket:
+    """Identifica uma requisição feita ao BackgroundLoader.
+
+    Tarefas longas podem consultar ``cancelled`` para parar mais cedo quando
+    uma requisição mais nova do mesmo canal tornou esta obsoleta.
+    """
+
+    def __init__(self, loader, channel, generation):
+        self.loader = loader
+        self.channel = channel
+        self.generation = generation
+
+    @property
+    def cancelled(self):
+        return not self.loader.is_current(self)
+
+    def report(self, callback, *args):
+        """Agenda ``callback(*args)`` na thread do Tk (ex.: progresso)."""
+        self.loader.results.put((self, callback, args))
+
+
+class BackgroundLoader:
+    """Executa consultas e cópias de arquivo fora da thread do Tk.
+
+    As tarefas rodam num pool de threads; os resultados voltam por uma fila
+    que é esvaziada com ``root.after``, de modo que os callbacks sempre
+    rodam na thread da interface. Cada requisição pertence a um canal:
+    uma nova requisição no mesmo canal descarta o resultado da anterior.
+    """
+
+    def __init__(self, root, max_workers=4, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="vclass-loader")
+        self.results = queue.Queue()
+
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._pending = 0
+        self._polling = False
+
+    def submit(self, channel, func, *args, on_done=None, on_error=None,
+               with_ticket=False, **kwargs):
+        """Agenda ``func(*args, **kwargs)`` numa thread de trabalho.
+
+        ``on_done(resultado)`` e ``on_error(exceção)`` rodam na thread do Tk,
+        e só se a requisição ainda for a mais recente do canal. Com
+        ``with_ticket=True`` a função recebe o ``Ticket`` como primeiro
+        argumento, para reportar progresso ou verificar cancelamento.
+        """
+        with self._lock:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+            self._pending += 1
+        ticket = Ticket(self, channel, generation)
+
+        if with_ticket:
+            args = (ticket,) + args
+        self.executor.submit(self._run, ticket, func, args, kwargs, on_done, on_error)
+        self._ensure_polling()
+        return ticket
+
+    def cancel(self, channel):
+        with self._lock:
+            self._generations[channel] = self._generations.get(channel, 0) + 1
+
+    def is_current(self, ticket):
+        with self._lock:
+            return self._generations.get(ticket.channel) == ticket.generation
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, ticket, func, args, kwargs, on_done, on_error):
+        try:
+            if ticket.cancelled:
+                result, error = None, None
+                on_done = on_error = None
+            else:
+                result, error = func(*args, **kwargs), None
+        except Exception as e:
+            traceback.print_exc()
+            result, error = None, e
+
+        if error is not None:
+            self.results.put((ticket, on_error or self.show_error, (error,)))
+        elif on_done is not None:
+            self.results.put((ticket, on_done, (result,)))
+        with self._lock:
+            self._pending -= 1
+
+    def show_error(self, error):
+        messagebox.showerror("Erro", f"Falha ao carregar dados: {error}")
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        try:
+            while True:
+                try:
+                    ticket, callback, args = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if not self.is_current(ticket):
+                    continue
+                try:
+                    callback(*args)
+                except tk.TclError:
+                    # A janela que pediu os dados foi fechada antes da resposta
+                    pass
+                except Exception:
+                    # Um painel com defeito não pode parar a entrega dos demais resultados
+                    traceback.print_exc()
+        finally:
+            with self._lock:
+                busy = self._pending > 0
+            if busy or not self.results.empty():
+                self.root.after(self.poll_ms, self._drain)
+            else:
+                self._polling = False
@@ -0,0 +1,486 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+
+
+class ListSource:
+    """Fonte de dados em memória para a VirtualTreeview."""
+
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def count(self):
+        return len(self._rows)
+
+    def rows(self, offset, limit):
+        return self._rows[offset:offset + limit]
+
+    def invalidate(self):
+        pass
+
+
+class PagedSource:
+    """Fonte de dados que busca blocos de linhas sob demanda.
+
+    ``fetch(after, offset, limit)`` retorna as linhas do bloco. Quando
+    ``seek_key`` é informado, a chave da última linha de cada bloco é
+    guardada e o bloco seguinte é buscado por chave (``after``); blocos
+    ainda não alcançados usam ``offset``. Só os ``max_blocks`` blocos mais
+    recentes ficam em memória.
+
+    Com um ``loader`` (BackgroundLoader), os blocos que faltam ao rolar são
+    buscados fora da thread do Tk: ``rows`` devolve ``None`` no lugar das
+    linhas ainda não carregadas e chama ``on_loaded()`` quando elas chegam.
+    """
+
+    def __init__(self, count, fetch, seek_key=None, block_size=100, max_blocks=20, loader=None):
+        self._count_fn = count
+        self._fetch = fetch
+        self._seek_key = seek_key
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.loader = loader
+        self.on_loaded = None
+
+        self._count = None
+        self._blocks = OrderedDict()
+        self._block_keys = {}
+        self._loading = set()
+        self._epoch = 0
+
+    def count(self):
+        if self._count is None:
+            self._count = self._count_fn()
+        return self._count
+
+    def rows(self, offset, limit):
+        return self._rows(offset, limit, wait=self.loader is None)
+
+    def _rows(self, offset, limit, wait):
+        end = min(offset + limit, self.count())
+        result = []
+        while offset < end:
+            index = offset // self.block_size
+            block = self._block(index, wait)
+            if block is None:
+                # Bloco a caminho: linhas provisórias até o fim dele
+                missing = min(end, (index + 1) * self.block_size) - offset
+                result.extend([None] * missing)
+                offset += missing
+                continue
+            start = offset - index * self.block_size
+            chunk = block[start:start + (end - offset)]
+            if not chunk:
+                break
+            result.extend(chunk)
+            offset += len(chunk)
+        return result
+
+    def _block(self, index, wait):
+        if index in self._blocks:
+            self._blocks.move_to_end(index)
+            return self._blocks[index]
+        if wait:
+            return self._store(index, self._fetch_block(index, self._block_keys.get(index)))
+        self._request(index)
+        return None
+
+    def _fetch_block(self, index, after):
+        if after is not None:
+            return self._fetch(after, 0, self.block_size)
+        return self._fetch(None, index * self.block_size, self.block_size)
+
+    def _store(self, index, block):
+        if block and self._seek_key is not None:
+            self._block_keys[index + 1] = self._seek_key(block[-1])
+
+        self._blocks[index] = block
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def _request(self, index):
+        if index in self._loading:
+            return
+        self._loading.add(index)
+        epoch = self._epoch
+        self.loader.submit(
+            (self, "block", index), self._fetch_block, index, self._block_keys.get(index),
+            on_done=lambda block: self._loaded(epoch, index, block),
+            on_error=lambda error: self._failed(epoch, index, error)
+        )
+
+    def _loaded(self, epoch, index, block):
+        # Resposta de antes de um invalidate: os dados podem estar velhos
+        if epoch != self._epoch:
+            return
+        self._loading.discard(index)
+        self._store(index, block)
+        if self.on_loaded is not None:
+            self.on_loaded()
+
+    def _failed(self, epoch, index, error):
+        # Bloco vazio: a lista para de pedir o mesmo bloco a cada redesenho
+        self._loaded(epoch, index, [])
+        self.loader.show_error(error)
+
+    def prefetch(self, offset, limit):
+        """Carrega o total e a janela inicial; pode rodar fora da thread do Tk."""
+        self.count()
+        self._rows(offset, limit, wait=True)
+        return self
+
+    def invalidate(self):
+        self._count = None
+        self._blocks.clear()
+        self._block_keys.clear()
+        self._loading.clear()
+        self._epoch += 1
+
+
+class TreeReconciler:
+    """Sincroniza uma Treeview comum com uma lista de linhas por chave.
+
+    Cada item usa a chave da linha (id da atividade, username...) como iid;
+    ``apply`` compara com o último estado aplicado e só insere, atualiza,
+    remove ou reordena os itens que mudaram.
+    """
+
+    def __init__(self, tree, key, format_row):
+        self.tree = tree
+        self.key = key
+        self.format_row = format_row
+        self.rows = {}
+        self._values = {}
+
+    def apply(self, rows):
+        rows_by_iid = OrderedDict()
+        values_by_iid = {}
+        for row in rows:
+            iid = str(self.key(row))
+            rows_by_iid[iid] = row
+            values_by_iid[iid] = tuple(self.format_row(row))
+
+        removed = [iid for iid in self._values if iid not in values_by_iid]
+        if removed:
+            self.tree.delete(*removed)
+
+        changes = len(removed)
+        order = list(rows_by_iid)
+        for index, iid in enumerate(order):
+            values = values_by_iid[iid]
+            previous = self._values.get(iid)
+            if previous is None:
+                self.tree.insert("", index, iid=iid, values=values)
+                changes += 1
+            elif previous != values:
+                self.tree.item(iid, values=values)
+                changes += 1
+
+        # Só reordena quando a sequência realmente mudou
+        if list(self.tree.get_children()) != order:
+            for index, iid in enumerate(order):
+                self.tree.move(iid, "", index)
+
+        self.rows = dict(rows_by_iid)
+        self._values = values_by_iid
+        return changes
+
+    def row(self, iid):
+        return self.rows.get(iid)
+
+    def refresh_row(self, iid):
+        """Redesenha uma linha cujo formato mudou fora de ``apply``."""
+        values = tuple(self.format_row(self.rows[iid]))
+        if self._values.get(iid) != values:
+            self.tree.item(iid, values=values)
+            self._values[iid] = values
+
+
+class VirtualTreeview(ttk.Frame):
+    """Treeview que cria apenas os itens visíveis e os recicla ao rolar.
+
+    Os dados vêm de uma fonte com ``count()`` e ``rows(offset, limit)``;
+    ``format_row`` converte cada linha nos valores das colunas e ``key``
+    identifica a linha para manter a seleção enquanto se rola a lista.
+    """
+
+    DEFAULT_ROW_HEIGHT = 20
+    DEFAULT_HEADER_HEIGHT = 25
+    # Valores de uma linha cujo bloco ainda está sendo buscado
+    PLACEHOLDER = ("Carregando...",)
+
+    def __init__(self, master, columns, format_row, key=None, selectmode="browse"):
+        super().__init__(master)
+        self.format_row = format_row
+        self.key = key or (lambda row: row[0])
+        self.selectmode = selectmode
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings",
+                                 selectmode=selectmode, height=1)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        # Mesma interface da Treeview para configurar as colunas
+        self.heading = self.tree.heading
+        self.column = self.tree.column
+
+        self.source = ListSource([])
+        self.offset = 0
+        self.visible = 0
+        self.row_height = self.DEFAULT_ROW_HEIGHT
+        self.header_height = self.DEFAULT_HEADER_HEIGHT
+
+        self._slots = []
+        self._window = []
+        self._rendered = {}
+        self._selected = OrderedDict()
+        self._cursor = None
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        for sequence, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"),
+                               ("<Next>", "page"), ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(sequence, lambda e, step=step: self._on_key(step))
+
+    # Dados
+
+    def set_source(self, source, reset=True):
+        """Troca a fonte de dados.
+
+        Com ``reset=False`` a posição e a seleção são mantidas e apenas as
+        linhas visíveis que mudaram são redesenhadas.
+        """
+        self.source = source
+        if isinstance(source, PagedSource):
+            source.on_loaded = self.render
+        if reset:
+            self.offset = 0
+            self._cursor = None
+            self._selected.clear()
+        self.render()
+
+    def refresh(self):
+        """Recarrega a janela visível sem perder posição nem seleção."""
+        self.source.invalidate()
+        self.render()
+
+    def selected_rows(self):
+        return list(self._selected.values())
+
+    def selected_row(self):
+        rows = self.selected_rows()
+        return rows[0] if rows else None
+
+    def clear_selection(self):
+        self._selected.clear()
+        self.render()
+
+    def select_rows(self, rows):
+        """Seleciona as linhas dadas, inclusive as que estão fora da janela."""
+        self._selected = OrderedDict((self.key(row), row) for row in rows)
+        self.render()
+
+    # Rolagem
+
+    def scroll_to(self, offset):
+        total = self.source.count()
+        offset = max(0, min(int(offset), max(0, total - self.visible)))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def _scroll_by(self, step):
+        self.scroll_to(self.offset + step)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.source.count())
+        elif action == "scroll":
+            step = int(amount) * (self.visible if unit == "pages" else 1)
+            self.scroll_to(self.offset + step)
+
+    def _on_mousewheel(self, event):
+        # No Windows cada "clique" da roda vale 120
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_key(self, step):
+        total = self.source.count()
+        if not total:
+            return "break"
+
+        current = self._cursor if self._cursor is not None else self.offset - 1
+        if step == "home":
+            target = 0
+        elif step == "end":
+            target = total - 1
+        elif step == "page":
+            target = current + max(1, self.visible)
+        elif step == "-page":
+            target = current - max(1, self.visible)
+        else:
+            target = current + step
+        target = max(0, min(target, total - 1))
+
+        if target < self.offset:
+            self.offset = target
+        elif target >= self.offset + self.visible:
+            self.offset = target - self.visible + 1
+
+        row = self.source.rows(target, 1)
+        if row and row[0] is not None:
+            self._cursor = target
+            self._selected.clear()
+            self._selected[self.key(row[0])] = row[0]
+        self.render()
+        return "break"
+
+    def _on_configure(self, event):
+        visible = max(1, (event.height - self.header_height) // self.row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def _on_select(self, event):
+        selected_slots = set(self.tree.selection())
+        visible = OrderedDict()
+        for index, (iid, row) in enumerate(zip(self._slots, self._window)):
+            if iid in selected_slots and row is not None:
+                visible[self.key(row)] = row
+                self._cursor = self.offset + index
+
+        if self.selectmode == "browse":
+            if visible:
+                self._selected = visible
+            return
+
+        # Em seleção múltipla, linhas fora da janela continuam selecionadas
+        window_keys = {self.key(row) for row in self._window if row is not None}
+        for key in list(self._selected):
+            if key in window_keys and key not in visible:
+                del self._selected[key]
+        self._selected.update(visible)
+
+    # Desenho
+
+    def _measure_rows(self):
+        # Mede a altura real das linhas a partir do primeiro item visível
+        if not self._slots:
+            return
+        bbox = self.tree.bbox(self._slots[0])
+        if bbox and bbox[3] > 0 and (bbox[3], bbox[1]) != (self.row_height, self.header_height):
+            self.row_height, self.header_height = bbox[3], bbox[1]
+            height = self.tree.winfo_height()
+            if height > 1:
+                self.visible = max(1, (height - self.header_height) // self.row_height)
+
+    def render(self):
+        total = self.source.count()
+        self.offset = max(0, min(self.offset, max(0, total - self.visible)))
+        rows = self.source.rows(self.offset, self.visible) if self.visible else []
+
+        # Recicla os itens existentes; só cria ou remove a diferença
+        while len(self._slots) < len(rows):
+            self._slots.append(self.tree.insert("", tk.END))
+        while len(self._slots) > len(rows):
+            iid = self._slots.pop()
+            self._rendered.pop(iid, None)
+            self.tree.delete(iid)
+
+        # Itens cujo conteúdo não mudou não são tocados
+        selection = []
+        for iid, row in zip(self._slots, rows):
+            values = self.PLACEHOLDER if row is None else tuple(self.format_row(row))
+            if self._rendered.get(iid) != values:
+                self.tree.item(iid, values=values)
+                self._rendered[iid] = values
+            if row is None:
+                continue
+            key = self.key(row)
+            if key in self._selected:
+                self._selected[key] = row
+                selection.append(iid)
+        if set(selection) != set(self.tree.selection()):
+            self.tree.selection_set(selection)
+        self._window = rows
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(rows)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        previous = self.visible
+        self._measure_rows()
+        if self.visible != previous:
+            self.render()
+
+
+class SearchBox(ttk.Frame):
+    """Caixa de busca que só consulta depois de uma pausa na digitação.
+
+    ``on_search(texto)`` é chamado ``delay_ms`` após a última tecla, de modo
+    que digitar um nome inteiro gera uma única consulta.
+    """
+
+    def __init__(self, master, on_search, delay_ms=250, label="Buscar:"):
+        super().__init__(master)
+        self.on_search = on_search
+        self.delay_ms = delay_ms
+        self._pending = None
+        self._last = ""
+
+        self.var = tk.StringVar()
+        ttk.Label(self, text=label).pack(side=tk.LEFT)
+        self.entry = ttk.Entry(self, textvariable=self.var)
+        self.entry.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+        ttk.Button(self, text="Limpar", width=8, command=self.clear).pack(side=tk.LEFT)
+
+        self.var.trace_add("write", self._on_change)
+        self.entry.bind("<Return>", lambda e: self._fire())
+        self.entry.bind("<Escape>", lambda e: self.clear())
+
+    def get(self):
+        return self.var.get().strip()
+
+    def clear(self):
+        self.var.set("")
+
+    def _on_change(self, *args):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        text = self.get()
+        # Espaços a mais ou Enter repetido não geram nova consulta
+        if text != self._last:
+            self._last = text
+            self.on_search(text)
+
+
+class ImagePreview(ttk.Frame):
+    """Área fixa que mostra um PNG (miniatura) ou uma mensagem."""
+
+    def __init__(self, master, width=420, height=560):
+        super().__init__(master, width=width, height=height, relief=tk.SUNKEN, borderwidth=1)
+        self.pack_propagate(False)
+        self.label = ttk.Label(self, anchor="center", justify=tk.CENTER)
+        self.label.pack(expand=True, fill=tk.BOTH)
+        self._image = None
+
+    def show_image(self, path):
+        # O PhotoImage precisa continuar referenciado enquanto é exibido
+        self._image = tk.PhotoImage(file=path)
+        self.label.config(image=self._image, text="")
+
+    def show_message(self, text):
+        self._image = None
+        self.label.config(image="", text=text)